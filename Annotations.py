@@ -0,0 +1,234 @@
+import os
+import json
+import hashlib
+import sqlite3
+import threading
+import numpy as np
+
+# Forme relue de la base: classe, type (0: point, 1: rectangle) et coordonnées normalisées (x2 = x1, y2 = y1 pour un point)
+shape_dtype = np.dtype([("label", "U32"), ("kind", np.int8), ("x1", np.float64), ("y1", np.float64), ("x2", np.float64), ("y2", np.float64)])
+
+POINT = 0
+RECTANGLE = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS labels (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS params (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    name TEXT NOT NULL,
+    params_id INTEGER REFERENCES params(id),
+    labelled INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS shapes (
+    id INTEGER PRIMARY KEY,
+    file_id INTEGER NOT NULL REFERENCES files(id) ON DELETE CASCADE,
+    label_id INTEGER NOT NULL REFERENCES labels(id),
+    kind INTEGER NOT NULL,
+    x1 REAL NOT NULL,
+    y1 REAL NOT NULL,
+    x2 REAL NOT NULL,
+    y2 REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS shapes_file ON shapes(file_id);
+CREATE INDEX IF NOT EXISTS shapes_label ON shapes(label_id);
+CREATE INDEX IF NOT EXISTS files_name ON files(name);
+"""
+
+class AnnotationDB:
+    """AnnotationDB: Base SQLite des annotations (fichiers, paramètres de traitement, classes et formes)"""
+    def __init__(self, filename: str = None):
+        """
+        Constructeur de la classe AnnotationDB.
+
+        Args:
+            filename (str): Fichier de la base (par défaut: ./dataset/annotations.sqlite à côté du script)
+        """
+        if(filename == None):
+            current_script_path = os.path.abspath(__file__)
+            filename = os.path.dirname(current_script_path) + "/dataset/annotations.sqlite"
+        self.filename = filename
+        self.connection = None
+        self.labels = {} # Nom -> identifiant
+        self.lock = threading.Lock()
+
+    ############################ Méthode ############################
+
+    def connect(self):
+        """
+        Méthode ouvrant la base (à la première utilisation) et créant les tables au besoin.
+        """
+        if(self.connection == None):
+            os.makedirs(os.path.dirname(self.filename) or ".", exist_ok=True)
+            self.connection = sqlite3.connect(self.filename, check_same_thread=False)
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute("PRAGMA synchronous=NORMAL")
+            self.connection.execute("PRAGMA foreign_keys=ON")
+            self.connection.executescript(SCHEMA)
+            self.labels = dict(self.connection.execute("SELECT name, id FROM labels"))
+        return self.connection
+
+    def close(self):
+        if(self.connection != None):
+            self.connection.close()
+            self.connection = None
+
+    def label_id(self, name: str):
+        """
+        Méthode renvoyant l'identifiant d'une classe (créée au besoin, dans la transaction en cours: voir save).
+        """
+        if name not in self.labels:
+            self.connection.execute("INSERT OR IGNORE INTO labels(name) VALUES (?)", (name,))
+            self.labels[name] = self.connection.execute("SELECT id FROM labels WHERE name = ?", (name,)).fetchone()[0]
+        return self.labels[name]
+
+    def params_id(self, params: dict):
+        """
+        Méthode renvoyant l'identifiant d'un jeu de paramètres de traitement (forme canonique, créé au besoin).
+        """
+        if(params == None):
+            return None
+        key = json.dumps(params, sort_keys=True)
+        self.connection.execute("INSERT OR IGNORE INTO params(key) VALUES (?)", (key,))
+        return self.connection.execute("SELECT id FROM params WHERE key = ?", (key,)).fetchone()[0]
+
+    def file_id(self, path: str, name: str = None):
+        """
+        Méthode renvoyant l'identifiant d'un fichier radar (créé au besoin).
+        Les fichiers sont identifiés par leur chemin: un fichier portant le nom d'une image déjà enregistrée
+        (autre dossier) reçoit un nom d'image complété par l'empreinte de son chemin.
+        """
+        path = os.path.abspath(path)
+        row = self.connection.execute("SELECT id FROM files WHERE path = ?", (path,)).fetchone()
+        if(row != None):
+            return row[0]
+        if(name == None):
+            name = os.path.splitext(os.path.basename(path))[0]
+        if(self.connection.execute("SELECT 1 FROM files WHERE name = ?", (name,)).fetchone() != None):
+            name += "_" + hashlib.sha1(path.encode()).hexdigest()[:8]
+        return self.connection.execute("INSERT INTO files(path, name) VALUES (?, ?)", (path, name)).lastrowid
+
+    def image_name(self, path: str):
+        """
+        Méthode renvoyant le nom d'image d'un fichier radar (fichiers JSON/PNG du dataset), None s'il n'est pas enregistré.
+        """
+        with self.lock:
+            row = self.connect().execute("SELECT name FROM files WHERE path = ?", (os.path.abspath(path),)).fetchone()
+        return row[0] if row != None else None
+
+    def save(self, path: str, name: str, params: dict, labels: list, kinds: np.ndarray, coords: np.ndarray):
+        """
+        Méthode remplaçant les annotations d'un fichier (une seule transaction, insertion en bloc).
+        Un fichier enregistré sans forme est marqué annoté (aucune cible).
+
+        Args:
+            path (str): Chemin du fichier radar
+            name (str): Nom de l'image (nom du fichier sans extension), utilisé à la première annotation du fichier (voir file_id)
+            params (dict): Paramètres canoniques du traitement affiché
+            labels (list): Classe de chaque forme
+            kinds (ndarray): Type de chaque forme (POINT / RECTANGLE)
+            coords (ndarray): Coordonnées normalisées (n x 4: x1, y1, x2, y2)
+        """
+        with self.lock:
+            connection = self.connect()
+            try:
+                with connection:
+                    file_id = self.file_id(path, name)
+                    params_id = self.params_id(params)
+                    label_ids = [self.label_id(label) for label in labels]
+                    connection.execute("DELETE FROM shapes WHERE file_id = ?", (file_id,))
+                    connection.execute("UPDATE files SET params_id = ?, labelled = 1 WHERE id = ?", (params_id, file_id))
+                    rows = zip([file_id] * len(label_ids), label_ids, np.asarray(kinds).tolist(), *np.asarray(coords, dtype=np.float64).reshape(-1, 4).T.tolist())
+                    connection.executemany("INSERT INTO shapes(file_id, label_id, kind, x1, y1, x2, y2) VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            except:
+                # Transaction annulée: les classes créées pendant la transaction n'existent plus
+                self.labels = dict(connection.execute("SELECT name, id FROM labels"))
+                raise
+
+    def shapes(self, path: str):
+        """
+        Méthode relisant les annotations d'un fichier.
+
+        Returns:
+            ndarray | None: Formes (shape_dtype) dans l'ordre d'enregistrement, None si le fichier n'a jamais été annoté.
+        """
+        with self.lock:
+            connection = self.connect()
+            row = connection.execute("SELECT id, labelled FROM files WHERE path = ?", (os.path.abspath(path),)).fetchone()
+            if(row == None or row[1] == 0):
+                return None
+            rows = connection.execute("""SELECT labels.name, kind, x1, y1, x2, y2 FROM shapes
+                                         JOIN labels ON labels.id = shapes.label_id
+                                         WHERE file_id = ? ORDER BY shapes.id""", (row[0],)).fetchall()
+        return np.array(rows, dtype=shape_dtype)
+
+    def params(self, path: str):
+        """
+        Méthode renvoyant les paramètres de traitement enregistrés avec les annotations d'un fichier (None sinon).
+        """
+        with self.lock:
+            row = self.connect().execute("""SELECT params.key FROM files JOIN params ON params.id = files.params_id
+                                            WHERE files.path = ?""", (os.path.abspath(path),)).fetchone()
+        return json.loads(row[0]) if row != None else None
+
+    def counts(self):
+        """
+        Méthode renvoyant le nombre de formes par classe.
+
+        Returns:
+            dict: Classe -> nombre de formes.
+        """
+        with self.lock:
+            return dict(self.connect().execute("""SELECT labels.name, COUNT(*) FROM shapes
+                                                  JOIN labels ON labels.id = shapes.label_id
+                                                  GROUP BY shapes.label_id ORDER BY labels.name"""))
+
+    def entries(self, path: str = None):
+        """
+        Méthode renvoyant les entrées du dataset (format JSON de l'export), pour un fichier radar ou pour tous.
+
+        Returns:
+            dict: Chemin du fichier radar -> liste des entrées.
+        """
+        query = """SELECT files.path, files.name, labels.name, kind, x1, y1, x2, y2 FROM files
+                   LEFT JOIN shapes ON shapes.file_id = files.id
+                   LEFT JOIN labels ON labels.id = shapes.label_id
+                   WHERE files.labelled = 1"""
+        args = ()
+        if(path != None):
+            query += " AND files.path = ?"
+            args = (os.path.abspath(path),)
+        with self.lock:
+            rows = self.connect().execute(query + " ORDER BY files.id, shapes.id", args).fetchall()
+
+        entries = {}
+        for file_path, image, label, kind, x1, y1, x2, y2 in rows:
+            image_entries = entries.setdefault(file_path, [])
+            if(kind == None):
+                image_entries.append({"image": image, "label": None})
+            elif(kind == POINT):
+                image_entries.append({"image": image, "label": label, "coordinates": {"x": x1, "y": y1}})
+            else:
+                image_entries.append({"image": image, "label": label, "coordinates": {"x1": x1, "y1": y1, "x2": x2, "y2": y2}})
+        return entries
+
+    def export_dataset(self, folder: str):
+        """
+        Méthode écrivant le fichier JSON de chaque image annotée (les fichiers existants sont remplacés).
+
+        Returns:
+            int: Nombre d'images exportées.
+        """
+        os.makedirs(folder, exist_ok=True)
+        entries = self.entries()
+        for image_entries in entries.values():
+            with open(os.path.join(folder, image_entries[0]["image"] + ".json"), "w") as json_file:
+                json.dump(image_entries, json_file, indent=4)
+        return len(entries)
@@ -0,0 +1,89 @@
+import os
+import sys
+import json
+import time
+import numpy as np
+
+from RadarController import RadarController
+from RadarData import RadarData
+from RadarCache import ProcessedCache, raw_cache
+from Project import Project, canonical_params, to_json
+
+# Bornes des samples d'une antenne des fichiers flex (voir MainWindow.flex_antenna_borne)
+flex_antenna_borne = [[0,1022],[1025,2046]]
+
+def file_settings(settings: dict, Rdata: RadarData):
+    """
+    Fonction renvoyant les réglages appliqués à un fichier: sans découpage saisi, le découpage s'arrête
+    au dernier sample du fichier (comme à la sélection d'un fichier dans l'interface).
+    """
+    if(settings["entries"]["cb_entry"] == '' and settings["entries"]["ce_entry"] == ''):
+        if(Rdata.flex):
+            n_samp = flex_antenna_borne[0][1]
+        else:
+            n_samp = Rdata.get_feature()[1]
+        settings = dict(settings, values=dict(settings["values"], ce_value=int(n_samp)))
+    return settings
+
+def process_project(project: Project, output: str = None, preset: str = None):
+    """
+    Fonction traitant sans interface tous les fichiers de la liste d'un projet. Les paramètres canoniques sont ceux de l'interface:
+    les images déjà traitées (cache disque partagé) ne sont pas recalculées, et inversement.
+
+    Args:
+        project (Project): Projet ouvert
+        output (str): Dossier des images traitées (.npy) et des paramètres utilisés, None pour seulement remplir le cache
+        preset (str): Préréglage appliqué à tous les fichiers (par défaut: réglages du projet et réglages propres aux fichiers)
+
+    Returns:
+        dict: Fichier -> paramètres canoniques.
+    """
+    Rcontroller = RadarController()
+    Pcache = ProcessedCache()
+    paths = [os.path.join(project.folder, file) for file in project.files]
+    # Égalisation: nombre de traces maximal de la liste (voir MainWindow.max_list_files)
+    max_tr = max([RadarData(path).get_feature()[0] for path in paths], default=None)
+    if(output != None):
+        os.makedirs(output, exist_ok=True)
+
+    used = {}
+    for index, (file, path) in enumerate(zip(project.files, paths)):
+        s = time.time()
+        Rdata = RadarData(path)
+        settings = project.preset(preset) if preset != None else project.effective(file)
+        if(settings == None):
+            raise ValueError(f"Aucun réglage pour {file}: enregistrer les réglages du projet depuis l'interface ou choisir un préréglage")
+        params = canonical_params(file_settings(settings, Rdata), index, max_tr)
+
+        key = Pcache.key(path, params)
+        img = Pcache.load(key)
+        cached = img is not None
+        if not cached:
+            feature = None
+            if(params["migration"] != None or params["whitening"] != None):
+                feature = Rdata.get_feature()
+            img = Rcontroller.process(raw_cache.get(path), params, feature)
+            Pcache.save(key, img)
+
+        if(output != None):
+            np.save(os.path.join(output, os.path.splitext(file)[0] + ".npy"), img)
+        used[file] = params
+        e = time.time()
+        print(f"{file}: {e-s:.2f} secondes" + (" (cache)" if cached else ""))
+
+    if(output != None):
+        with open(os.path.join(output, "params.json"), "w") as params_file:
+            json.dump(used, params_file, indent=4, default=to_json)
+    return used
+
+if __name__ == '__main__':
+    if(len(sys.argv) < 2):
+        print("Utilisation: python Batch.py projet.json [dossier_sortie] [préréglage]")
+        sys.exit(1)
+    project = Project().load(sys.argv[1])
+    output = sys.argv[2] if len(sys.argv) > 2 else None
+    preset = sys.argv[3] if len(sys.argv) > 3 else None
+    s = time.time()
+    process_project(project, output, preset)
+    e = time.time()
+    print(f"Projet traité ({len(project.files)} fichiers): {e-s:.2f} secondes")
@@ -0,0 +1,71 @@
+import time
+import numpy as np
+
+import Kernels
+from RadarController import RadarController
+
+def profile(n_samp: int = 512, n_tr: int = 10000):
+    """
+    Génère un profil synthétique (int16) de la taille d'un long fichier .rd3.
+    """
+    rng = np.random.default_rng(0)
+    rd3 = (rng.standard_normal((n_tr, n_samp)) * 3000).astype(np.int16)
+    # Même disposition mémoire que RadarData.rd_img (tableau transposé)
+    return rd3.transpose()
+
+def chrono(f, repeat: int = 3):
+    """
+    Renvoie le meilleur temps d'exécution de f sur plusieurs répétitions.
+    """
+    best = None
+    for _ in range(repeat):
+        s = time.time()
+        f()
+        e = time.time()
+        if(best == None or e - s < best):
+            best = e - s
+    return best
+
+def bench_pipeline(img: np.ndarray):
+    Rcontroller = RadarController()
+    params = {"time_zero": None, "cb": 0, "ce": img.shape[0], "dewow": True, "cutoff": None, "sampling": None, "sub_mean": None, "svd": None, "decon": None, "whitening": None,
+              "flip": False, "t0_lin": 0, "t0_exp": 0, "g": 1., "a_lin": 0.5, "a": 2., "max_tr": None,
+              "migration": None, "epsilon": None, "distance": None, "layers": None, "aperture": None,
+              "agc": None, "agc_mode": None}
+    cases = {
+        "Découpage + dewow + gain": params,
+        "Trace moyenne (j=50)": dict(params, sub_mean=50),
+        "Filtre SVD (2 composantes)": dict(params, svd=2),
+        "AGC RMS (51 samples)": dict(params, agc=51, agc_mode="RMS"),
+        "Temps zéro par trace": dict(params, time_zero="Par trace"),
+        "Déconvolution (40 samples)": dict(params, decon=[40, 1]),
+    }
+    for name, case in cases.items():
+        times = {}
+        for backend in ["numpy", "numba"]:
+            if(Kernels.set_backend(backend) != backend):
+                continue
+            # Premier appel hors chronomètre (compilation JIT)
+            Rcontroller.process(img, case)
+            times[backend] = chrono(lambda: Rcontroller.process(img, case))
+        line = name + ": " + ", ".join("{} {:.3f} s".format(b, t) for b, t in times.items())
+        if("numba" in times):
+            line += " (x{:.1f})".format(times["numpy"] / times["numba"])
+        print(line)
+    Kernels.set_backend("numba")
+
+def bench_migration(img: np.ndarray):
+    Rcontroller = RadarController()
+    data = img.astype(np.float32)
+    dt, dx = 0.1e-9, 0.02
+    s = time.time()
+    Rcontroller.fk_migration(data, 8., dt, dx)
+    e = time.time()
+    print("Migration F-K (calcul de la grille): {:.3f} s".format(e - s))
+    print("Migration F-K (grille en cache): {:.3f} s".format(chrono(lambda: Rcontroller.fk_migration(data, 8., dt, dx))))
+
+if __name__ == '__main__':
+    img = profile()
+    print(f"Profil: {img.shape[0]} samples x {img.shape[1]} traces")
+    bench_pipeline(img)
+    bench_migration(img)
@@ -0,0 +1,188 @@
+import numpy as np
+from scipy import signal, ndimage
+from Migration import velocity, traveltime_table, _kirchhoff_tile
+
+# Structure d'une détection: position de l'apex (dans l'image traitée), permittivité ajustée et score
+detection_dtype = np.dtype([("trace", np.float32), ("sample", np.float32), ("epsilon", np.float32), ("score", np.float32)])
+
+class HyperbolaDetector:
+    """HyperbolaDetector: Détection des hyperboles de diffraction et ajustement de la vitesse"""
+    def __init__(self, epsilons: np.ndarray = None, aperture: float = 0.3, max_samples: int = 128, max_aperture: int = 12):
+        """
+        Constructeur de la classe HyperbolaDetector.
+
+        Args:
+            epsilons (ndarray): Permittivités testées (une vitesse par valeur)
+            aperture (float): Demi-largeur des hyperboles recherchées (m)
+            max_samples (int): Nombre maximal de samples après décimation en temps
+            max_aperture (int): Demi-ouverture maximale en traces après décimation horizontale
+        """
+        if epsilons is None:
+            epsilons = np.geomspace(3., 30., 12)
+        self.epsilons = np.asarray(epsilons, dtype=np.float64)
+        self.aperture = aperture
+        self.max_samples = max_samples
+        self.max_aperture = max_aperture
+
+    ############################ Méthode ############################
+
+    def envelope(self, data: np.ndarray, ft: int, fx: int):
+        """
+        Méthode calculant l'enveloppe de l'image et sa version décimée (moyenne de blocs ft samples x fx traces).
+
+        Returns:
+            tuple: Enveloppe pleine résolution, enveloppe décimée.
+        """
+        env = np.abs(signal.hilbert(data, axis=0)).astype(np.float32)
+        nt = (env.shape[0] // ft) * ft
+        nx = (env.shape[1] // fx) * fx
+        return env, env[:nt, :nx].reshape(nt // ft, ft, nx // fx, fx).mean(axis=(1, 3))
+
+    def accumulator(self, env: np.ndarray, dt: float, dx: float, aperture: int):
+        """
+        Méthode construisant l'accumulateur (vitesse, temps de l'apex, trace de l'apex): moyenne de
+        l'enveloppe le long de chaque hyperbole candidate.
+
+        Returns:
+            ndarray: Accumulateur (n_vitesses x samples x traces).
+        """
+        nt, nx = env.shape
+        acc = np.empty((len(self.epsilons), nt, nx), dtype=np.float32)
+        for i, eps in enumerate(self.epsilons):
+            v_rms = np.full(nt, velocity(eps))
+            i0, frac, weight = traveltime_table(nt, dt, dx, v_rms, aperture)
+            # Moyenne non pondérée des contributions valides (les hyperboles qui sortent de la fenêtre ne sont pas favorisées)
+            valid = (weight > 0).astype(np.float32)
+            count = np.maximum(valid[:, 0] + 2 * valid[:, 1:].sum(axis=1), 1)
+            acc[i] = _kirchhoff_tile(env, 0, nx, (i0, frac, valid)) / count[:, np.newaxis]
+        return acc
+
+    def detect(self, img: np.ndarray, dt: float, dx: float, threshold: float = 3., max_detections: int = 500):
+        """
+        Méthode détectant les hyperboles d'une image traitée (samples x traces).
+
+        Args:
+            img (ndarray): Image traitée
+            dt (float): Pas en temps (s)
+            dx (float): Distance entre deux traces (m)
+            threshold (float): Score minimal (rapport au niveau médian de l'accumulateur)
+            max_detections (int): Nombre maximal de détections renvoyées
+
+        Returns:
+            ndarray: Tableau structuré (detection_dtype), trié par score décroissant.
+        """
+        n_samp, n_tr = img.shape
+        ft = max(1, int(np.ceil(n_samp / self.max_samples)))
+        aperture_tr = max(1, int(round(self.aperture / dx)))
+        fx = max(1, int(np.ceil(aperture_tr / self.max_aperture)))
+
+        # Suppression de la trace moyenne: les réflecteurs horizontaux ne doivent pas être pris pour des hyperboles
+        data = (img - np.mean(img, axis=1, dtype=np.float64)[:, np.newaxis]).astype(np.float32)
+        env, env_dec = self.envelope(data, ft, fx)
+        aperture_dec = max(1, aperture_tr // fx)
+        acc = self.accumulator(env_dec, dt * ft, dx * fx, aperture_dec)
+
+        best = np.argmax(acc, axis=0)
+        score = np.take_along_axis(acc, best[np.newaxis], axis=0)[0]
+        score /= np.median(score) + np.finfo(np.float32).tiny
+
+        # Maxima locaux (une détection par hyperbole)
+        size = (3, 2 * aperture_dec + 1)
+        peaks = (score == ndimage.maximum_filter(score, size=size)) & (score >= threshold)
+        rows, cols = np.nonzero(peaks)
+        order = np.argsort(score[rows, cols])[::-1][:max_detections]
+        rows, cols = rows[order], cols[order]
+
+        samples, traces = self.refine_apex(env, rows, cols, ft, fx)
+        epsilon = self.fit_epsilon(data, samples, traces, dt, dx, aperture_tr)
+
+        detections = np.empty(len(rows), dtype=detection_dtype)
+        detections["trace"] = traces
+        detections["sample"] = samples
+        detections["epsilon"] = epsilon
+        detections["score"] = score[rows, cols]
+        return detections
+
+    def refine_apex(self, env: np.ndarray, rows: np.ndarray, cols: np.ndarray, ft: int, fx: int):
+        """
+        Méthode replaçant chaque apex sur le maximum de l'enveloppe pleine résolution autour du bloc détecté.
+
+        Returns:
+            tuple: Samples et traces des apex (pleine résolution).
+        """
+        n_samp, n_tr = env.shape
+        dr = np.arange(-ft, 2 * ft)
+        dc = np.arange(-fx, 2 * fx)
+        r = np.clip(rows[:, np.newaxis, np.newaxis] * ft + dr[np.newaxis, :, np.newaxis], 0, n_samp - 1)
+        c = np.clip(cols[:, np.newaxis, np.newaxis] * fx + dc[np.newaxis, np.newaxis, :], 0, n_tr - 1)
+        block = env[r, c].reshape(len(rows), -1)
+        best = np.argmax(block, axis=1)
+        r = r.reshape(len(rows), len(dr), 1).repeat(len(dc), axis=2).reshape(len(rows), -1)
+        c = c.reshape(len(rows), 1, len(dc)).repeat(len(dr), axis=1).reshape(len(rows), -1)
+        index = np.arange(len(rows))
+        return r[index, best], c[index, best]
+
+    def fit_epsilon(self, data: np.ndarray, samples: np.ndarray, traces: np.ndarray, dt: float, dx: float, aperture: int, n_eps: int = 48, window: int = 2, max_elements: int = 2**21):
+        """
+        Méthode ajustant la permittivité de chaque hyperbole par balayage de la semblance (pleine résolution).
+
+        Args:
+            data (ndarray): Image sans la trace moyenne
+            samples, traces (ndarray): Apex des hyperboles
+            aperture (int): Demi-ouverture en traces
+            n_eps (int): Nombre de permittivités testées
+            window (int): Demi-fenêtre en temps de la semblance (samples)
+            max_elements (int): Nombre maximal d'échantillons lus par paquet d'hyperboles (borne la mémoire utilisée)
+
+        Returns:
+            ndarray: Permittivité ajustée de chaque hyperbole.
+        """
+        eps = np.geomspace(self.epsilons[0], self.epsilons[-1], n_eps)
+
+        # Paquets d'hyperboles: la mémoire ne dépend pas de l'ouverture (pas entre traces fin) ni du nombre de détections
+        per_candidate = n_eps * (2 * aperture + 1) * (2 * window + 1)
+        chunk = max(1, max_elements // per_candidate)
+        semblance = np.concatenate([self.semblance(data, samples[c0:c0 + chunk], traces[c0:c0 + chunk], dt, dx, aperture, eps, window)
+                                    for c0 in range(0, max(len(samples), 1), chunk)])
+
+        # Interpolation parabolique autour du maximum (échelle log)
+        best = np.argmax(semblance, axis=1)
+        best_in = np.clip(best, 1, n_eps - 2)
+        index = np.arange(len(samples))
+        s_m = semblance[index, best_in - 1]
+        s_0 = semblance[index, best_in]
+        s_p = semblance[index, best_in + 1]
+        denom = s_m - 2 * s_0 + s_p
+        shift = np.divide(0.5 * (s_m - s_p), denom, out=np.zeros_like(denom), where=denom < 0)
+        shift = np.where(best == best_in, np.clip(shift, -1, 1), 0.)
+        log_eps = np.log(eps)
+        return np.exp(log_eps[best] + shift * (log_eps[1] - log_eps[0]))
+
+    def semblance(self, data: np.ndarray, samples: np.ndarray, traces: np.ndarray, dt: float, dx: float, aperture: int, eps: np.ndarray, window: int):
+        """
+        Méthode calculant la semblance de chaque hyperbole candidate (apex x permittivité).
+
+        Returns:
+            ndarray: Semblance (hyperboles x permittivités).
+        """
+        n_samp, n_tr = data.shape
+        k = np.arange(-aperture, aperture + 1)
+        w = np.arange(-window, window + 1)
+
+        t0 = (samples * dt)[:, np.newaxis, np.newaxis, np.newaxis]
+        v = velocity(eps)[np.newaxis, :, np.newaxis, np.newaxis]
+        h = (k * dx)[np.newaxis, np.newaxis, :, np.newaxis]
+        q = np.sqrt(t0**2 + (2 * h / v)**2) / dt + w[np.newaxis, np.newaxis, np.newaxis, :]
+        x = traces[:, np.newaxis, np.newaxis, np.newaxis] + k[np.newaxis, np.newaxis, :, np.newaxis]
+
+        valid = (q >= 0) & (q < n_samp - 1) & (x >= 0) & (x < n_tr)
+        i0 = np.where(valid, np.floor(q), 0).astype(np.int64)
+        f = np.where(valid, q - i0, 0).astype(np.float32)
+        x = np.clip(x, 0, n_tr - 1)
+        a = np.where(valid, (1 - f) * data[i0, x] + f * data[i0 + 1, x], 0)
+
+        # Semblance: énergie de la somme / somme des énergies, le long de chaque hyperbole candidate
+        n_valid = np.maximum(valid.sum(axis=2), 1)
+        num = np.sum(np.sum(a, axis=2)**2, axis=-1)
+        den = np.sum(n_valid * np.sum(a**2, axis=2), axis=-1)
+        return np.divide(num, den, out=np.zeros_like(num), where=den > 0)
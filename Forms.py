@@ -1,4 +1,8 @@
+import itertools
+from math import floor
+import numpy as np
 import matplotlib.pyplot as plt
+from matplotlib.collections import EllipseCollection, PolyCollection
 
 color = {
     "": "black",
@@ -9,45 +13,35 @@ color = {
     "Autres": "purple"
 }
 
+# Identifiant de classe stocké dans les tableaux (indice dans labels)
+labels = list(color)
+
+def label_id(label: str):
+    if(label in color):
+        return labels.index(label)
+    return 0
+
+# Structures des annotations: identifiant stable, classe et coordonnées (axes du rendu)
+point_dtype = np.dtype([("id", np.int64), ("label", np.int16), ("x", np.float64), ("y", np.float64)])
+rectangle_dtype = np.dtype([("id", np.int64), ("label", np.int16), ("x1", np.float64), ("y1", np.float64), ("x2", np.float64), ("y2", np.float64)])
+
 class Point:
     def __init__(self, label: str, x: float, y: float):
         self.label = label
         self.x = x
         self.y = y
-        self.create_point()
-    
-    def create_point(self):
-        if(self.label == ""):
-            self.point = plt.Circle((self.x, self.y), radius=0.0075, color='black', alpha = 1)
-        else:
-            if(self.label in color):
-                self.point = plt.Circle((self.x, self.y), radius=0.0075, color=color[self.label], alpha = 1)
+        self.id = None
 
     def update_point(self, x: float, y: float):
         # Mise à jour des coordonnées
         self.x = x
         self.y = y
-        self.point.center = (self.x, self.y)
-
-    def plot(self, axes):
-        axes.add_patch(self.point)
-
-class Points:
-    def __init__(self):
-        self.points = []
 
-    def add(self, point: Point):
-        self.points.append(point)
+    def bounds(self):
+        return self.x, self.y, self.x, self.y
 
-    def clear(self, point: Point):
-        if(point in self.points):   
-            self.points.remove(point)
-            point.point.remove()
-
-    def clear_all(self):
-        for point in self.points:
-            point.point.remove()
-        self.points.clear()
+    def record(self):
+        return (self.id, label_id(self.label), self.x, self.y)
 
 class Rectangle:
     def __init__(self, label: str, x1: float, y1: float, x2: float, y2: float):
@@ -56,36 +50,18 @@ class Rectangle:
         self.y1 = y1
         self.x2 = x2
         self.y2 = y2
+        self.id = None
+        self.rectangle = None
 
-        self.create_rectangle()
-    
     def create_rectangle(self):
-        if(self.label == ""):
-            self.rectangle = plt.Rectangle((self.x1, self.y1), self.x2, self.y2, edgecolor="black",facecolor="black", fill=False)
-        else:
-            if(self.label in color):
-                self.rectangle = plt.Rectangle((self.x1, self.y1), self.x2, self.y2, edgecolor=color[self.label], fill=False)
+        # Rectangle temporaire (tracé en cours), les rectangles enregistrés sont dessinés par Rectangles
+        x1, y1, x2, y2 = self.get_ord_data()
+        self.rectangle = plt.Rectangle((x1, y1), x2 - x1, y2 - y1, edgecolor=color.get(self.label, "black"), fill=False)
 
     def update_rectangle(self, x2: float, y2: float):
         self.x2 = x2
         self.y2 = y2
 
-        x_min = min(self.x1, self.x2)
-        y_min = min(self.y1, self.y2)
-        width = abs(self.x2 - self.x1)
-        height = abs(self.y2 - self.y1)
-
-        """
-        self.rectangle.set_width(width)
-        self.rectangle.set_height(height)
-        self.rectangle.set_xy((x_min, y_min))
-        """
-        if(self.label == ""):
-            self.rectangle = plt.Rectangle((x_min, y_min), width, height, edgecolor="black",facecolor='black', fill=False)
-        else:
-            if(self.label in color):
-                self.rectangle = plt.Rectangle((x_min, y_min), width, height, edgecolor=color[self.label], facecolor=color[self.label], fill=False)
-
     def get_ord_data(self):
         if(self.x1 > self.x2):
             x1 = self.x2
@@ -101,28 +77,338 @@ class Rectangle:
             y2 = self.y2
         return x1, y1, x2, y2
 
+    def bounds(self):
+        return self.get_ord_data()
+
+    def record(self):
+        return (self.id, label_id(self.label)) + self.get_ord_data()
+
     def temporay_plot(self, axes):
+        self.create_rectangle()
+        self.rectangle.set_transform(axes.transData)
+        self.rectangle.figure = axes.figure
         axes.draw_artist(self.rectangle)
 
-    def plot(self, axes):
-        axes.add_patch(self.rectangle)
+class ShapeArray:
+    """ShapeArray: Tableau structuré d'annotations d'un type (lignes contiguës, capacité doublée au besoin), dessiné avec une collection par classe"""
+    dtype = None
+
+    def __init__(self, capacity: int = 64):
+        self.data = np.zeros(capacity, dtype=self.dtype)
+        self.n = 0
+        self.rows = {} # Identifiant -> ligne
+        self.collections = []
+
+    def __len__(self):
+        return self.n
+
+    def view(self):
+        return self.data[:self.n]
+
+    def ids(self):
+        return self.data["id"][:self.n].tolist()
+
+    def extend(self, records: np.ndarray):
+        """
+        Méthode ajoutant un bloc d'annotations (tableau structuré) en une seule copie.
+        """
+        m = self.n + len(records)
+        if(m > len(self.data)):
+            data = np.zeros(max(m, 2 * len(self.data)), dtype=self.dtype)
+            data[:self.n] = self.data[:self.n]
+            self.data = data
+        self.data[self.n:m] = records
+        for i, id in enumerate(records["id"].tolist()):
+            self.rows[id] = self.n + i
+        self.n = m
+
+    def remove(self, id: int):
+        """
+        Méthode supprimant une annotation (la dernière ligne prend sa place).
+        """
+        row = self.rows.pop(id)
+        last = self.n - 1
+        if(row != last):
+            self.data[row] = self.data[last]
+            self.rows[int(self.data[row]["id"])] = row
+        self.n = last
 
     def clear(self):
-        self.rectangle.remove()
+        self.n = 0
+        self.rows.clear()
+
+    def record(self, id: int):
+        return self.data[self.rows[id]]
+
+    def remove_collections(self):
+        for collection in self.collections:
+            collection.remove()
+        self.collections = []
+
+    def plot(self, axes):
+        """
+        Méthode (re)dessinant toutes les annotations: une collection par classe.
+        """
+        self.remove_collections()
+        data = self.view()
+        for index in np.unique(data["label"]):
+            collection = self.collection(axes, data[data["label"] == index], color[labels[index]])
+            axes.add_collection(collection, autolim=False)
+            self.collections.append(collection)
+
+class Points(ShapeArray):
+    dtype = point_dtype
+    radius = 0.0075
 
-class Rectangles:
-    def __init__(self):
-        self.rectangles = []
+    def collection(self, axes, data: np.ndarray, edgecolor: str):
+        size = np.full(len(data), 2 * self.radius)
+        return EllipseCollection(size, size, np.zeros(len(data)), units="xy", offsets=np.column_stack([data["x"], data["y"]]),
+                                 offset_transform=axes.transData, facecolors=edgecolor, edgecolors=edgecolor)
 
-    def add(self, rectangle: Rectangle):
-        self.rectangles.append(rectangle)
+    def get(self, id: int):
+        record = self.record(id)
+        point = Point(labels[record["label"]], float(record["x"]), float(record["y"]))
+        point.id = id
+        return point
 
-    def clear(self,rectangle: Rectangle):
-        if(rectangle in self.rectangles):   
-            rectangle.rectangle.remove()
-            self.rectangles.remove(rectangle)
+    def move(self, id: int, dx: float, dy: float):
+        row = self.rows[id]
+        self.data["x"][row] += dx
+        self.data["y"][row] += dy
 
-    def clear_all(self):
-        for rectangle in self.rectangles:
-            rectangle.rectangle.remove()
-        self.rectangles.clear()
\ No newline at end of file
+    def bounds(self, id: int):
+        record = self.record(id)
+        return record["x"], record["y"], record["x"], record["y"]
+
+class Rectangles(ShapeArray):
+    dtype = rectangle_dtype
+
+    def collection(self, axes, data: np.ndarray, edgecolor: str):
+        verts = np.stack([np.column_stack([data["x1"], data["y1"]]), np.column_stack([data["x2"], data["y1"]]),
+                          np.column_stack([data["x2"], data["y2"]]), np.column_stack([data["x1"], data["y2"]])], axis=1)
+        return PolyCollection(verts, facecolors="none", edgecolors=edgecolor)
+
+    def get(self, id: int):
+        record = self.record(id)
+        rectangle = Rectangle(labels[record["label"]], float(record["x1"]), float(record["y1"]), float(record["x2"]), float(record["y2"]))
+        rectangle.id = id
+        return rectangle
+
+    def move(self, id: int, dx: float, dy: float):
+        row = self.rows[id]
+        for field, d in (("x1", dx), ("x2", dx), ("y1", dy), ("y2", dy)):
+            self.data[field][row] += d
+
+    def bounds(self, id: int):
+        record = self.record(id)
+        return record["x1"], record["y1"], record["x2"], record["y2"]
+
+class SpatialGrid:
+    """SpatialGrid: Index spatial en grille régulière (boîtes englobantes des formes, en coordonnées des axes)"""
+    def __init__(self, cell_x: float = 1., cell_y: float = 1.):
+        """
+        Constructeur de la classe SpatialGrid.
+
+        Args:
+            cell_x, cell_y (float): Taille d'une cellule de la grille
+        """
+        self.cell_x = cell_x
+        self.cell_y = cell_y
+        self.cells = {}
+        self.bounds = {}
+
+    def cell_range(self, x1: float, y1: float, x2: float, y2: float):
+        """
+        Méthode renvoyant les cellules couvertes par la boîte (x1, y1, x2, y2).
+        """
+        i1, i2 = floor(min(x1, x2) / self.cell_x), floor(max(x1, x2) / self.cell_x)
+        j1, j2 = floor(min(y1, y2) / self.cell_y), floor(max(y1, y2) / self.cell_y)
+        return itertools.product(range(i1, i2 + 1), range(j1, j2 + 1))
+
+    def insert(self, id: int, x1: float, y1: float, x2: float, y2: float):
+        self.bounds[id] = (min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2))
+        for cell in self.cell_range(x1, y1, x2, y2):
+            self.cells.setdefault(cell, set()).add(id)
+
+    def remove(self, id: int):
+        if(id in self.bounds):
+            for cell in self.cell_range(*self.bounds.pop(id)):
+                ids = self.cells[cell]
+                ids.discard(id)
+                if(len(ids) == 0):
+                    del self.cells[cell]
+
+    def query(self, x1: float, y1: float, x2: float, y2: float):
+        """
+        Méthode renvoyant les identifiants des formes dont la boîte englobante coupe la boîte (x1, y1, x2, y2).
+        """
+        x1, x2 = min(x1, x2), max(x1, x2)
+        y1, y2 = min(y1, y2), max(y1, y2)
+        found = set()
+        # Une boîte plus grande que la grille entière: parcours des cellules occupées plutôt que de toutes les cellules
+        n_cells = (floor(x2 / self.cell_x) - floor(x1 / self.cell_x) + 1) * (floor(y2 / self.cell_y) - floor(y1 / self.cell_y) + 1)
+        if(n_cells > len(self.cells)):
+            candidates = self.cells.values()
+        else:
+            candidates = [self.cells[cell] for cell in self.cell_range(x1, y1, x2, y2) if cell in self.cells]
+        for ids in candidates:
+            found.update(ids)
+        return [id for id in found if self.bounds[id][0] <= x2 and self.bounds[id][2] >= x1 and self.bounds[id][1] <= y2 and self.bounds[id][3] >= y1]
+
+    def rebuild(self, cell_x: float, cell_y: float):
+        """
+        Méthode reconstruisant la grille avec une nouvelle taille de cellule.
+        """
+        bounds = self.bounds
+        self.cell_x = cell_x
+        self.cell_y = cell_y
+        self.cells = {}
+        self.bounds = {}
+        for id, box in bounds.items():
+            self.insert(id, *box)
+
+class Shapes:
+    """Shapes: Annotations d'une image (points et rectangles en tableaux structurés), indexées par un identifiant stable et par une grille spatiale"""
+    def __init__(self, cells: int = 64):
+        """
+        Constructeur de la classe Shapes.
+
+        Args:
+            cells (int): Nombre de cellules de la grille sur chaque axe (pour l'étendue de l'image)
+        """
+        self.cells = cells
+        self.points = Points()
+        self.rectangles = Rectangles()
+        self.kinds = {} # Identifiant -> Points ou Rectangles
+        self.grid = SpatialGrid()
+        self.ids = itertools.count()
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def __iter__(self):
+        # Ordre d'ajout (les identifiants sont croissants)
+        return iter([self[id] for id in sorted(self.kinds)])
+
+    def __getitem__(self, id: int):
+        return self.kinds[id].get(id)
+
+    def __contains__(self, id: int):
+        return id in self.kinds
+
+    def set_extent(self, x1: float, x2: float, y1: float, y2: float):
+        """
+        Méthode adaptant la taille des cellules à l'étendue de l'image (axes courants).
+        """
+        cell_x = abs(x2 - x1) / self.cells or 1.
+        cell_y = abs(y2 - y1) / self.cells or 1.
+        if((cell_x, cell_y) != (self.grid.cell_x, self.grid.cell_y)):
+            self.grid.rebuild(cell_x, cell_y)
+
+    def add(self, shape):
+        """
+        Méthode ajoutant une forme (Point ou Rectangle) et renvoyant son identifiant.
+        """
+        shape.id = next(self.ids)
+        kind = self.rectangles if isinstance(shape, Rectangle) else self.points
+        kind.extend(np.array([shape.record()], dtype=kind.dtype))
+        self.kinds[shape.id] = kind
+        self.grid.insert(shape.id, *shape.bounds())
+        return shape.id
+
+    def add_points(self, label: str, xs: np.ndarray, ys: np.ndarray):
+        """
+        Méthode ajoutant un ensemble de points de même classe (en bloc) et renvoyant leurs identifiants.
+        """
+        xs, ys = np.asarray(xs, dtype=np.float64), np.asarray(ys, dtype=np.float64)
+        return self.add_block([label] * len(xs), np.zeros(len(xs), dtype=np.int8), np.column_stack([xs, ys, xs, ys]))
+
+    def add_block(self, names: list, kinds: np.ndarray, coords: np.ndarray):
+        """
+        Méthode ajoutant en bloc des formes (type 0: point en (x1, y1), type 1: rectangle) et renvoyant leurs identifiants.
+
+        Args:
+            names (list): Classe de chaque forme
+            kinds (ndarray): Type de chaque forme
+            coords (ndarray): Coordonnées des axes (n x 4: x1, y1, x2, y2)
+        """
+        kinds = np.asarray(kinds)
+        coords = np.asarray(coords, dtype=np.float64).reshape(-1, 4)
+        ids = np.array([next(self.ids) for _ in range(len(kinds))], dtype=np.int64)
+        label_ids = np.array([label_id(name) for name in names], dtype=np.int16)
+
+        is_point = (kinds == 0)
+        points = np.zeros(np.count_nonzero(is_point), dtype=point_dtype)
+        points["id"], points["label"] = ids[is_point], label_ids[is_point]
+        points["x"], points["y"] = coords[is_point, 0], coords[is_point, 1]
+        self.points.extend(points)
+
+        rectangles = np.zeros(len(kinds) - len(points), dtype=rectangle_dtype)
+        rectangles["id"], rectangles["label"] = ids[~is_point], label_ids[~is_point]
+        for j, field in enumerate(("x1", "y1", "x2", "y2")):
+            rectangles[field] = coords[~is_point, j]
+        self.rectangles.extend(rectangles)
+
+        ids = ids.tolist()
+        for id, point, box in zip(ids, is_point.tolist(), coords.tolist()):
+            self.kinds[id] = self.points if point else self.rectangles
+            self.grid.insert(id, *box)
+        return ids
+
+    def remove(self, id: int):
+        kind = self.kinds.pop(id)
+        kind.remove(id)
+        self.grid.remove(id)
+        return kind
+
+    def move(self, id: int, dx: float, dy: float):
+        kind = self.kinds[id]
+        self.grid.remove(id)
+        kind.move(id, dx, dy)
+        self.grid.insert(id, *kind.bounds(id))
+
+    def hit(self, x: float, y: float, tol_x: float, tol_y: float):
+        """
+        Méthode renvoyant l'identifiant de la forme la plus proche de (x, y) à la tolérance près (None sinon).
+        Un rectangle est touché par son bord.
+        """
+        best, best_d = None, None
+        for id in self.grid.query(x - tol_x, y - tol_y, x + tol_x, y + tol_y):
+            x1, y1, x2, y2 = self.grid.bounds[id]
+            # Distance normalisée au bord (ou au point)
+            dx = max(x1 - x, 0, x - x2) / tol_x
+            dy = max(y1 - y, 0, y - y2) / tol_y
+            if(x1 < x < x2 and y1 < y < y2):
+                inside = min(x - x1, x2 - x) / tol_x, min(y - y1, y2 - y) / tol_y
+                d = min(inside)
+            else:
+                d = max(dx, dy)
+            if(d <= 1 and (best_d == None or d < best_d)):
+                best, best_d = id, d
+        return best
+
+    def select(self, x1: float, y1: float, x2: float, y2: float):
+        """
+        Méthode renvoyant les identifiants des formes entièrement contenues dans la zone (x1, y1, x2, y2), dans l'ordre d'ajout.
+        """
+        x1, x2 = min(x1, x2), max(x1, x2)
+        y1, y2 = min(y1, y2), max(y1, y2)
+        ids = [id for id in self.grid.query(x1, y1, x2, y2)
+               if x1 <= self.grid.bounds[id][0] and self.grid.bounds[id][2] <= x2 and y1 <= self.grid.bounds[id][1] and self.grid.bounds[id][3] <= y2]
+        return sorted(ids)
+
+    def plot(self, axes):
+        """
+        Méthode (re)dessinant toutes les formes (une collection par type et par classe).
+        """
+        self.points.plot(axes)
+        self.rectangles.plot(axes)
+
+    def clear(self):
+        self.points.clear()
+        self.rectangles.clear()
+        # Les collections appartiennent aux axes effacés: elles sont simplement oubliées
+        self.points.collections = []
+        self.rectangles.collections = []
+        self.kinds.clear()
+        self.grid = SpatialGrid(self.grid.cell_x, self.grid.cell_y)
@@ -0,0 +1,130 @@
+import numpy as np
+
+# Numba est optionnel: sans lui, les noyaux NumPy équivalents sont utilisés.
+try:
+    import numba
+except ImportError:
+    numba = None
+
+############################ Noyaux NumPy ############################
+
+def _np_crop_dewow_gain(img: np.ndarray, cb: int, ce: int, dewow: bool, fgain: np.ndarray, lim: float):
+    """
+    Découpe [cb:ce], retire la moyenne de chaque trace (dewow) puis applique le gain et l'écrêtage.
+
+    Returns:
+        ndarray: Nouveau tableau float32.
+    """
+    out = img[cb:ce, :].astype(np.float32)
+    if(dewow):
+        out -= np.mean(out, axis=0, dtype=np.float64).astype(np.float32)
+    out *= fgain[:, np.newaxis]
+    np.clip(out, -lim, lim, out=out)
+    return out
+
+def _np_sub_mean_running(array: np.ndarray, j: int):
+    """
+    Soustraction de la trace moyenne glissante (demi-largeur j), sur place.
+    La somme de la fenêtre est mise à jour de façon incrémentale: une seule passe sur les traces.
+    """
+    n_tr = array.shape[1]
+    start = j
+    end = n_tr - j
+    if(start < end):
+        S = np.sum(array[:, 0:2*j], axis=1, dtype=np.float64)
+        for l in range(start, end):
+            old = array[:, l].astype(np.float64)
+            new = old - S / (2*j)
+            array[:, l] = new
+            S += new - old
+            S -= array[:, l-j]
+            if(l+j < n_tr):
+                S += array[:, l+j]
+    mean_l = np.mean(array[:, 0:start], axis=1, dtype=np.float64)
+    mean_r = np.mean(array[:, end:n_tr], axis=1, dtype=np.float64)
+    array[:, 0:start] -= mean_l[:, np.newaxis]
+    array[:, end:n_tr] -= mean_r[:, np.newaxis]
+    return array
+
+def _np_gain_clip(img: np.ndarray, fgain: np.ndarray, lim: float):
+    """
+    Applique le gain (par sample) puis l'écrêtage.
+
+    Returns:
+        ndarray: Nouveau tableau float32.
+    """
+    out = np.multiply(img, fgain[:, np.newaxis], dtype=np.float32)
+    np.clip(out, -lim, lim, out=out)
+    return out
+
+############################ Noyaux Numba ############################
+
+# Seule la trace moyenne glissante gagne à être compilée (Benchmark.py): les noyaux découpage/dewow/gain
+# restent en NumPy, déjà vectorisés. Le noyau est séquentiel et libère le GIL: l'interface et les threads
+# de préchargement l'exécutent simultanément, sans verrou.
+if numba != None:
+    @numba.njit(nogil=True, cache=True)
+    def _nb_sub_mean_running(array, j):
+        n_samp, n_tr = array.shape
+        start = j
+        end = n_tr - j
+        # Les samples sont indépendants: blocs de lignes,
+        # passe unique sur les traces avec une boucle interne contiguë (données rangées par traces)
+        block = 64
+        n_blocks = (n_samp + block - 1) // block
+        for b in range(n_blocks):
+            r0 = b * block
+            r1 = min(r0 + block, n_samp)
+            S = np.zeros(r1 - r0)
+            mean_l = np.zeros(r1 - r0)
+            mean_r = np.zeros(r1 - r0)
+            if start < end:
+                for c in range(2*j):
+                    for r in range(r0, r1):
+                        S[r-r0] += array[r, c]
+                for l in range(start, end):
+                    for r in range(r0, r1):
+                        old = array[r, l]
+                        new = old - S[r-r0] / (2*j)
+                        array[r, l] = new
+                        S[r-r0] += new - old - array[r, l-j]
+                        if l+j < n_tr:
+                            S[r-r0] += array[r, l+j]
+            if start > 0:
+                for c in range(0, start):
+                    for r in range(r0, r1):
+                        mean_l[r-r0] += array[r, c]
+                for c in range(end, n_tr):
+                    for r in range(r0, r1):
+                        mean_r[r-r0] += array[r, c]
+                for c in range(0, start):
+                    for r in range(r0, r1):
+                        array[r, c] -= mean_l[r-r0] / start
+                for c in range(end, n_tr):
+                    for r in range(r0, r1):
+                        array[r, c] -= mean_r[r-r0] / (n_tr - end)
+        return array
+
+############################ Sélection du backend ############################
+
+backend = None
+crop_dewow_gain = _np_crop_dewow_gain
+gain_clip = _np_gain_clip
+
+def set_backend(name: str):
+    """
+    Sélectionne les noyaux utilisés ("numba" ou "numpy"). Sans Numba installé, "numpy" est toujours utilisé.
+
+    Returns:
+        str: Le backend effectivement sélectionné.
+    """
+    global backend, sub_mean_running
+    if(name == "numba" and numba != None):
+        backend = "numba"
+        sub_mean_running = _nb_sub_mean_running
+    else:
+        backend = "numpy"
+        sub_mean_running = _np_sub_mean_running
+    return backend
+
+set_backend("numba")
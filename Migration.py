@@ -0,0 +1,441 @@
+import os
+import sys
+import atexit
+import threading
+import multiprocessing
+import numpy as np
+from collections import OrderedDict
+from multiprocessing import shared_memory, resource_tracker
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from scipy import fft
+from RadarData import cste_global
+
+def velocity(epsilon: float):
+    """
+    Vitesse de propagation (m/s) dans un milieu de permittivité relative epsilon.
+    """
+    return cste_global["c_lum"] / np.sqrt(epsilon)
+
+class FKMigration:
+    """FKMigration: Migration de Stolt (fréquence-nombre d'onde) à vitesse constante"""
+    def __init__(self, max_grids: int = 4):
+        """
+        Constructeur de la classe FKMigration.
+
+        Args:
+            max_grids (int): Nombre de grilles d'interpolation conservées (une grille par taille d'image et vitesse)
+        """
+        self.max_grids = max_grids
+        self.grids = OrderedDict()
+        self.lock = threading.Lock()
+
+    ############################ Méthode ############################
+
+    def grid(self, nt_pad: int, nx_pad: int, dt: float, dx: float, v: float):
+        """
+        Méthode calculant (ou relisant) la grille d'interpolation de Stolt.
+
+        Returns:
+            tuple: Indices des deux voisins en fréquence (nf x nkx) et leurs poids (Jacobien inclus).
+        """
+        key = (nt_pad, nx_pad, dt, dx, v)
+        with self.lock:
+            if key in self.grids:
+                self.grids.move_to_end(key)
+                return self.grids[key]
+
+        # Réflecteur explosif: la vitesse est divisée par deux (temps aller-retour)
+        ve = v / 2
+        f = fft.rfftfreq(nt_pad, dt)
+        kx = fft.fftfreq(nx_pad, dx)
+        nf = len(f)
+        df = f[1]
+
+        # Pour chaque (ftau, kx): fréquence d'origine f = sqrt(ftau² + (ve kx)²)
+        ftau = f[:, np.newaxis]
+        f_src = np.sqrt(ftau**2 + (ve * kx[np.newaxis, :])**2)
+        q = f_src / df
+        i0 = np.floor(q).astype(np.int32)
+        frac = (q - i0).astype(np.float32)
+
+        # Jacobien df/dftau = ftau / f
+        scale = np.divide(ftau, f_src, out=np.ones_like(f_src), where=f_src > 0).astype(np.float32)
+
+        # Au-delà de Nyquist: aucune énergie
+        outside = i0 >= nf - 1
+        i0[outside] = 0
+        w0 = (1 - frac) * scale
+        w1 = frac * scale
+        w0[outside] = 0
+        w1[outside] = 0
+
+        grid = (i0, i0 + 1, w0, w1)
+        with self.lock:
+            self.grids[key] = grid
+            while len(self.grids) > self.max_grids:
+                self.grids.popitem(last=False)
+        return grid
+
+    def migrate(self, img: np.ndarray, dt: float, dx: float, v: float):
+        """
+        Méthode appliquant la migration de Stolt à une image (samples x traces).
+
+        Args:
+            img (ndarray): Image à migrer
+            dt (float): Pas d'échantillonnage en temps (s)
+            dx (float): Distance entre deux traces (m)
+            v (float): Vitesse de propagation (m/s)
+
+        Returns:
+            ndarray: Image migrée (float32), même axe temps que l'entrée.
+        """
+        nt, nx = img.shape
+        # Tailles de FFT rapides, avec marge pour éviter le repliement
+        nt_pad = fft.next_fast_len(2 * nt)
+        nx_pad = fft.next_fast_len(nx + nx // 2)
+
+        spectrum = fft.rfft(img, n=nt_pad, axis=0, workers=-1)
+        spectrum = fft.fft(spectrum, n=nx_pad, axis=1, workers=-1).astype(np.complex64)
+
+        i0, i1, w0, w1 = self.grid(nt_pad, nx_pad, dt, dx, v)
+        migrated = w0 * np.take_along_axis(spectrum, i0, axis=0)
+        migrated += w1 * np.take_along_axis(spectrum, i1, axis=0)
+        del spectrum
+
+        migrated = fft.ifft(migrated, axis=1, workers=-1)
+        out = fft.irfft(migrated, n=nt_pad, axis=0, workers=-1)
+        return out[:nt, :nx].astype(np.float32)
+
+def interval_velocity(layers: list, nt: int, dt: float, epsilon: float):
+    """
+    Construit la vitesse d'intervalle de chaque sample à partir d'un modèle en couches.
+
+    Args:
+        layers (list): Couples [t (ns), epsilon] donnant le toit de chaque couche (trié ou non)
+        nt (int): Nombre de samples
+        dt (float): Pas en temps (s)
+        epsilon (float): Permittivité utilisée au-dessus de la première couche (ou partout si layers est vide)
+
+    Returns:
+        ndarray: Vitesse d'intervalle (m/s) pour chaque sample.
+    """
+    eps = np.full(nt, float(epsilon))
+    t = np.arange(nt) * dt * 10.**9
+    for t_top, eps_layer in sorted(layers):
+        eps[t >= t_top] = eps_layer
+    return velocity(eps)
+
+def rms_velocity(v_int: np.ndarray):
+    """
+    Vitesse RMS (Dix) pour chaque sample à partir des vitesses d'intervalle.
+    """
+    return np.sqrt(np.cumsum(v_int**2) / np.arange(1, len(v_int) + 1))
+
+def traveltime_table(nt: int, dt: float, dx: float, v_rms: np.ndarray, aperture: int):
+    """
+    Table des temps de trajet des diffractions: pour chaque temps de sortie tau et chaque décalage
+    de k traces, t = sqrt(tau² + (2 k dx / v_rms(tau))²).
+
+    Returns:
+        tuple: Indice du sample source (nt x aperture+1), fraction d'interpolation et poids d'obliquité (tau/t).
+    """
+    tau = (np.arange(nt) * dt)[:, np.newaxis]
+    h = (np.arange(aperture + 1) * dx)[np.newaxis, :]
+    t = np.sqrt(tau**2 + (2 * h / v_rms[:, np.newaxis])**2)
+    q = t / dt
+    i0 = np.floor(q).astype(np.int32)
+    frac = (q - i0).astype(np.float32)
+    weight = np.divide(tau, t, out=np.ones_like(t), where=t > 0).astype(np.float32)
+    # Hors de la fenêtre d'enregistrement: aucune contribution
+    outside = i0 >= nt - 1
+    i0[outside] = 0
+    frac[outside] = 0
+    weight[outside] = 0
+    return i0, frac, weight
+
+def _kirchhoff_tile(slab: np.ndarray, first: int, width: int, table: tuple):
+    """
+    Sommation des diffractions pour une tuile de traces de sortie.
+
+    Args:
+        slab (ndarray): Traces d'entrée couvrant la tuile et son ouverture
+        first (int): Indice (dans slab) de la première trace de sortie
+        width (int): Nombre de traces de sortie
+        table (tuple): Table des temps de trajet (voir traveltime_table)
+
+    Returns:
+        ndarray: La tuile migrée (nt x width).
+    """
+    i0, frac, weight = table
+    nt, n_slab = slab.shape
+    aperture = i0.shape[1] - 1
+    out = np.zeros((nt, width), dtype=np.float32)
+    xs_out = np.arange(first, first + width)
+    for k in range(-aperture, aperture + 1):
+        xs = xs_out + k
+        valid = (xs >= 0) & (xs < n_slab)
+        if not valid.any():
+            continue
+        cols = xs[valid]
+        it = i0[:, abs(k)][:, np.newaxis]
+        f = frac[:, abs(k)][:, np.newaxis]
+        w = weight[:, abs(k)][:, np.newaxis]
+        out[:, valid] += w * ((1 - f) * slab[it, cols] + f * slab[it + 1, cols])
+    return out
+
+def _table_views(buffer, shape: tuple):
+    """
+    Vues (i0, frac, weight) d'une table des temps de trajet rangée dans un bloc de mémoire (trois tableaux de 4 octets par élément).
+    """
+    n = int(np.prod(shape))
+    return (np.ndarray(shape, dtype=np.int32, buffer=buffer, offset=0),
+            np.ndarray(shape, dtype=np.float32, buffer=buffer, offset=4*n),
+            np.ndarray(shape, dtype=np.float32, buffer=buffer, offset=8*n))
+
+class SharedTable:
+    """SharedTable: Table des temps de trajet en mémoire partagée (seul son nom est envoyé aux processus avec chaque tuile)"""
+    def __init__(self, table: tuple):
+        """
+        Constructeur de la classe SharedTable.
+
+        Args:
+            table (tuple): Table des temps de trajet (voir traveltime_table)
+        """
+        shape = table[0].shape
+        self.shm = shared_memory.SharedMemory(create=True, size=max(12 * int(np.prod(shape)), 1))
+        self.ref = (self.shm.name, shape)
+        self.table = _table_views(self.shm.buf, shape)
+        for view, array in zip(self.table, table):
+            view[...] = array
+        self.users = 0          # Migrations en cours utilisant la table (voir KirchhoffMigration.table)
+        self.retired = False    # Table sortie du cache: libérée par la dernière migration qui l'utilise
+
+    def release(self):
+        """
+        Méthode libérant le bloc (table sortie du cache et plus utilisée).
+        """
+        self.table = None
+        try:
+            self.shm.close()
+        except BufferError:
+            pass # Table encore utilisée par une migration en cours: le bloc est libéré avec elle
+        self.shm.unlink()
+
+# Tables attachées par un processus du pool (nom du bloc -> bloc, vues)
+_worker_tables = OrderedDict()
+
+def _attach_shm(name: str):
+    """
+    Fonction attachant un bloc de mémoire partagée créé par le processus principal, sans l'enregistrer auprès du resource tracker:
+    seul le processus principal le supprime (voir SharedTable.release).
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    # Avant Python 3.13, l'attachement enregistre toujours le bloc (suppression prématurée et avertissements à la fin des processus)
+    register = resource_tracker.register
+    resource_tracker.register = lambda name, rtype: None
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+def _attach_table(ref: tuple, max_tables: int = 4):
+    """
+    Fonction renvoyant, dans un processus du pool, la table désignée par ref (attachée à la première tuile, puis réutilisée).
+    """
+    name, shape = ref
+    if name not in _worker_tables:
+        shm = _attach_shm(name)
+        _worker_tables[name] = (shm, _table_views(shm.buf, shape))
+        while len(_worker_tables) > max_tables:
+            old, _ = _worker_tables.popitem(last=False)[1]
+            try:
+                old.close()
+            except BufferError:
+                pass
+    _worker_tables.move_to_end(name)
+    return _worker_tables[name][1]
+
+def _kirchhoff_shared_tile(slab: np.ndarray, first: int, width: int, ref: tuple):
+    """
+    Sommation des diffractions pour une tuile, la table étant lue en mémoire partagée (voir _kirchhoff_tile).
+    """
+    return _kirchhoff_tile(slab, first, width, _attach_table(ref))
+
+class KirchhoffMigration:
+    """KirchhoffMigration: Migration par sommation des diffractions, vitesse variable avec le temps"""
+    def __init__(self, max_tables: int = 4):
+        """
+        Constructeur de la classe KirchhoffMigration.
+
+        Args:
+            max_tables (int): Nombre de tables de temps de trajet conservées
+        """
+        self.max_tables = max_tables
+        self.tables = OrderedDict()
+        self.lock = threading.Lock()
+        self.executor = None
+        self.workers = None
+        self.pool_users = {} # Pool -> nombre de migrations en cours (un pool remplacé est arrêté par la dernière)
+        self.n_jobs = None   # Nombre de processus par défaut (None: nombre de coeurs)
+
+    ############################ Méthode ############################
+
+    def table(self, nt: int, dt: float, dx: float, v_int: np.ndarray, aperture: int):
+        """
+        Méthode calculant (ou relisant) la table des temps de trajet, partagée par toutes les tuiles (et par les processus du pool).
+        La table est réservée par l'appelant, qui la rend avec release_table une fois toutes ses tuiles terminées.
+
+        Returns:
+            SharedTable: La table en mémoire partagée.
+        """
+        key = (nt, dt, dx, v_int.tobytes(), aperture)
+        with self.lock:
+            if key in self.tables:
+                self.tables.move_to_end(key)
+                table = self.tables[key]
+                table.users += 1
+                return table
+        table = SharedTable(traveltime_table(nt, dt, dx, rms_velocity(v_int), aperture))
+        with self.lock:
+            if key in self.tables:
+                # Calculée entre-temps par un autre thread
+                table.release()
+                table = self.tables[key]
+            else:
+                self.tables[key] = table
+                while len(self.tables) > self.max_tables:
+                    old = self.tables.popitem(last=False)[1]
+                    old.retired = True
+                    if(old.users == 0):
+                        old.release()
+            table.users += 1
+        return table
+
+    def release_table(self, table: SharedTable):
+        """
+        Méthode rendant une table réservée par table(): une table sortie du cache est libérée par sa dernière migration.
+        """
+        with self.lock:
+            table.users -= 1
+            if(table.retired and table.users == 0):
+                table.release()
+
+    def pool(self, n_jobs: int):
+        """
+        Méthode réservant le pool de n_jobs processus (créé au premier appel puis réutilisé tant que n_jobs ne change pas).
+        L'appelant le rend avec release_pool: un pool remplacé n'est arrêté qu'une fois ses migrations terminées.
+        """
+        with self.lock:
+            if self.executor != None and self.workers != n_jobs:
+                self.retire_pool()
+            if self.executor == None:
+                # "spawn" évite de dupliquer les threads de l'interface (préchargement) dans les processus fils
+                self.executor = ProcessPoolExecutor(max_workers=n_jobs, mp_context=multiprocessing.get_context("spawn"))
+                self.workers = n_jobs
+            self.pool_users[self.executor] = self.pool_users.get(self.executor, 0) + 1
+            return self.executor
+
+    def retire_pool(self):
+        """
+        Méthode remplaçant le pool courant (verrou déjà pris): il est arrêté tout de suite s'il n'est pas utilisé.
+        """
+        executor = self.executor
+        self.executor = None
+        if(self.pool_users.get(executor, 0) == 0):
+            self.pool_users.pop(executor, None)
+            executor.shutdown(wait=False)
+
+    def release_pool(self, executor: ProcessPoolExecutor, broken: bool = False):
+        """
+        Méthode rendant un pool réservé par pool(). Un pool inutilisable (broken) est remplacé au prochain appel.
+        """
+        with self.lock:
+            if(broken and executor is self.executor):
+                self.retire_pool()
+            self.pool_users[executor] -= 1
+            if(self.pool_users[executor] == 0 and executor is not self.executor):
+                del self.pool_users[executor]
+                executor.shutdown(wait=False)
+
+    def close(self):
+        """
+        Méthode arrêtant le pool et libérant les tables en mémoire partagée (fin du programme).
+        """
+        with self.lock:
+            if self.executor != None:
+                self.executor.shutdown(wait=False)
+                self.executor = None
+            self.pool_users.clear()
+            while len(self.tables) != 0:
+                self.tables.popitem(last=False)[1].release()
+
+    def migrate(self, img: np.ndarray, dt: float, dx: float, v_int: np.ndarray, aperture: int, tile_width: int = 512, n_jobs: int = None):
+        """
+        Méthode appliquant la migration de Kirchhoff à une image (samples x traces).
+
+        Args:
+            img (ndarray): Image à migrer
+            dt (float): Pas en temps (s)
+            dx (float): Distance entre deux traces (m)
+            v_int (ndarray): Vitesse d'intervalle pour chaque sample (m/s)
+            aperture (int): Demi-ouverture en traces
+            tile_width (int): Nombre de traces de sortie par tuile
+            n_jobs (int): Nombre de processus (par défaut: self.n_jobs, sinon nombre de coeurs)
+
+        Returns:
+            ndarray: Image migrée (float32).
+        """
+        nt, nx = img.shape
+        img = np.ascontiguousarray(img, dtype=np.float32)
+        if(n_jobs == None):
+            n_jobs = self.n_jobs
+        if(n_jobs == None):
+            n_jobs = os.cpu_count()
+
+        tiles = []
+        for x0 in range(0, nx, tile_width):
+            x1 = min(x0 + tile_width, nx)
+            s0 = max(x0 - aperture, 0)
+            s1 = min(x1 + aperture, nx)
+            tiles.append((x0, x1, img[:, s0:s1], x0 - s0))
+
+        out = np.empty((nt, nx), dtype=np.float32)
+        # Table réservée pendant toute la migration: elle n'est pas libérée si elle sort du cache entre-temps
+        table = self.table(nt, dt, dx, np.asarray(v_int, dtype=np.float64), aperture)
+        try:
+            if(n_jobs <= 1 or len(tiles) == 1):
+                for x0, x1, slab, first in tiles:
+                    out[:, x0:x1] = _kirchhoff_tile(slab, first, x1 - x0, table.table)
+            else:
+                self.migrate_pool(out, tiles, table, n_jobs)
+        finally:
+            self.release_table(table)
+        return out
+
+    def migrate_pool(self, out: np.ndarray, tiles: list, table: SharedTable, n_jobs: int):
+        """
+        Méthode calculant les tuiles dans le pool de processus (la table n'est pas copiée avec chaque tuile: les processus l'attachent par son nom).
+        """
+        pool = self.pool(n_jobs)
+        broken = False
+        futures = []
+        try:
+            futures = [(x0, x1, pool.submit(_kirchhoff_shared_tile, slab, first, x1 - x0, table.ref)) for x0, x1, slab, first in tiles]
+            for x0, x1, future in futures:
+                out[:, x0:x1] = future.result()
+        except BrokenProcessPool:
+            # Pool inutilisable: il est recréé au prochain appel et la migration se termine dans ce processus
+            broken = True
+            for x0, x1, slab, first in tiles:
+                out[:, x0:x1] = _kirchhoff_tile(slab, first, x1 - x0, table.table)
+        finally:
+            # Aucune tuile ne lit encore la table quand elle est rendue
+            wait([future for _, _, future in futures])
+            self.release_pool(pool, broken)
+
+# Moteurs partagés (les grilles et tables sont réutilisées d'un fichier à l'autre)
+fk_engine = FKMigration()
+kirchhoff_engine = KirchhoffMigration()
+atexit.register(kirchhoff_engine.close)
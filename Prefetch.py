@@ -0,0 +1,103 @@
+import json
+import threading
+import traceback
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, CancelledError
+
+class Prefetcher:
+    """Prefetcher: Classe permettant de charger et traiter en arrière-plan les fichiers voisins"""
+    def __init__(self, load, max_items: int = 8, workers: int = 2):
+        """
+        Constructeur de la classe Prefetcher.
+
+        Args:
+            load (callable): Fonction (chemin, paramètres) -> image traitée
+            max_items (int): Nombre maximal d'images conservées en mémoire (LRU)
+            workers (int): Nombre de threads de préchargement
+        """
+        self.load = load
+        self.max_items = max_items
+        self.images = OrderedDict()
+        self.pending = {}
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+
+    ############################ Méthode ############################
+
+    def key(self, path: str, params: dict):
+        return path, json.dumps(params, sort_keys=True)
+
+    def get(self, path: str, params: dict):
+        """
+        Méthode renvoyant l'image traitée si elle est en mémoire ou en cours de préchargement.
+
+        Returns:
+            ndarray | None: L'image traitée ou None si elle n'a pas été préchargée.
+        """
+        key = self.key(path, params)
+        with self.lock:
+            if key in self.images:
+                self.images.move_to_end(key)
+                return self.images[key]
+            future = self.pending.get(key)
+        if future != None:
+            # Le fichier est en cours de traitement: on attend le résultat plutôt que de recommencer
+            try:
+                return future.result()
+            except CancelledError:
+                return None
+        return None
+
+    def put(self, path: str, params: dict, img):
+        """
+        Méthode ajoutant une image traitée dans le cache mémoire (éviction LRU).
+        """
+        if img is None:
+            return
+        key = self.key(path, params)
+        with self.lock:
+            self.images[key] = img
+            self.images.move_to_end(key)
+            while len(self.images) > self.max_items:
+                self.images.popitem(last=False)
+
+    def prefetch(self, requests: list):
+        """
+        Méthode planifiant le chargement des fichiers demandés. Les préchargements devenus inutiles sont annulés.
+
+        Args:
+            requests (list): Liste de couples (chemin, paramètres), du plus prioritaire au moins prioritaire
+        """
+        keys = [self.key(path, params) for path, params in requests]
+        with self.lock:
+            for key, future in list(self.pending.items()):
+                if key not in keys and future.cancel():
+                    del self.pending[key]
+            for key, (path, params) in zip(keys, requests):
+                if key in self.images or key in self.pending:
+                    continue
+                future = self.executor.submit(self._task, key, path, params)
+                self.pending[key] = future
+
+    def _task(self, key, path: str, params: dict):
+        try:
+            img = self.load(path, params)
+            self.put(path, params, img)
+            return img
+        except:
+            print("Erreur lors du préchargement:")
+            traceback.print_exc()
+            return None
+        finally:
+            with self.lock:
+                self.pending.pop(key, None)
+
+    def clear(self):
+        """
+        Méthode vidant le cache mémoire et annulant les préchargements en attente.
+        """
+        with self.lock:
+            for future in self.pending.values():
+                future.cancel()
+            self.pending.clear()
+            self.images.clear()
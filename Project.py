@@ -0,0 +1,195 @@
+import os
+import json
+import copy
+import threading
+
+# Réglages d'une session: attributs de MainWindow (valeurs), textes des champs, boutons on/off et listes déroulantes
+VALUES = ["t0_lin_value", "t0_exp_value", "gain_const_value", "gain_lin_value", "gain_exp_value", "cb_value", "ce_value",
+          "sub_mean_value", "svd_value", "agc_value", "whitening_value", "decon_value", "cutoff_value", "sampling_value",
+          "layers_value", "aperture_value", "epsilon", "def_value"]
+ENTRIES = ["def_entry", "epsilon_entry", "gain_const_entry", "gain_lin_entry", "t0_lin_entry", "gain_exp_entry", "t0_exp_entry",
+           "agc_entry", "cb_entry", "ce_entry", "sub_mean_entry", "svd_entry", "whitening_entry", "decon_entry",
+           "cutoff_entry", "sampling_entry", "layers_entry", "aperture_entry"]
+# État -> bouton associé (style actif)
+STATES = {"dewow_state": "dewow_button", "inv_state": "inv_button", "inv_list_state": "inv_list_button",
+          "equal_state": "eq_button", "cache_state": "cache_button"}
+CHOICES = ["abs_unit", "ord_unit", "attribute_choice", "time_zero_choice", "agc_choice", "migration_choice"]
+
+def canonical_params(settings: dict, file_index: int, max_tr: int = None):
+    """
+    Fonction rassemblant les paramètres de la chaîne de traitement d'un fichier sous une forme canonique (clé des caches).
+    Utilisée par l'interface et par le traitement par lots: les mêmes réglages donnent les mêmes clés.
+
+    Args:
+        settings (dict): Réglages (voir MainWindow.settings)
+        file_index (int): Indice du fichier dans la liste (inversement des profils pairs)
+        max_tr (int): Nombre de traces maximal de la liste (égalisation)
+
+    Returns:
+        dict: Les paramètres utilisés par RadarController.process.
+    """
+    values = settings["values"]
+    states = settings["states"]
+    choices = settings["choices"]
+    entries = settings["entries"]
+
+    flip = (states["inv_state"] == "on")
+    if(states["inv_list_state"] == "on" and file_index % 2 != 0):
+        flip = not flip
+
+    if(entries["cutoff_entry"] != '' and entries["sampling_entry"] != ''):
+        cutoff_params = [values["cutoff_value"], values["sampling_value"]]
+    else:
+        cutoff_params = [None, None]
+
+    if(states["equal_state"] != "on"):
+        max_tr = None
+
+    # La migration dépend de la vitesse (epsilon) et du pas entre les traces
+    migration = None
+    epsilon = None
+    distance = None
+    layers = None
+    aperture = None
+    if(choices["migration_choice"] != "Aucune"):
+        migration = choices["migration_choice"]
+        epsilon = values["epsilon"]
+        distance = values["def_value"]
+    if(migration == "Kirchhoff"):
+        layers = values["layers_value"]
+        aperture = values["aperture_value"]
+
+    # L'AGC n'est active qu'avec un niveau choisi et une fenêtre valide
+    agc = None
+    agc_mode = None
+    if(choices["agc_choice"] != "Désactivé" and values["agc_value"] != None):
+        agc = values["agc_value"]
+        agc_mode = choices["agc_choice"]
+
+    time_zero = None
+    if(choices["time_zero_choice"] != "Manuel"):
+        time_zero = choices["time_zero_choice"]
+
+    return {
+        "time_zero": time_zero,
+        "cb": int(values["cb_value"]),
+        "ce": int(values["ce_value"]),
+        "dewow": states["dewow_state"] == "on",
+        "cutoff": cutoff_params[0],
+        "sampling": cutoff_params[1],
+        "sub_mean": values["sub_mean_value"],
+        "svd": values["svd_value"],
+        "decon": values["decon_value"],
+        "whitening": values["whitening_value"],
+        "flip": flip,
+        "t0_lin": values["t0_lin_value"],
+        "t0_exp": values["t0_exp_value"],
+        "g": values["gain_const_value"],
+        "a_lin": values["gain_lin_value"],
+        "a": values["gain_exp_value"],
+        "max_tr": max_tr,
+        "migration": migration,
+        "epsilon": epsilon,
+        "distance": distance,
+        "layers": layers,
+        "aperture": aperture,
+        "agc": agc,
+        "agc_mode": agc_mode
+    }
+
+def to_json(value):
+    """
+    Fonction convertissant les scalaires numpy (valeurs issues des calculs) pour l'écriture JSON.
+    """
+    if hasattr(value, "item"):
+        return value.item()
+    raise TypeError(f"Type non sérialisable: {type(value)}")
+
+class Project:
+    """Project: Fichier de projet (dossier, liste et fichier sélectionné, réglages, préréglages nommés et réglages propres à certains fichiers)"""
+    version = 1
+
+    def __init__(self, filename: str = None):
+        """
+        Constructeur de la classe Project.
+
+        Args:
+            filename (str): Fichier du projet (JSON), None tant que le projet n'est pas enregistré
+        """
+        self.filename = filename
+        self.folder = None
+        self.files = []         # Liste affichée (l'indice d'un fichier détermine l'inversement des profils pairs)
+        self.file = None        # Fichier sélectionné
+        self.filters = {}       # Textes des boutons de filtrage de la liste
+        self.settings = None    # Réglages courants
+        self.presets = {}       # Nom -> réglages
+        self.overrides = {}     # Fichier -> réglages propres
+        self.lock = threading.Lock()
+
+    ############################ Méthode ############################
+
+    def load(self, filename: str = None):
+        """
+        Méthode lisant le fichier du projet.
+        """
+        if(filename != None):
+            self.filename = filename
+        with open(self.filename, "r") as project_file:
+            data = json.load(project_file)
+        if(data.get("version", 1) > self.version):
+            raise ValueError(f"Version de projet non prise en charge: {data['version']}")
+        self.folder = data.get("folder")
+        self.files = data.get("files", [])
+        self.file = data.get("file")
+        self.filters = data.get("filters", {})
+        self.settings = data.get("settings")
+        self.presets = data.get("presets", {})
+        self.overrides = data.get("overrides", {})
+        return self
+
+    def save(self, filename: str = None):
+        """
+        Méthode écrivant le fichier du projet (écriture dans un fichier temporaire puis remplacement: jamais de projet tronqué).
+        """
+        if(filename != None):
+            self.filename = filename
+        data = {
+            "version": self.version,
+            "folder": self.folder,
+            "files": self.files,
+            "file": self.file,
+            "filters": self.filters,
+            "settings": self.settings,
+            "presets": self.presets,
+            "overrides": self.overrides
+        }
+        with self.lock:
+            os.makedirs(os.path.dirname(os.path.abspath(self.filename)), exist_ok=True)
+            tmp = self.filename + "." + str(os.getpid()) + ".tmp"
+            with open(tmp, "w") as project_file:
+                json.dump(data, project_file, indent=4, default=to_json)
+            os.replace(tmp, self.filename)
+
+    def effective(self, file: str):
+        """
+        Méthode renvoyant les réglages d'un fichier: ses réglages propres s'il en a, sinon ceux du projet.
+        """
+        return self.overrides.get(file, self.settings)
+
+    def set_settings(self, settings: dict):
+        self.settings = copy.deepcopy(settings)
+
+    def set_preset(self, name: str, settings: dict):
+        self.presets[name] = copy.deepcopy(settings)
+
+    def preset(self, name: str):
+        return copy.deepcopy(self.presets[name])
+
+    def remove_preset(self, name: str):
+        self.presets.pop(name, None)
+
+    def set_override(self, file: str, settings: dict):
+        self.overrides[file] = copy.deepcopy(settings)
+
+    def remove_override(self, file: str):
+        self.overrides.pop(file, None)
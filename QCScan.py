@@ -0,0 +1,158 @@
+import numpy as np
+from collections import OrderedDict
+from PyQt6.QtCore import Qt
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QLabel, QSlider
+from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+from matplotlib.figure import Figure
+
+class CScanView:
+    """CScanView: Vue des coupes horizontales (C-scans) du volume des profils, parcourues avec un curseur"""
+    def __init__(self, parent, max_slices: int = 64, max_columns: int = 1500):
+        """
+        Constructeur de la classe CScanView.
+
+        Args:
+            parent (MainWindow): Fenêtre principale
+            max_slices (int): Nombre de coupes conservées en mémoire (LRU)
+            max_columns (int): Nombre maximal de colonnes affichées (les traces sont moyennées par blocs au-delà)
+        """
+        self.parent = parent
+        self.max_slices = max_slices
+        self.max_columns = max_columns
+        self.slices = OrderedDict()
+        self.volume = None
+        self.image = None
+        self.dt_ns = 1.
+        self.t_offset = 0
+        self.thickness = 16
+        self.depths = None
+
+        self.widget = QWidget()
+        layout = QVBoxLayout(self.widget)
+
+        self.figure = Figure(figsize=(4, 4), facecolor='none')
+        self.axes = self.figure.add_subplot(111)
+        self.figure.subplots_adjust(left=0.18, bottom=0.15)
+        self.axes.set_axis_off()
+        self.canvas = FigureCanvas(self.figure)
+        layout.addWidget(self.canvas)
+        # Après un dessin complet (axes, graduations), seule l'image est redessinée (blit)
+        self.drawn = False
+        self.canvas.mpl_connect('draw_event', self.on_draw)
+
+        self.slice_label = QLabel("")
+        self.slice_label.setAlignment(Qt.AlignmentFlag.AlignHCenter)
+        layout.addWidget(self.slice_label)
+
+        self.slider = QSlider(Qt.Orientation.Horizontal)
+        self.slider.setRange(0, 0)
+        self.slider.valueChanged.connect(self.show_slice)
+        layout.addWidget(self.slider)
+        layout.addStretch()
+
+    ############################ Méthode ############################
+
+    def set_volume(self, volume, dt_ns: float, t_offset: int = 0, thickness: int = 16, depths: np.ndarray = None):
+        """
+        Méthode associant un volume à la vue (les coupes en mémoire sont oubliées).
+
+        Args:
+            volume (Volume): Volume ouvert
+            dt_ns (float): Pas en temps (ns)
+            t_offset (int): Sample du fichier correspondant au premier sample du volume (découpage)
+            thickness (int): Épaisseur des coupes (samples)
+            depths (ndarray): Profondeur de chaque sample du fichier (modèle de vitesse), None sinon
+        """
+        self.volume = volume
+        self.depths = depths
+        self.dt_ns = dt_ns
+        self.t_offset = t_offset
+        self.thickness = thickness
+        self.slices.clear()
+        self.image = None
+        self.drawn = False
+        self.axes.clear()
+        self.axes.set_xlabel("Traces")
+        self.axes.set_ylabel("Profils")
+
+        # Le curseur avance d'une tranche précalculée du volume
+        n_samp = volume.shape()[0]
+        self.slider.blockSignals(True)
+        self.slider.setRange(0, max(0, (n_samp - 1) // volume.slab))
+        self.slider.setValue(0)
+        self.slider.blockSignals(False)
+        self.show_slice(0)
+
+    def get_slice(self, index: int):
+        """
+        Méthode renvoyant la coupe index (moyenne des amplitudes absolues) et sa borne d'affichage, depuis le cache LRU si possible.
+
+        Returns:
+            tuple: Coupe (profils x colonnes affichées), valeur maximale affichée.
+        """
+        if index in self.slices:
+            self.slices.move_to_end(index)
+            return self.slices[index]
+
+        t0 = index * self.volume.slab
+        cscan = self.volume.cscan(t0, t0 + self.thickness)
+
+        # Moyenne par blocs de traces: l'image affichée reste petite quel que soit le nombre de traces
+        n_profiles, n_tr = cscan.shape
+        factor = -(-n_tr // self.max_columns)
+        if(factor > 1):
+            n_cols = n_tr // factor
+            block = cscan[:, 0:n_cols * factor:factor].copy()
+            for k in range(1, factor):
+                block += cscan[:, k:n_cols * factor:factor]
+            cscan = block / factor
+
+        # Borne d'affichage: percentile 99.5 par sélection partielle (sans tri complet)
+        values = cscan.ravel()
+        k = int(0.995 * (values.size - 1))
+        vmax = float(np.partition(values, k)[k]) if values.size else 1.
+        self.slices[index] = (cscan, vmax if vmax > 0 else 1.)
+        while len(self.slices) > self.max_slices:
+            self.slices.popitem(last=False)
+        return self.slices[index]
+
+    def show_slice(self, index: int):
+        """
+        Méthode affichant la coupe index (l'image existante est mise à jour plutôt que recréée).
+        """
+        if self.volume is None:
+            return
+        cscan, vmax = self.get_slice(index)
+        n_tr = self.volume.shape()[2]
+        t0 = self.t_offset + index * self.volume.slab
+        t1 = min(t0 + self.thickness, self.t_offset + self.volume.shape()[0])
+        text = f"C-scan {t0 * self.dt_ns:.2f} - {t1 * self.dt_ns:.2f} ns"
+        if self.depths is not None:
+            last = len(self.depths) - 1
+            text += f" | {self.depths[min(t0, last)]:.2f} - {self.depths[min(t1, last)]:.2f} m"
+        self.slice_label.setText(text)
+
+        if self.image is None or self.image.get_array().shape != cscan.shape:
+            self.axes.clear()
+            self.image = self.axes.imshow(cscan, cmap="gray", aspect="auto", interpolation="nearest", origin="lower",
+                                          extent=[0, n_tr, -0.5, cscan.shape[0] - 0.5], vmin=0., vmax=vmax)
+            self.axes.set_xlabel("Traces")
+            self.axes.set_ylabel("Profils")
+            self.drawn = False
+            self.canvas.draw_idle()
+            return
+
+        self.image.set_data(cscan)
+        self.image.set_clim(0., vmax)
+        if(self.drawn):
+            # L'image couvre tout le cadre des axes: pas de fond à restaurer
+            self.axes.draw_artist(self.image)
+            self.canvas.blit(self.axes.bbox)
+        else:
+            self.canvas.draw_idle()
+
+    def on_draw(self, event):
+        """
+        Méthode appelée après chaque dessin complet du canvas (le blit devient possible).
+        """
+        self.drawn = True
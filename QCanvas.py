@@ -1,11 +1,12 @@
-import matplotlib.pyplot as plt
+import os
+import numpy as np
 from PyQt6.QtCore import Qt
+from PyQt6.QtWidgets import QListWidgetItem
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
-from Forms import Point, Points, Rectangle, Rectangles
-from RadarData import cste_global
-from math import sqrt
-from Export import ExJsonRectangle, ExJsonPoint, ExJsonNone
+from Forms import Point, Rectangle, Shapes, labels
+from Export import ExJsonShapes
+from Annotations import POINT, RECTANGLE, shape_dtype
 
 CURSOR_DEFAULT = Qt.CursorShape.ArrowCursor
 CURSOR_POINT = Qt.CursorShape.PointingHandCursor
@@ -27,9 +28,20 @@ class Canvas:
         self.Point = None
         self.Rectangle = None
 
-        self.Points = Points()
-        self.Rectangles = Rectangles()
-        self.shapes = []
+        self.shapes = Shapes()
+        self.items = {} # Identifiant de forme -> ligne de shape_list
+
+        # Annotations enregistrées (par fichier), replacées avec les conversions d'unités du fichier (MainWindow.transform)
+        self.file_path = None
+        self.stored = {}
+        self.current_scale = None # Conversions des formes affichées, None tant qu'aucune forme n'a été replacée après le rendu
+        self.pending = {} # Fichier -> formes en cours (normalisées, non exportées), même vides
+
+        # Clic droit: déplacement de la forme touchée, ou sélection par zone
+        self.hit_tolerance = 6 # pixels
+        self.dragged = None
+        self.drag_from = None
+        self.selection_from = None
 
         self._cursor = CURSOR_DRAW
 
@@ -74,7 +86,7 @@ class Canvas:
                     self.Pointer.set(x, y)
                     #self.parent.pt.setText(str(int(y)))
                     self.parent.plot_scope()
-                    self.Pointer.plot(self.axes,self.axes_scope)
+                    self.Pointer.plot(self.axes)
                     self.canvas.draw()
                     #self.canvasScope.draw()
                     
@@ -83,13 +95,26 @@ class Canvas:
                         # Sauvegarder le fond de la toile pour utiliser blit
                         #self.background = self.canvas.copy_from_bbox(self.axes.bbox)
                         # Dessiner le Rectangle temporaire
-                        self.Rectangle = Rectangle(self.parent.class_choice.currentText(), x, y, 0., 0.)
-                        self.Rectangle.plot(self.axes)
+                        self.Rectangle = Rectangle(self.parent.class_choice.currentText(), x, y, x, y)
+                        self.background = self.canvas.copy_from_bbox(self.axes.bbox)
         else:
-            if(event.button == 3):
-                print("test")
+            if(event.button == 3 and event.xdata is not None and event.ydata is not None):
+                id = self.hit(event)
+                if(id != None):
+                    self.parent.shape_list.setCurrentItem(self.items[id])
+                    self.dragged = id
+                    self.drag_from = (event.xdata, event.ydata)
+                else:
+                    self.selection_from = (event.xdata, event.ydata)
 
     def MouseMoveEvent(self, event):
+        if(self.dragged != None):
+            if(event.xdata is not None and event.ydata is not None):
+                self.shapes.move(self.dragged, event.xdata - self.drag_from[0], event.ydata - self.drag_from[1])
+                self.drag_from = (event.xdata, event.ydata)
+                self.shapes.kinds[self.dragged].plot(self.axes)
+                self.canvas.draw_idle()
+            return
         if(self.mode == "Rectangle"):
             if(event.button == 1):
                 # Récupérer les coordonnées de la souris pendant le glissement
@@ -102,11 +127,21 @@ class Canvas:
                     self.Rectangle.update_rectangle(x2, y2)
 
                     # Utiliser blit pour mettre à jour seulement le Rectangle
-                    #self.canvas.restore_region(self.background)
+                    self.canvas.restore_region(self.background)
                     self.Rectangle.temporay_plot(self.axes)
-                    #self.canvas.blit(self.axes.bbox)
+                    self.canvas.blit(self.axes.bbox)
 
     def MouseReleaseEvent(self, event):
+        if(event.button == 3):
+            if(self.dragged != None):
+                self.items[self.dragged].setText(self.shape_text(self.shapes[self.dragged]))
+                self.dragged = None
+                self.canvas.draw()
+            elif(self.selection_from != None):
+                if(event.xdata is not None and event.ydata is not None):
+                    self.select_region(self.selection_from[0], self.selection_from[1], event.xdata, event.ydata)
+                self.selection_from = None
+            return
         if(self.mode == "Point"):
             if(event.button == 1):
                 # Récupérer les coordonnées du relâchement de la souris
@@ -115,11 +150,9 @@ class Canvas:
                 # Vérifier si les coordonnées sont valides
                 if(x is not None and y is not None):
                     self.Point = Point(self.parent.class_choice.currentText(), x, y)
-                    self.Points.add(self.Point)
-                    self.shapes.append(self.Point)
-                    self.parent.shape_list.addItem(str(self.Point.label)+"(Point,"+str(round(x,2))+","+str(round(y,2))+")")
+                    self.add_shape(self.Point)
 
-                    self.Point.plot(self.axes)
+                    self.shapes.points.plot(self.axes)
 
                     self.canvas.draw()
         else:
@@ -134,15 +167,69 @@ class Canvas:
                         # Dessiner le Rectangle final
                         self.Rectangle.update_rectangle(x, y)
                         if(self.Rectangle.x1 != self.Rectangle.x2 and self.Rectangle.y1 != self.Rectangle.y2):
-                            self.Rectangle.plot(self.axes)
-                            self.Rectangles.add(self.Rectangle)
-                            self.shapes.append(self.Rectangle)
-
-                            x1, y1, x2, y2 = self.Rectangle.get_ord_data()
-                            self.parent.shape_list.addItem(str(self.Rectangle.label)+"(Rectangle,"+str(round(x1,2))+","+str(round(y1,2))+","+str(round(x2,2))+","+str(round(y2,2))+")")
+                            self.add_shape(self.Rectangle)
+                            self.shapes.rectangles.plot(self.axes)
 
                         self.canvas.draw()
 
+    def shape_text(self, shape):
+        """
+        Méthode renvoyant le texte affiché dans shape_list pour une forme.
+        """
+        if isinstance(shape, Rectangle):
+            x1, y1, x2, y2 = shape.get_ord_data()
+            return str(shape.label)+"(Rectangle,"+str(round(x1,2))+","+str(round(y1,2))+","+str(round(x2,2))+","+str(round(y2,2))+")"
+        return str(shape.label)+"(Point,"+str(round(shape.x,2))+","+str(round(shape.y,2))+")"
+
+    def add_item(self, shape):
+        """
+        Méthode ajoutant la ligne d'une forme dans shape_list (la ligne porte l'identifiant de la forme).
+        """
+        item = QListWidgetItem(self.shape_text(shape))
+        item.setData(Qt.ItemDataRole.UserRole, shape.id)
+        self.parent.shape_list.addItem(item)
+        self.items[shape.id] = item
+
+    def add_shape(self, shape):
+        """
+        Méthode enregistrant une forme (identifiant stable, index spatial, liste des formes).
+        """
+        self.shapes.add(shape)
+        self.add_item(shape)
+        return shape.id
+
+    def add_points(self, label: str, xs, ys):
+        """
+        Méthode ajoutant plusieurs points (ex: détections automatiques) en bloc, avec un seul rafraîchissement du canvas.
+        """
+        shape_list = self.parent.shape_list
+        shape_list.setUpdatesEnabled(False)
+        for id, x, y in zip(self.shapes.add_points(label, xs, ys), xs, ys):
+            point = Point(label, float(x), float(y))
+            point.id = id
+            self.add_item(point)
+        shape_list.setUpdatesEnabled(True)
+        self.shapes.points.plot(self.axes)
+        self.canvas.draw()
+
+    def hit(self, event):
+        """
+        Méthode renvoyant l'identifiant de la forme sous la souris (tolérance en pixels), None sinon.
+        """
+        inverse = self.axes.transData.inverted()
+        x0, y0 = inverse.transform((event.x, event.y))
+        x1, y1 = inverse.transform((event.x + self.hit_tolerance, event.y + self.hit_tolerance))
+        return self.shapes.hit(event.xdata, event.ydata, abs(x1 - x0), abs(y1 - y0))
+
+    def select_region(self, x1: float, y1: float, x2: float, y2: float):
+        """
+        Méthode sélectionnant dans shape_list les formes contenues dans la zone.
+        """
+        shape_list = self.parent.shape_list
+        shape_list.clearSelection()
+        for id in self.shapes.select(x1, y1, x2, y2):
+            self.items[id].setSelected(True)
+
     def reset_axes(self, axes, parent):
         # Réinitialisation de l'axe
         self.axes = axes
@@ -150,45 +237,79 @@ class Canvas:
         self.Pointer = Pointer(None, None, parent)
         self.Point = None
         self.Rectangle = None
+        self.dragged = None
+        self.selection_from = None
+
+        self.stash()
 
-        self.Points = Points()
-        self.Rectangles = Rectangles()
         self.shapes.clear()
+        self.items.clear()
+        self.parent.shape_list.clear()
+
+    def stash(self):
+        """
+        Méthode conservant (normalisées) les formes en cours du fichier affiché pour les replacer après le rendu:
+        un fichier dont toutes les formes ont été supprimées reste vide (la base n'est pas relue).
+        """
+        if(self.current_scale != None):
+            # Fichiers les plus récemment affichés en dernier: le plus ancien est oublié au-delà de 16 fichiers
+            self.pending.pop(self.file_path, None)
+            while(len(self.pending) >= 16):
+                self.pending.pop(next(iter(self.pending)))
+            self.pending[self.file_path] = self.normalized(self.current_scale)
+        self.current_scale = None
+
+    def refresh_list(self):
+        """
+        Méthode reconstruisant shape_list à partir des formes restantes (suppressions en masse).
+        """
+        shape_list = self.parent.shape_list
+        shape_list.setUpdatesEnabled(False)
+        shape_list.clear()
+        self.items.clear()
+        for shape in self.shapes:
+            self.add_item(shape)
+        shape_list.setUpdatesEnabled(True)
 
     def clear_pointer(self):
         self.Pointer.clear(self.axes)
         self.canvas.draw()
 
-    def clear_point(self, index):
-        point = self.shapes[index]
-        if point in self.Points.points:
-            self.parent.shape_list.takeItem(index)
-            self.shapes.remove(point)
-            self.Points.clear(point)
+    def remove_shape(self, id: int):
+        """
+        Méthode supprimant une forme (tableaux, index spatial); la ligne de shape_list et le canvas ne sont pas touchés.
+        """
+        self.shapes.remove(id)
+        return self.items.pop(id)
+
+    def clear_shape(self, id: int):
+        if id in self.shapes:
+            kind = self.shapes.kinds[id]
+            item = self.remove_shape(id)
+            self.parent.shape_list.takeItem(self.parent.shape_list.row(item))
+            kind.plot(self.axes)
+            self.canvas.draw()
+
+    def clear_shapes(self, ids):
+        """
+        Méthode supprimant plusieurs formes avec une seule reconstruction de shape_list et un seul rafraîchissement.
+        """
+        ids = [id for id in ids if id in self.shapes]
+        if(len(ids) == 1):
+            self.clear_shape(ids[0])
+        elif(len(ids) > 1):
+            for id in ids:
+                self.remove_shape(id)
+            self.refresh_list()
+            self.shapes.plot(self.axes)
             self.canvas.draw()
 
     def clear_points(self):
-        for point in self.Points.points:
-            index = self.shapes.index(point)
-            self.parent.shape_list.takeItem(index)
-            self.shapes.remove(point)
-        self.Points.clear_all()
+        self.clear_shapes(self.shapes.points.ids())
         self.canvas.draw()
 
-    def clear_rectangle(self, index):
-        rectangle = self.shapes[index]
-        if rectangle in self.Rectangles.rectangles:
-            self.parent.shape_list.takeItem(index)
-            self.shapes.remove(rectangle)
-            self.Rectangles.clear(rectangle)
-            self.canvas.draw()
-
     def clear_rectangles(self):
-        for rectangle in self.Rectangles.rectangles:
-            index = self.shapes.index(rectangle)
-            self.parent.shape_list.takeItem(index)
-            self.shapes.remove(rectangle)
-        self.Rectangles.clear_all()
+        self.clear_shapes(self.shapes.rectangles.ids())
         self.canvas.draw()
 
     def clear_canvas(self):
@@ -201,72 +322,103 @@ class Canvas:
     def del_ele_list(self):
         #print("Avant suppression:")
         #self.test_list()
-        selected_item = self.parent.shape_list.currentItem()  # Récupère l'élément sélectionné
-        if selected_item:
-            text = selected_item.text()  # Récupère le texte de l'élément
-            index = self.parent.shape_list.row(selected_item)  # Récupère l'index de l'élément
-
-            if "Point" in text:
-                self.clear_point(index)
-            elif "Rectangle" in text:
-                self.clear_rectangle(index)
+        selected_items = self.parent.shape_list.selectedItems() # Récupère les éléments sélectionnés
+        if(len(selected_items) == 0 and self.parent.shape_list.currentItem()):
+            selected_items = [self.parent.shape_list.currentItem()]
+        self.clear_shapes([item.data(Qt.ItemDataRole.UserRole) for item in selected_items])
         #print("Après Suppression:")
         #self.test_list()
 
-    def export_json(self): #A débug ? 
-        n_tr = self.parent.feature[0]
-        n_samp = self.parent.feature[1]
-        if(self.parent.def_value != None):
-            d_max = self.parent.def_value
-        else:
-            d_max = self.parent.feature[2]
-        t_max = self.parent.feature[3]
-        p_max = (t_max * 10.**(-9)) * (cste_global["c_lum"] / sqrt(self.parent.epsilon)) / 2
-        step_time = self.parent.feature[5]
-
-        L_xmax = [d_max, step_time*n_tr, n_tr]
-        L_ymax = [p_max, t_max, n_samp]
+    def scale(self):
+        """
+        Méthode renvoyant les conversions et les unités courantes (coordonnées normalisées <-> coordonnées des axes).
 
+        Returns:
+            tuple: Conversions du fichier (CoordinateTransform), unité des abscisses, unité des ordonnées.
+        """
         xindex = self.parent.Xunit.index(self.parent.abs_unit.currentText())
         yindex = self.parent.Yunit.index(self.parent.ord_unit.currentText())
+        return self.parent.transform(), xindex, yindex
 
-        if(self.parent.cb_value != 0 and self.parent.ce_value == None):
-            #print(f"Avant:{L_ymax[yindex]}")
-            L_ymax[yindex] = L_ymax[yindex] - (self.parent.cb_value / n_samp) * L_ymax[yindex]
-            #print(f"Après:{L_ymax[yindex]}")
+    def normalized(self, scale: tuple):
+        """
+        Méthode renvoyant les formes en coordonnées normalisées (calcul en bloc sur les tableaux d'annotations), dans l'ordre d'ajout.
 
+        Returns:
+            tuple: Classes (liste), types (POINT / RECTANGLE), coordonnées (n x 4).
+        """
+        transform, xindex, yindex = scale
+        points = self.shapes.points.view()
+        rectangles = self.shapes.rectangles.view()
+        px, py = points["x"], points["y"]
+        coords = np.concatenate([np.column_stack([px, py, px, py]),
+                                 np.column_stack([rectangles["x1"], rectangles["y1"],
+                                                  rectangles["x2"], rectangles["y2"]])])
+        coords = transform.normalize(coords, xindex, yindex)
+        ids = np.concatenate([points["id"], rectangles["id"]])
+        kinds = np.concatenate([np.full(len(points), POINT), np.full(len(rectangles), RECTANGLE)])
+        names = np.asarray(labels, dtype=object)[np.concatenate([points["label"], rectangles["label"]])]
+        order = np.argsort(ids, kind="stable")
+        return names[order].tolist(), kinds[order], coords[order]
+
+    def load_shapes(self, names: list, kinds: np.ndarray, coords: np.ndarray, scale: tuple):
+        """
+        Méthode ajoutant en bloc des formes données en coordonnées normalisées (un seul dessin par type et par classe).
+        """
+        if(len(names) == 0):
+            return
+        transform, xindex, yindex = scale
+        coords = transform.denormalize(coords, xindex, yindex)
+        ids = self.shapes.add_block(names, kinds, coords)
+
+        shape_list = self.parent.shape_list
+        shape_list.setUpdatesEnabled(False)
+        for id in ids:
+            self.add_item(self.shapes[id])
+        shape_list.setUpdatesEnabled(True)
+        self.shapes.plot(self.axes)
+
+    def restore_shapes(self, file_path: str):
+        """
+        Méthode replaçant les formes après un nouveau rendu: formes en cours du fichier (converties dans les nouvelles unités),
+        sinon annotations enregistrées du fichier (lues une fois dans la base).
+        """
+        scale = self.scale()
+        if file_path in self.pending:
+            names, kinds, coords = self.pending.pop(file_path)
         else:
-            if(self.parent.cb_value != 0 and self.parent.ce_value != None):
-                #print(f"Avant:{L_ymax[yindex]}")
-                L_ymax[yindex] = L_ymax[yindex] * (self.parent.ce_value - self.parent.cb_value) / n_samp
-                #print(f"Après:{L_ymax[yindex]}")
-            else:
-                if(self.parent.cb_value == 0 and self.parent.ce_value != None):
-                    #print(f"Avant:{L_ymax[yindex]}")
-                    L_ymax[yindex] = (self.parent.ce_value / n_samp) * L_ymax[yindex]
-                    #print(f"Après:{L_ymax[yindex]}")
-        if(len(self.shapes) != 0):
-            for shape in self.shapes:
-                if isinstance(shape,Rectangle):
-                    x1, y1, x2, y2 = shape.get_ord_data()
-                    x1, x2 = x1 / L_xmax[xindex], x2 / L_xmax[xindex]
-                    y1, y2 = y1 / L_ymax[yindex], y2 / L_ymax[yindex]
-                    ExJsonRectangle(self.parent.img_modified, self.parent.selected_file[:-4], shape.label, x1, y1, x2, y2)
-                else:
-                    if(isinstance(shape, Point)):
-                        x, y = shape.x,shape.y
-                        x = x / L_xmax[xindex]
-                        y = y / L_ymax[yindex]
-                        ExJsonPoint(self.parent.img_modified, self.parent.selected_file[:-4], shape.label, shape.x, shape.y)
-            self.clear_canvas()
-        else:
-            ExJsonNone(self.parent.img_modified, self.parent.selected_file[:-4])
+            if file_path not in self.stored:
+                shapes = self.parent.annotations.shapes(file_path)
+                if(shapes is None):
+                    shapes = np.zeros(0, dtype=shape_dtype)
+                if(len(self.stored) >= 16):
+                    self.stored.pop(next(iter(self.stored)))
+                self.stored[file_path] = shapes
+            shapes = self.stored[file_path]
+            names, kinds = shapes["label"].tolist(), shapes["kind"]
+            coords = np.column_stack([shapes["x1"], shapes["y1"], shapes["x2"], shapes["y2"]])
+        self.file_path = file_path
+        self.current_scale = scale
+        self.load_shapes(names, kinds, coords, scale)
+
+    def export_json(self): #A débug ? 
+        names, kinds, coords = self.normalized(self.scale())
+
+        file_path = os.path.join(self.parent.selected_folder, self.parent.selected_file)
+        name = self.parent.selected_file[:-4]
+        db = self.parent.annotations
+        db.save(file_path, name, self.parent.params, names, kinds, coords)
+        self.stored.pop(file_path, None)
+        # Formes enregistrées: la base fait foi
+        self.pending.pop(file_path, None)
+        ExJsonShapes(self.parent.img_modified, db.image_name(file_path), db.entries(file_path).get(os.path.abspath(file_path), []))
+        self.parent.update_class_counts()
 
     def test_list(self):
         print(f"Taille de la liste QListWidget: {self.parent.shape_list.count()}")
         print(f"Taille de shapes: {len(self.shapes)}")
-        print(f"Taille des Points: {len(self.Points.points)}")
-        print(f"Taille de Rectangles: {len(self.Rectangles.rectangles)}")
+        print(f"Taille des Points: {len(self.shapes.points)}")
+        print(f"Taille de Rectangles: {len(self.shapes.rectangles)}")
         print(self.parent.abs_unit.currentText())
         print(self.parent.feature)
  
@@ -291,8 +443,8 @@ class Pointer: #------> Pointeur
         self.parent.ypointer_label.setText("{:.2f} {}".format(self.y, self.parent.yLabel[yindex]))
 
         if(self.vline != None and self.hline != None): #Delete si déjà existant
-            axes.lines[0].remove()
-            axes.lines[0].remove()
+            self.vline.remove()
+            self.hline.remove()
             
         #if(self.hlineS != None):
             #axes_scope.line[0].remove()
@@ -308,8 +460,8 @@ class Pointer: #------> Pointeur
     def clear(self, _axes):
         if(self != None):
             if(self.vline != None and self.hline != None):
-                _axes.lines[0].remove()
-                _axes.lines[0].remove()
+                self.vline.remove()
+                self.hline.remove()
                 self.vline = None
                 self.hline = None
             self.parent.xpointer_label.setText("")
@@ -2,14 +2,25 @@ import sys
 import traceback
 import os
 import time
+import hashlib
 import numpy as np
-
-from RadarController import RadarController
-from RadarData import RadarData, cste_global
+from collections import OrderedDict
+
+from RadarController import RadarController, ATTRIBUTES
+from RadarData import RadarData
+from RadarCache import ProcessedCache, raw_cache
+from Prefetch import Prefetcher
+from Detection import HyperbolaDetector
+from Volume import Volume, prune
+from QCScan import CScanView
 from QCanvas import Canvas
-from math import sqrt, floor
+from Annotations import AnnotationDB
+from Units import CoordinateTransform, VelocityModel
+from Migration import kirchhoff_engine
+from Project import Project, canonical_params, VALUES, ENTRIES, STATES, CHOICES
+from math import floor
 from PyQt6.QtCore import Qt
-from PyQt6.QtWidgets import QApplication, QMainWindow, QFileDialog, QWidget, QLabel, QVBoxLayout, QHBoxLayout, QFrame, QListWidget, QPushButton, QComboBox, QLineEdit, QTabWidget, QCheckBox, QSlider
+from PyQt6.QtWidgets import QApplication, QMainWindow, QFileDialog, QInputDialog, QWidget, QLabel, QVBoxLayout, QHBoxLayout, QFrame, QListWidget, QPushButton, QComboBox, QLineEdit, QTabWidget, QCheckBox, QSlider, QAbstractItemView
 from PyQt6.QtGui import QAction, QFont
 from matplotlib.figure import Figure
 
@@ -48,6 +59,56 @@ class MainWindow():
         self.dewow_state = "off"
         self.inv_state = "off"
         self.equal_state = "off"
+        self.cache_state = "off"
+        self.cscan_state = "off"
+        self.hover_state = "off"
+        self.velocity_state = "off"
+        self.override_state = "off"
+
+        # Chaîne de traitement et cache disque des images traitées
+        self.Rcontroller = RadarController()
+        self.Pcache = ProcessedCache()
+        self.params = None
+        self.transforms = OrderedDict() # Conversions d'unités par fichier et paramètres
+
+        # Base des annotations (dataset)
+        self.annotations = AnnotationDB()
+
+        # Projet: dossier, liste, réglages, préréglages et réglages propres à certains fichiers
+        self.project = Project()
+        self.exporting = False # Rendus de save_all: les annotations du fichier ouvert ne sont pas replacées
+        self.selected_folder = "" # Aucun dossier ouvert (voir update_files_list)
+
+        # Préchargement des fichiers voisins dans la liste
+        self.prefetch_state = "on"
+        self.prefetch_depth = 2
+        self.prefetcher = Prefetcher(self.load_processed_img, max_items=2*self.prefetch_depth+2)
+        self.max_tr_key = None
+        self.max_tr = None
+
+        # Attributs instantanés des dernières images affichées (clé: fichier + paramètres)
+        self.attributes_cache = OrderedDict()
+        self.attributes_max = 4
+        self.img_display = None
+
+        # Contraste automatique: statistiques d'amplitude des images affichées (clé: fichier + paramètres + attribut)
+        self.contrast_auto_state = "on"
+        self.stats_cache = OrderedDict()
+        self.stats_max = 16
+        self.img_stats = None
+
+        # Volume des profils parallèles (C-scans)
+        self.volume = None
+        self.volumes_max = 4 # Volumes conservés sur le disque
+        self.cscan_thickness = 16
+
+        # Détection automatique des hyperboles
+        self.detector = HyperbolaDetector()
+        self.detected_epsilon = None
+        self.detections = None # Détections du fichier affiché (trace, sample, epsilon)
+
+        # Modèle de vitesse en couches (profondeur vraie), ajusté sur les hyperboles détectées
+        self.velocity_model = None
 
         # Initialisation du Canvas
         self.figure = Figure(figsize=(12, 8), facecolor='none')
@@ -56,7 +117,6 @@ class MainWindow():
         self.axes_scope = self.scope_figure.add_subplot(1,1,1)
         self.QCanvas = Canvas(self.figure, self.axes, self,self.axes_scope,self.scope_figure)
         self.QCanvas_scope = Canvas(self.scope_figure,self.axes_scope,self)
-        self.lineScope = None
         self.menu()
         self.main_block()
 
@@ -70,8 +130,15 @@ class MainWindow():
         self.t0_exp_value = 0
         self.epsilon = 8.
         self.sub_mean_value = None
+        self.svd_value = None
+        self.agc_value = None
+        self.whitening_value = None
+        self.decon_value = None
         self.cutoff_value = None
         self.sampling_value = None
+        self.layers_value = []
+        self.aperture_value = 50
+        self.jobs_value = None # Processus de la migration de Kirchhoff (None: nombre de coeurs), sans effet sur l'image
         self.cb_value = 0
         self.ce_value = None
         self.feature = None
@@ -92,6 +159,7 @@ class MainWindow():
         self.selected_file = None
 
         self.radargram()
+        self.scope()
         self.sidebar()
     
     def show(self):
@@ -114,6 +182,18 @@ class MainWindow():
         open_folder_action.triggered.connect(self.open_folder)
         file_menu.addAction(open_folder_action)
 
+        open_project_action = QAction("Ouvrir un projet", self.window)
+        open_project_action.triggered.connect(self.open_project)
+        file_menu.addAction(open_project_action)
+
+        save_project_action = QAction("Enregistrer le projet", self.window)
+        save_project_action.triggered.connect(lambda: self.save_project())
+        file_menu.addAction(save_project_action)
+
+        save_project_as_action = QAction("Enregistrer le projet sous", self.window)
+        save_project_as_action.triggered.connect(lambda: self.save_project(True))
+        file_menu.addAction(save_project_as_action)
+
         save_img_action = QAction("Sauvegarder l'image", self.window)
         save_img_action.triggered.connect(self.save)
         file_menu.addAction(save_img_action)
@@ -122,6 +202,10 @@ class MainWindow():
         save_imgs_action.triggered.connect(self.save_all)
         file_menu.addAction(save_imgs_action)
 
+        export_cscans_action = QAction("Exporter les C-scans", self.window)
+        export_cscans_action.triggered.connect(self.export_cscans)
+        file_menu.addAction(export_cscans_action)
+
         export_action = QAction("Exporter les bbox", self.window)
         export_action.triggered.connect(self.QCanvas.export_json)
         file_menu.addAction(export_action)
@@ -130,6 +214,10 @@ class MainWindow():
         export_none_action.triggered.connect(self.export_nones)
         file_menu.addAction(export_none_action)
 
+        export_dataset_action = QAction("Exporter le dataset", self.window)
+        export_dataset_action.triggered.connect(self.export_dataset)
+        file_menu.addAction(export_dataset_action)
+
         quit_action = QAction("Quitter", self.window)
         quit_action.triggered.connect(self.window.close)  # Fermer la fenêtre lorsqu'on clique sur Quitter
         file_menu.addAction(quit_action)
@@ -189,6 +277,13 @@ class MainWindow():
         contents_layout.addWidget(self.sidebar_widget)
         contents_layout.addWidget(self.radargram_widget)
         contents_layout.addWidget(self.scope_widget)
+
+        # Vue C-scan (affichée à la demande)
+        self.QCScan = CScanView(self)
+        self.QCScan.widget.setFixedWidth(450)
+        self.QCScan.widget.setMinimumHeight(min_height)
+        self.QCScan.widget.setVisible(False)
+        contents_layout.addWidget(self.QCScan.widget)
         main_layout.addLayout(contents_layout)
 
     def open_folder(self):
@@ -204,6 +299,203 @@ class MainWindow():
             print(f"Erreur lors de la sélection du dossier:")
             traceback.print_exc()
 
+    def settings(self):
+        """
+        Méthode renvoyant les réglages courants (valeurs, textes des champs, boutons on/off et listes déroulantes).
+
+        Returns:
+            dict: Réglages (voir Project.canonical_params).
+        """
+        return {
+            "values": {name: getattr(self, name) for name in VALUES},
+            "entries": {name: getattr(self, name).text() for name in ENTRIES},
+            "states": {name: getattr(self, name) for name in STATES},
+            "choices": {name: getattr(self, name).currentText() for name in CHOICES}
+        }
+
+    def apply_settings(self, settings: dict):
+        """
+        Méthode restaurant des réglages sans validation ni rendu intermédiaire (l'appelant effectue un seul rendu ensuite).
+        Les unités sont restaurées avant les champs, dont les textes sont exprimés dans ces unités.
+        """
+        for name, text in settings["choices"].items():
+            if name in CHOICES:
+                combo = getattr(self, name)
+                combo.blockSignals(True)
+                combo.setCurrentText(text)
+                combo.blockSignals(False)
+        for name, text in settings["entries"].items():
+            if name in ENTRIES:
+                self.reset_style(getattr(self, name))
+                getattr(self, name).setText(text)
+        for name, value in settings["values"].items():
+            if name in VALUES:
+                setattr(self, name, value)
+        for name, state in settings["states"].items():
+            if name in STATES:
+                setattr(self, name, state)
+                if(state == "on"):
+                    getattr(self, STATES[name]).setStyleSheet("""     
+                    QPushButton:active {
+                        background-color: #45a049;}""")
+                else:
+                    getattr(self, STATES[name]).setStyleSheet("")
+
+    def open_project(self):
+        """
+        Méthode ouvrant un fichier de projet: dossier, liste, réglages et fichier sélectionné sont restaurés (un seul rendu).
+        """
+        try:
+            filename, _ = QFileDialog.getOpenFileName(self.window, "Ouvrir un projet", filter="Projet (*.json)")
+            if(filename == ''):
+                return
+            s = time.time()
+            self.load_project(filename)
+            e = time.time()
+            print(f"Projet restauré: {e-s} secondes")
+        except:
+            print("Erreur lors de l'ouverture du projet:")
+            traceback.print_exc()
+
+    def load_project(self, filename: str):
+        """
+        Méthode chargeant un projet (voir open_project).
+        """
+        project = Project().load(filename)
+        self.project = project
+        self.selected_file = None
+
+        # Même filtrage, donc même liste: l'indice des fichiers (inversement des profils pairs) est conservé
+        if("filter_button" in project.filters):
+            self.filter_button.setText(project.filters["filter_button"])
+        if("mult_button" in project.filters):
+            self.mult_button.setText(project.filters["mult_button"])
+        self.selected_folder = project.folder
+        self.update_files_list()
+
+        self.preset_choice.clear()
+        self.preset_choice.addItems(sorted(project.presets))
+        if(project.settings != None):
+            self.apply_settings(project.settings)
+
+        if(project.file != None):
+            items = self.listbox_files.findItems(project.file, Qt.MatchFlag.MatchExactly)
+            if(len(items) != 0):
+                self.listbox_files.setCurrentItem(items[0])
+                self.select_file()
+
+    def save_project(self, save_as: bool = False):
+        """
+        Méthode enregistrant le projet (dossier, liste, fichier sélectionné, réglages, préréglages et réglages propres aux fichiers).
+
+        Args:
+            save_as (bool): Demander le nom du fichier même si le projet a déjà été enregistré
+        """
+        try:
+            if(save_as or self.project.filename == None):
+                filename, _ = QFileDialog.getSaveFileName(self.window, "Enregistrer le projet", filter="Projet (*.json)")
+                if(filename == ''):
+                    return
+                self.project.filename = filename
+            self.project.folder = self.selected_folder
+            self.project.files = [self.listbox_files.item(row).text() for row in range(self.listbox_files.count())]
+            self.project.file = self.selected_file
+            self.project.filters = {"filter_button": self.filter_button.text(), "mult_button": self.mult_button.text()}
+            self.store_settings(self.selected_file)
+            self.project.save()
+        except:
+            print("Erreur lors de l'enregistrement du projet:")
+            traceback.print_exc()
+
+    def store_settings(self, file: str):
+        """
+        Méthode conservant les réglages courants dans le projet: réglages propres du fichier s'il en a, sinon réglages du projet.
+        """
+        if(file in self.project.overrides):
+            self.project.set_override(file, self.settings())
+        else:
+            self.project.set_settings(self.settings())
+
+    def switch_settings(self, previous: str, file: str):
+        """
+        Méthode appelée au changement de fichier: si l'un des deux fichiers a des réglages propres,
+        les réglages du fichier quitté sont conservés et ceux du fichier sélectionné restaurés.
+        """
+        overrides = self.project.overrides
+        if(previous in overrides or file in overrides):
+            if(previous != None):
+                self.store_settings(previous)
+            elif(self.project.settings == None):
+                self.project.set_settings(self.settings())
+            self.apply_settings(self.project.effective(file))
+
+        self.override_state = "on" if file in overrides else "off"
+        if(self.override_state == "on"):
+            self.override_button.setStyleSheet("""     
+            QPushButton:active {
+                background-color: #45a049;}""")
+        else:
+            self.override_button.setStyleSheet("")
+
+    def override_butt(self):
+        """
+    Méthode permettant de donner au fichier sélectionné ses propres réglages (conservés dans le projet), ou de revenir aux réglages du projet.
+        """
+        try:
+            if(self.selected_file == None):
+                return
+            override_status = ["off", "on"]
+            index = override_status.index(self.override_state) + 1
+            if(index+1 <= len(override_status)):
+                if(self.project.settings == None):
+                    self.project.set_settings(self.settings())
+                self.project.set_override(self.selected_file, self.settings())
+                self.override_state = "on"
+                self.override_button.setStyleSheet("""     
+                QPushButton:active {
+                    background-color: #45a049;}""")
+            else:
+                self.project.remove_override(self.selected_file)
+                self.override_state = "off"
+                self.override_button.setStyleSheet("")
+                if(self.project.settings != None):
+                    self.apply_settings(self.project.settings)
+                    self.update_img(self.t0_lin_value, self.t0_exp_value, self.gain_const_value, self.gain_lin_value, self.gain_exp_value, self.cb_value, self.ce_value, self.sub_mean_value, self.cutoff_value, self.sampling_value)
+        except:
+            print("Erreur réglages du fichier:")
+            traceback.print_exc()
+
+    def save_preset(self):
+        """
+        Méthode enregistrant les réglages courants sous un nom (préréglage du projet).
+        """
+        try:
+            name, ok = QInputDialog.getText(self.window, "Préréglage", "Nom du préréglage:", text=self.preset_choice.currentText())
+            if(not ok or name == ''):
+                return
+            self.project.set_preset(name, self.settings())
+            self.preset_choice.clear()
+            self.preset_choice.addItems(sorted(self.project.presets))
+            self.preset_choice.setCurrentText(name)
+        except:
+            print("Erreur lors de l'enregistrement du préréglage:")
+            traceback.print_exc()
+
+    def apply_preset(self):
+        """
+        Méthode appliquant le préréglage choisi (un seul rendu).
+        """
+        try:
+            name = self.preset_choice.currentText()
+            if(name not in self.project.presets):
+                return
+            self.apply_settings(self.project.preset(name))
+            if(self.selected_file != None):
+                self.update_img(self.t0_lin_value, self.t0_exp_value, self.gain_const_value, self.gain_lin_value, self.gain_exp_value, self.cb_value, self.ce_value, self.sub_mean_value, self.cutoff_value, self.sampling_value)
+        except:
+            print("Erreur lors de l'application du préréglage:")
+            traceback.print_exc()
+
     def update_files_list(self):
         """
         Méthode qui met à jour la liste des fichiers du logiciel.
@@ -265,39 +557,18 @@ class MainWindow():
             folder_path = QFileDialog.getExistingDirectory(self.window, "Sauvegarde des images")
             files = [self.listbox_files.item(row).text() for row in range(self.listbox_files.count())]
             prec_selected_file = self.selected_file
-            for file in files:
+            self.exporting = True
+            for index, file in enumerate(files):
                 self.selected_file = file
                 self.Rdata = RadarData(self.selected_folder + "/"+ file)
                 self.feature = self.Rdata.get_feature()
 
                 self.update_canvas_image()
 
-                self.img = self.Rdata.rd_img()
-                self.img_modified = self.img[int(self.cb_value):int(self.ce_value), :]
-
-                if(self.dewow_state == "on"):
-                    self.img_modified = self.Rcontroller.dewow_filter(self.img_modified)
-
-                if(self.cutoff_entry.text() != '' and self.sampling_entry.text() != ''):
-                    self.img_modified = self.Rcontroller.low_pass(self.img_modified, self.cutoff_value, self.sampling_value)
-
-                if(self.sub_mean_value != None):
-                    self.img_modified = self.Rcontroller.sub_mean(self.img_modified, self.sub_mean_value)
-
-                if(self.inv_list_state == "on"):
-                    if(files.index(file) % 2 != 0):
-                        self.img_modified = np.fliplr(self.img_modified)
-
-                if(self.inv_state == "on"):
-                    self.img_modified = np.fliplr(self.img_modified)
-
-                self.img_modified = self.Rcontroller.apply_total_gain(self.img_modified, self.t0_lin_value, self.t0_exp_value, self.gain_const_value, self.gain_lin_value, self.gain_exp_value)
-
-                if(self.equal_state == "on"):
-                    if self.img_modified.shape[1] < self.max_tr:
-                        # Ajouter des colonnes supplémentaires
-                        additional_cols = self.max_tr - self.img_modified.shape[1]
-                        self.img_modified = np.pad(self.img_modified, ((0, 0), (0, additional_cols)), mode='constant')            
+                params = self.processing_params(self.t0_lin_value, self.t0_exp_value, self.gain_const_value, self.gain_lin_value, self.gain_exp_value, self.cb_value, self.ce_value, self.sub_mean_value, self.cutoff_value, self.sampling_value, index)
+                self.img_modified = self.get_processed_img(self.selected_folder + "/"+ file, params)
+                self.img_display = self.get_display_img(self.selected_folder + "/"+ file, params, self.img_modified)
+                self.img_stats = self.get_img_stats(self.selected_folder + "/"+ file, params, self.img_display)
 
                 self.update_axes(self.def_value, self.epsilon)
 
@@ -306,53 +577,124 @@ class MainWindow():
                 self.figure.savefig(file_save_path)
 
             # 
+            self.exporting = False
             self.selected_file = prec_selected_file
             self.Rdata = RadarData(self.file_path)
             self.update_img(self.t0_lin_value, self.t0_exp_value, self.gain_const_value, self.gain_lin_value, self.gain_exp_value, self.cb_value, self.ce_value, self.sub_mean_value, self.cutoff_value, self.sampling_value)
         except:
+            self.exporting = False
             print("Erreur lors de la sauvegarde des images.")
             traceback.print_exc()
 
     
 
 
+    def build_volume(self):
+        """
+        Méthode construisant (ou relisant depuis le cache disque) le volume des profils de la liste, traités avec les paramètres actuels.
+        Les profils sont empilés dans l'ordre de la liste et complétés jusqu'au nombre maximal de traces.
+
+        Returns:
+            Volume: Le volume ouvert en memmap.
+        """
+        files = [self.listbox_files.item(row).text() for row in range(self.listbox_files.count())]
+        paths = [os.path.join(self.selected_folder, file) for file in files]
+        max_tr = self.max_list_files()
+        params_list = []
+        for index in range(len(files)):
+            params = self.processing_params(self.t0_lin_value, self.t0_exp_value, self.gain_const_value, self.gain_lin_value, self.gain_exp_value, self.cb_value, self.ce_value, self.sub_mean_value, self.cutoff_value, self.sampling_value, index)
+            # Le complément en traces est fait par le volume
+            params["max_tr"] = None
+            params_list.append(params)
+
+        keys = [self.Pcache.key(path, params) for path, params in zip(paths, params_list)]
+        key = hashlib.sha1(("".join(keys) + str(max_tr)).encode()).hexdigest()
+        # Dossier propre aux volumes: l'éviction du cache des images traitées ne les supprime pas
+        volume = Volume(self.Pcache.folder + "volumes/volume_" + key + ".npy")
+        if volume.exists():
+            volume.open()
+            os.utime(volume.filename) # Volume récemment utilisé (voir prune)
+        else:
+            n_samp = self.get_processed_img(paths[0], params_list[0]).shape[0]
+            images = (self.get_processed_img(path, params) for path, params in zip(paths, params_list))
+            volume.build(images, len(paths), n_samp, max_tr)
+        exclude = [volume.filename]
+        if(self.volume != None):
+            exclude.append(self.volume.filename)
+        prune(os.path.dirname(volume.filename), self.volumes_max, exclude)
+        self.volume = volume
+        return volume
+
+    def export_cscans(self):
+        """
+        Méthode exportant en PNG les C-scans (moyenne des amplitudes absolues par fenêtre de cscan_thickness samples) du volume des profils.
+        """
+        try:
+            folder_path = QFileDialog.getExistingDirectory(self.window, "Exportation des C-scans")
+            if(folder_path == ''):
+                return
+            s = time.time()
+            volume = self.build_volume()
+            n_samp, n_profiles, n_tr = volume.shape()
+
+            feature = RadarData(os.path.join(self.selected_folder, self.listbox_files.item(0).text())).get_feature()
+            dt_ns = feature[3] / feature[1]
+            depths = self.volume_depths(feature)
+
+            figure = Figure(figsize=(12, 6))
+            axes = figure.add_subplot(111)
+            for t0 in range(0, n_samp, self.cscan_thickness):
+                t1 = min(t0 + self.cscan_thickness, n_samp)
+                cscan = volume.cscan(t0, t1)
+                vmax = self.Rcontroller.stats_percentile(self.Rcontroller.amplitude_stats(cscan), 99.5)
+                axes.clear()
+                axes.imshow(cscan, cmap="gray", aspect="auto", interpolation="nearest", origin="lower", vmin=0., vmax=vmax)
+                axes.set_xlabel("Traces")
+                axes.set_ylabel("Profils")
+                # Temps mesurés depuis le début du fichier (découpage inclus)
+                title = f"C-scan {(self.cb_value + t0) * dt_ns:.2f} - {(self.cb_value + t1) * dt_ns:.2f} ns"
+                if(depths is not None):
+                    z0 = depths[min(int(self.cb_value) + t0, len(depths) - 1)]
+                    z1 = depths[min(int(self.cb_value) + t1, len(depths) - 1)]
+                    title += f" | {z0:.2f} - {z1:.2f} m"
+                axes.set_title(title)
+                figure.savefig(folder_path + "/cscan_" + str(t0).zfill(5) + ".png")
+            e = time.time()
+            print(f"C-scans exportés ({n_profiles} profils x {n_tr} traces): {e-s} secondes")
+        except:
+            print("Erreur lors de l'exportation des C-scans:")
+            traceback.print_exc()
+
+    def volume_depths(self, feature: list):
+        """
+        Méthode renvoyant la profondeur de chaque sample (depuis le début du fichier) selon le modèle de vitesse, None sans modèle.
+        """
+        if(self.velocity_model == None):
+            return None
+        return self.velocity_model.depth_table(feature[1], feature[3] / feature[1])
+
     def export_nones(self):
         try:
             files = [self.listbox_files.item(row).text() for row in range(self.listbox_files.count())]
             prec_selected_file = self.selected_file
-            for file in files:
+            # Les formes en cours (non exportées) du fichier ouvert sont mises de côté comme celles des autres fichiers
+            self.QCanvas.stash()
+            for index, file in enumerate(files):
+                # Les fichiers déjà annotés (avec des formes) ou ayant des formes en cours ne sont pas remplacés
+                if(os.path.join(self.selected_folder, file) in self.QCanvas.pending):
+                    continue
+                shapes = self.annotations.shapes(self.selected_folder + "/" + file)
+                if(shapes is not None and len(shapes) != 0):
+                    continue
                 self.selected_file = file
                 self.Rdata = RadarData(self.selected_folder + "/" + file)
                 self.feature = self.Rdata.get_feature()
 
                 self.update_canvas_image()
 
-                self.img = self.Rdata.rd_img()
-                self.img_modified = self.img[int(self.cb_value):int(self.ce_value), :]
-
-                if(self.dewow_state == "on"):
-                    self.img_modified = self.Rcontroller.dewow_filter(self.img_modified)
-
-                if(self.cutoff_entry.text() != '' and self.sampling_entry.text() != ''):
-                    self.img_modified = self.Rcontroller.low_pass(self.img_modified, self.cutoff_value, self.sampling_value)
-
-                if(self.sub_mean_value != None):
-                    self.img_modified = self.Rcontroller.sub_mean(self.img_modified, self.sub_mean_value)
-
-                if(self.inv_list_state == "on"):
-                    if(files.index(file) % 2 != 0):
-                        self.img_modified = np.fliplr(self.img_modified)
-
-                if(self.inv_state == "on"):
-                    self.img_modified = np.fliplr(self.img_modified)
-
-                self.img_modified = self.Rcontroller.apply_total_gain(self.img_modified, self.t0_lin_value, self.t0_exp_value, self.gain_const_value, self.gain_lin_value, self.gain_exp_value)
-
-                if(self.equal_state == "on"):
-                    if self.img_modified.shape[1] < self.max_tr:
-                        # Ajouter des colonnes supplémentaires
-                        additional_cols = self.max_tr - self.img_modified.shape[1]
-                        self.img_modified = np.pad(self.img_modified, ((0, 0), (0, additional_cols)), mode='constant')            
+                params = self.processing_params(self.t0_lin_value, self.t0_exp_value, self.gain_const_value, self.gain_lin_value, self.gain_exp_value, self.cb_value, self.ce_value, self.sub_mean_value, self.cutoff_value, self.sampling_value, index)
+                self.img_modified = self.get_processed_img(self.selected_folder + "/" + file, params)
+                self.params = params
 
                 self.QCanvas.export_json()
                 # Sauvegarder l'image en format PNG
@@ -364,6 +706,33 @@ class MainWindow():
             print("Erreur lors de l'exportation des images/bbox.")
             traceback.print_exc()
 
+    def export_dataset(self):
+        """
+        Méthode écrivant le fichier JSON de chaque image annotée à partir de la base des annotations.
+        """
+        try:
+            folder_path = QFileDialog.getExistingDirectory(self.window, "Exportation du dataset")
+            if(folder_path == ''):
+                return
+            s = time.time()
+            n_images = self.annotations.export_dataset(folder_path)
+            e = time.time()
+            print(f"Dataset exporté ({n_images} images): {e-s} secondes")
+        except:
+            print("Erreur lors de l'exportation du dataset:")
+            traceback.print_exc()
+
+    def update_class_counts(self):
+        """
+        Méthode affichant le nombre de formes enregistrées par classe.
+        """
+        try:
+            counts = self.annotations.counts()
+            self.class_counts_label.setText(" | ".join((label if label != "" else "Par défaut") + ": " + str(count) for label, count in counts.items()))
+        except:
+            print("Erreur lors de la lecture des annotations:")
+            traceback.print_exc()
+
     def sidebar(self):
         sidebar_layout = QVBoxLayout(self.sidebar_widget)
         sidebar_layout.setAlignment(Qt.AlignmentFlag.AlignTop)
@@ -427,6 +796,25 @@ class MainWindow():
 
         self.slider.valueChanged.connect(lambda: self.update_img(self.t0_lin_value,self.t0_exp_value, self.gain_const_value, update_gain_lin_value(), self.gain_exp_value, self.cb_value, self.ce_value, self.sub_mean_value, self.cutoff_value, self.sampling_value))
 
+        self.contrast_auto_button = QPushButton("Contraste automatique")
+        self.contrast_auto_button.clicked.connect(self.contrast_auto_butt)
+        self.contrast_auto_button.setStyleSheet("""     
+        QPushButton:active {
+            background-color: #45a049;}""")
+        display_layout.addWidget(self.contrast_auto_button)
+
+        attribute_layout = QHBoxLayout()
+        display_layout.addLayout(attribute_layout)
+
+        attribute_label = QLabel("Attribut")
+        attribute_layout.addWidget(attribute_label)
+
+        # Changer d'attribut ne relance pas la chaîne de traitement (images et attributs en cache)
+        self.attribute_choice = QComboBox()
+        self.attribute_choice.addItems(ATTRIBUTES)
+        self.attribute_choice.currentTextChanged.connect(lambda: self.update_img(self.t0_lin_value, self.t0_exp_value, self.gain_const_value, self.gain_lin_value, self.gain_exp_value, self.cb_value, self.ce_value, self.sub_mean_value, self.cutoff_value, self.sampling_value))
+        attribute_layout.addWidget(self.attribute_choice)
+
 
         unit_abs_layout = QHBoxLayout()
         display_layout.addLayout(unit_abs_layout)
@@ -604,15 +992,10 @@ class MainWindow():
             try:
                 self.reset_style(self.t0_lin_entry)
                 t0_lin_entry_value = self.t0_lin_entry.text()
-                n_samp = self.feature[1]
-                t_max = self.feature[3]
-                p_max = (t_max * 10.**(-9)) * (cste_global["c_lum"] / sqrt(self.epsilon)) / 2
+                step = self.transform().sample_step(self.Yunit.index(self.ord_unit.currentText()))
 
-                yindex = self.Yunit.index(self.ord_unit.currentText())
-                L_mult = [p_max / n_samp, t_max / n_samp, 1]
-
-                if(float(t0_lin_entry_value) / L_mult[yindex] >= 0. and float(t0_lin_entry_value) / L_mult[yindex] <= self.ce_value-self.cb_value):
-                    self.t0_lin_value = int(float(t0_lin_entry_value) / L_mult[yindex])
+                if(float(t0_lin_entry_value) / step >= 0. and float(t0_lin_entry_value) / step <= self.ce_value-self.cb_value):
+                    self.t0_lin_value = int(float(t0_lin_entry_value) / step)
                     self.t0_lin_entry.setPlaceholderText(str(t0_lin_entry_value))
                 else:
                     self.QLineError(self.t0_lin_entry,"Erreur: t0 hors intervalle")
@@ -661,15 +1044,10 @@ class MainWindow():
             try:
                 self.reset_style(self.t0_exp_entry)
                 t0_exp_entry_value = self.t0_exp_entry.text()
-                n_samp = self.feature[1]
-                t_max = self.feature[3]
-                p_max = (t_max * 10.**(-9)) * (cste_global["c_lum"] / sqrt(self.epsilon)) / 2
+                step = self.transform().sample_step(self.Yunit.index(self.ord_unit.currentText()))
 
-                yindex = self.Yunit.index(self.ord_unit.currentText())
-                L_mult = [p_max / n_samp, t_max / n_samp, 1]
-
-                if(float(t0_exp_entry_value) / L_mult[yindex] >= 0. and float(t0_exp_entry_value) / L_mult[yindex] <= self.ce_value-self.cb_value):
-                    self.t0_exp_value = int(float(t0_exp_entry_value) / L_mult[yindex])
+                if(float(t0_exp_entry_value) / step >= 0. and float(t0_exp_entry_value) / step <= self.ce_value-self.cb_value):
+                    self.t0_exp_value = int(float(t0_exp_entry_value) / step)
                     self.t0_exp_entry.setPlaceholderText(str(t0_exp_entry_value))
                 else:
                     self.QLineError(self.t0_exp_entry,"Erreur: t0 hors intervalle")
@@ -683,6 +1061,63 @@ class MainWindow():
         self.gain_exp_entry.editingFinished.connect(lambda: self.update_img(self.t0_lin_value, self.t0_exp_value, self.gain_const_value, self.gain_lin_value, update_gain_exp_value(), self.cb_value, self.ce_value, self.sub_mean_value, self.cutoff_value, self.sampling_value))
         self.t0_exp_entry.editingFinished.connect(lambda: self.update_img(self.t0_lin_value,update_t0_exp_value(), self.gain_const_value, self.gain_lin_value, self.gain_exp_value, self.cb_value, self.ce_value, self.sub_mean_value, self.cutoff_value, self.sampling_value))
 
+        ######### AGC #########
+        agc_layout = QVBoxLayout()
+        gain_layout.addLayout(agc_layout)
+
+        agc_title_layout = QHBoxLayout()
+        agc_title_layout.setAlignment(Qt.AlignmentFlag.AlignTop | Qt.AlignmentFlag.AlignHCenter)
+        agc_layout.addLayout(agc_title_layout)
+
+        agc_title = QLabel("AGC")
+        agc_title.setFont(QFont("Arial", 12, QFont.Weight.Bold))
+        agc_title_layout.addWidget(agc_title)
+
+        agc_underlayout = QHBoxLayout()
+        agc_layout.addLayout(agc_underlayout)
+
+        agc_label_layout = QVBoxLayout()
+        agc_underlayout.addLayout(agc_label_layout)
+
+        agc_entry_layout = QVBoxLayout()
+        agc_underlayout.addLayout(agc_entry_layout)
+
+        agc_mode_label = QLabel("Niveau")
+        agc_label_layout.addWidget(agc_mode_label)
+
+        self.agc_choice = QComboBox()
+        self.agc_choice.addItems(["Désactivé", "RMS", "Moyenne absolue"])
+        agc_entry_layout.addWidget(self.agc_choice)
+
+        agc_window_label = QLabel("Fenêtre")
+        agc_label_layout.addWidget(agc_window_label)
+
+        self.agc_entry = QLineEdit()
+        agc_entry_layout.addWidget(self.agc_entry)
+
+        def update_agc_value():
+            try:
+                self.reset_style(self.agc_entry)
+                agc_entry_value = float(self.agc_entry.text())
+                n_samp = self.feature[1]
+                step = self.transform().sample_step(self.Yunit.index(self.ord_unit.currentText()))
+
+                if(agc_entry_value / step >= 1. and agc_entry_value / step <= n_samp):
+                    self.agc_value = int(agc_entry_value / step)
+                    self.agc_entry.setPlaceholderText(str(agc_entry_value))
+                else:
+                    self.agc_value = None
+                    self.QLineError(self.agc_entry,"Erreur: Intervalle")
+            except:
+                self.agc_value = None
+                self.agc_entry.setPlaceholderText("")
+                self.agc_entry.clear()
+            return self.agc_value
+
+        self.agc_entry.editingFinished.connect(update_agc_value)
+        self.agc_entry.editingFinished.connect(lambda: self.update_img(self.t0_lin_value, self.t0_exp_value, self.gain_const_value, self.gain_lin_value, self.gain_exp_value, self.cb_value, self.ce_value, self.sub_mean_value, self.cutoff_value, self.sampling_value))
+        self.agc_choice.currentTextChanged.connect(lambda: self.update_img(self.t0_lin_value, self.t0_exp_value, self.gain_const_value, self.gain_lin_value, self.gain_exp_value, self.cb_value, self.ce_value, self.sub_mean_value, self.cutoff_value, self.sampling_value))
+
         ######### Découpage #########
         cut_layout = QVBoxLayout()
         gain_layout.addLayout(cut_layout)
@@ -716,16 +1151,21 @@ class MainWindow():
         self.ce_entry = QLineEdit()
         cut_entry_layout.addWidget(self.ce_entry)
 
+        # Temps zéro automatique: le découpage devient relatif à la première arrivée de chaque fichier
+        time_zero_label = QLabel("Temps zéro")
+        cut_label_layout.addWidget(time_zero_label)
+
+        self.time_zero_choice = QComboBox()
+        self.time_zero_choice.addItems(["Manuel", "Par fichier", "Par trace"])
+        self.time_zero_choice.currentTextChanged.connect(lambda: self.update_img(self.t0_lin_value, self.t0_exp_value, self.gain_const_value, self.gain_lin_value, self.gain_exp_value, self.cb_value, self.ce_value, self.sub_mean_value, self.cutoff_value, self.sampling_value))
+        cut_entry_layout.addWidget(self.time_zero_choice)
+
         def update_cb_value():
             try:
                 self.reset_style(self.cb_entry)
-                n_samp = self.feature[1]
-                t_max = self.feature[3]
-                p_max = (t_max * 10.**(-9)) * (cste_global["c_lum"] / sqrt(self.epsilon)) / 2
-
                 yindex = self.Yunit.index(self.ord_unit.currentText())
 
-                L_mult = [p_max / n_samp, t_max / n_samp, 1]
+                L_mult = self.transform().y_steps
                 if(self.cb_entry.text() != ''):
                     cb = float(self.cb_entry.text())
                     if(cb < 0.):
@@ -753,14 +1193,11 @@ class MainWindow():
         def update_ce_value():
             try:
                 self.reset_style(self.ce_entry)
-                n_samp = self.feature[1]
-                t_max = self.feature[3]
-                p_max = (t_max * 10.**(-9)) * (cste_global["c_lum"] / sqrt(self.epsilon)) / 2
-
                 yindex = self.Yunit.index(self.ord_unit.currentText())
 
-                L_mult = [p_max / n_samp, t_max / n_samp, 1]
-                L_ymax = [p_max, t_max, n_samp]
+                transform = self.transform()
+                L_mult = transform.y_steps
+                L_ymax = [transform.sample_max(i) for i in range(len(self.Yunit))]
                 if(self.ce_entry.text() != ''):
                     ce = float(self.ce_entry.text())
                     if(ce / L_mult[yindex] < self.cb_value):
@@ -829,16 +1266,10 @@ class MainWindow():
                 self.reset_style(self.sub_mean_entry)
                 sub_mean = float(self.sub_mean_entry.text())
                 n_tr = self.feature[0]
-                if(self.def_value != None):
-                    d_max = self.def_value
-                else:
-                    d_max = self.feature[2]
-                step_time_acq = self.feature[5]
-                xindex = self.Xunit.index(self.abs_unit.currentText())
+                step = self.transform().trace_step(self.Xunit.index(self.abs_unit.currentText()))
 
-                L_mult = [d_max / n_tr, step_time_acq, 1]
-                if(sub_mean / L_mult[xindex] >= 0. and sub_mean / L_mult[xindex] <= n_tr):
-                    self.sub_mean_value = int(sub_mean / L_mult[xindex])
+                if(sub_mean / step >= 0. and sub_mean / step <= n_tr):
+                    self.sub_mean_value = int(sub_mean / step)
                     self.sub_mean_entry.setPlaceholderText(str(sub_mean))
                 else:
                     self.sub_mean_value = None
@@ -851,6 +1282,90 @@ class MainWindow():
 
         self.sub_mean_entry.editingFinished.connect(lambda: self.update_img(self.t0_lin_value,self.t0_exp_value, self.gain_const_value, self.gain_lin_value, self.gain_exp_value, self.cb_value, self.ce_value, update_sub_mean(), self.cutoff_value, self.sampling_value))
 
+        self.svd_label = QLabel("SVD (composantes retirées)")
+        uft_label_layout.addWidget(self.svd_label)
+
+        self.svd_entry = QLineEdit()
+        uft_entry_layout.addWidget(self.svd_entry)
+
+        def update_svd_value():
+            try:
+                self.reset_style(self.svd_entry)
+                svd = int(self.svd_entry.text())
+                if(svd > 0 and svd < self.feature[1]):
+                    self.svd_value = svd
+                    self.svd_entry.setPlaceholderText(str(svd))
+                else:
+                    self.svd_value = None
+                    self.QLineError(self.svd_entry,"Erreur: Intervalle")
+            except:
+                self.svd_value = None
+                self.svd_entry.setPlaceholderText("")
+                self.svd_entry.clear()
+            return self.svd_value
+
+        self.svd_entry.editingFinished.connect(update_svd_value)
+        self.svd_entry.editingFinished.connect(lambda: self.update_img(self.t0_lin_value,self.t0_exp_value, self.gain_const_value, self.gain_lin_value, self.gain_exp_value, self.cb_value, self.ce_value, self.sub_mean_value, self.cutoff_value, self.sampling_value))
+
+        self.whitening_label = QLabel("Blanchiment (MHz)")
+        uft_label_layout.addWidget(self.whitening_label)
+
+        self.whitening_entry = QLineEdit()
+        self.whitening_entry.setPlaceholderText("fmin:fmax")
+        uft_entry_layout.addWidget(self.whitening_entry)
+
+        def update_whitening_value():
+            try:
+                self.reset_style(self.whitening_entry)
+                if(self.whitening_entry.text().strip() == ''):
+                    self.whitening_value = None
+                    return self.whitening_value
+                f_min, f_max = [float(f) for f in self.whitening_entry.text().split(":")]
+                # Fréquence de Nyquist (MHz)
+                f_nyq = 0.5 / (self.Rcontroller.sampling_steps(self.feature)[0] * 10.**6)
+                if(f_min >= 0. and f_min < f_max and f_max <= f_nyq):
+                    self.whitening_value = [f_min, f_max]
+                else:
+                    self.whitening_value = None
+                    self.QLineError(self.whitening_entry, "Erreur: 0 <= fmin < fmax <= " + str(round(f_nyq)))
+            except:
+                self.whitening_value = None
+                self.QLineError(self.whitening_entry, "Erreur: format fmin:fmax")
+            return self.whitening_value
+
+        self.whitening_entry.editingFinished.connect(update_whitening_value)
+        self.whitening_entry.editingFinished.connect(lambda: self.update_img(self.t0_lin_value,self.t0_exp_value, self.gain_const_value, self.gain_lin_value, self.gain_exp_value, self.cb_value, self.ce_value, self.sub_mean_value, self.cutoff_value, self.sampling_value))
+
+        self.decon_label = QLabel("Déconvolution (samples)")
+        uft_label_layout.addWidget(self.decon_label)
+
+        self.decon_entry = QLineEdit()
+        self.decon_entry.setPlaceholderText("longueur:écart")
+        uft_entry_layout.addWidget(self.decon_entry)
+
+        def update_decon_value():
+            try:
+                self.reset_style(self.decon_entry)
+                if(self.decon_entry.text().strip() == ''):
+                    self.decon_value = None
+                    return self.decon_value
+                # Écart 1 (par défaut): déconvolution de Wiener impulsionnelle, sinon prédictive
+                values = [int(v) for v in self.decon_entry.text().split(":")]
+                length = values[0]
+                gap = values[1] if len(values) > 1 else 1
+                if(length > 0 and gap > 0 and length + gap < self.feature[1]):
+                    self.decon_value = [length, gap]
+                else:
+                    self.decon_value = None
+                    self.QLineError(self.decon_entry, "Erreur: Intervalle")
+            except:
+                self.decon_value = None
+                self.QLineError(self.decon_entry, "Erreur: format longueur:écart")
+            return self.decon_value
+
+        self.decon_entry.editingFinished.connect(update_decon_value)
+        self.decon_entry.editingFinished.connect(lambda: self.update_img(self.t0_lin_value,self.t0_exp_value, self.gain_const_value, self.gain_lin_value, self.gain_exp_value, self.cb_value, self.ce_value, self.sub_mean_value, self.cutoff_value, self.sampling_value))
+
 #AJouter Le passe haut
         low_pass_layout = QVBoxLayout()
         ft_layout.addLayout(low_pass_layout)
@@ -914,6 +1429,106 @@ class MainWindow():
         self.cutoff_entry.editingFinished.connect(lambda: self.update_img(self.t0_lin_value,self.t0_exp_value, self.gain_const_value, self.gain_lin_value, self.gain_exp_value, self.cb_value, self.ce_value, self.sub_mean_value, update_cut_value()[0], update_cut_value()[1]))
         self.sampling_entry.editingFinished.connect(lambda: self.update_img(self.t0_lin_value,self.t0_exp_value, self.gain_const_value, self.gain_lin_value, self.gain_exp_value, self.cb_value, self.ce_value, self.sub_mean_value, update_cut_value()[0], update_cut_value()[1]))
 
+        ######### Migration #########
+        migration_layout = QHBoxLayout()
+        ft_layout.addLayout(migration_layout)
+
+        migration_label = QLabel("Migration")
+        migration_layout.addWidget(migration_label)
+
+        self.migration_choice = QComboBox()
+        self.migration_choice.addItems(["Aucune", "F-K", "Kirchhoff"])
+        self.migration_choice.currentTextChanged.connect(lambda: self.update_img(self.t0_lin_value, self.t0_exp_value, self.gain_const_value, self.gain_lin_value, self.gain_exp_value, self.cb_value, self.ce_value, self.sub_mean_value, self.cutoff_value, self.sampling_value))
+        migration_layout.addWidget(self.migration_choice)
+
+        kirchhoff_layout = QHBoxLayout()
+        ft_layout.addLayout(kirchhoff_layout)
+
+        kirchhoff_label_layout = QVBoxLayout()
+        kirchhoff_layout.addLayout(kirchhoff_label_layout)
+
+        kirchhoff_entry_layout = QVBoxLayout()
+        kirchhoff_layout.addLayout(kirchhoff_entry_layout)
+
+        layers_label = QLabel("Couches (t ns:\u03B5)")
+        kirchhoff_label_layout.addWidget(layers_label)
+
+        self.layers_entry = QLineEdit()
+        self.layers_entry.setPlaceholderText("ex: 10:6, 25:9")
+        kirchhoff_entry_layout.addWidget(self.layers_entry)
+
+        aperture_label = QLabel("Ouverture (traces)")
+        kirchhoff_label_layout.addWidget(aperture_label)
+
+        self.aperture_entry = QLineEdit()
+        self.aperture_entry.setPlaceholderText(str(self.aperture_value))
+        kirchhoff_entry_layout.addWidget(self.aperture_entry)
+
+        jobs_label = QLabel("Processus")
+        kirchhoff_label_layout.addWidget(jobs_label)
+
+        self.jobs_entry = QLineEdit()
+        self.jobs_entry.setPlaceholderText(str(os.cpu_count()))
+        kirchhoff_entry_layout.addWidget(self.jobs_entry)
+
+        def update_layers_value():
+            try:
+                self.reset_style(self.layers_entry)
+                layers = []
+                if(self.layers_entry.text().strip() != ''):
+                    for layer in self.layers_entry.text().split(","):
+                        t_top, eps = layer.split(":")
+                        layers.append([float(t_top), float(eps)])
+                if(all(t_top >= 0. and eps > 0. for t_top, eps in layers)):
+                    self.layers_value = layers
+                else:
+                    self.QLineError(self.layers_entry, "Erreur: t >= 0, \u03B5 > 0")
+                    self.layers_value = []
+            except:
+                self.QLineError(self.layers_entry, "Erreur: format t:\u03B5, t:\u03B5")
+                self.layers_value = []
+            return self.layers_value
+
+        def update_aperture_value():
+            try:
+                self.reset_style(self.aperture_entry)
+                aperture = int(self.aperture_entry.text())
+                if(aperture > 0):
+                    self.aperture_value = aperture
+                    self.aperture_entry.setPlaceholderText(str(aperture))
+                else:
+                    self.QLineError(self.aperture_entry, "Erreur: ouverture > 0")
+                    self.aperture_value = 50
+            except:
+                self.aperture_value = 50
+                self.aperture_entry.setPlaceholderText(str(self.aperture_value))
+                self.aperture_entry.clear()
+            return self.aperture_value
+
+        def update_jobs_value():
+            try:
+                self.reset_style(self.jobs_entry)
+                jobs = int(self.jobs_entry.text())
+                if(jobs > 0):
+                    self.jobs_value = jobs
+                    self.jobs_entry.setPlaceholderText(str(jobs))
+                else:
+                    self.QLineError(self.jobs_entry, "Erreur: processus > 0")
+                    self.jobs_value = None
+            except:
+                self.jobs_value = None
+                self.jobs_entry.setPlaceholderText(str(os.cpu_count()))
+                self.jobs_entry.clear()
+            kirchhoff_engine.n_jobs = self.jobs_value
+            return self.jobs_value
+
+        self.layers_entry.editingFinished.connect(update_layers_value)
+        self.layers_entry.editingFinished.connect(lambda: self.update_img(self.t0_lin_value, self.t0_exp_value, self.gain_const_value, self.gain_lin_value, self.gain_exp_value, self.cb_value, self.ce_value, self.sub_mean_value, self.cutoff_value, self.sampling_value))
+        self.aperture_entry.editingFinished.connect(update_aperture_value)
+        self.aperture_entry.editingFinished.connect(lambda: self.update_img(self.t0_lin_value, self.t0_exp_value, self.gain_const_value, self.gain_lin_value, self.gain_exp_value, self.cb_value, self.ce_value, self.sub_mean_value, self.cutoff_value, self.sampling_value))
+        # Le nombre de processus ne change pas l'image: aucun nouveau rendu
+        self.jobs_entry.editingFinished.connect(update_jobs_value)
+
         ######### Outils #########
         tools_layout = QVBoxLayout()
         ft_layout.addLayout(tools_layout)
@@ -934,6 +1549,40 @@ class MainWindow():
         self.eq_button.clicked.connect(self.equalization)
         tools_layout.addWidget(self.eq_button)
 
+        self.cache_button = QPushButton("Cache disque")
+        self.cache_button.clicked.connect(self.cache_butt)
+        tools_layout.addWidget(self.cache_button)
+
+        self.prefetch_button = QPushButton("Préchargement")
+        self.prefetch_button.clicked.connect(self.prefetch_butt)
+        self.prefetch_button.setStyleSheet("""     
+        QPushButton:active {
+            background-color: #45a049;}""")
+        tools_layout.addWidget(self.prefetch_button)
+
+        self.cscan_button = QPushButton("Vue C-scan")
+        self.cscan_button.clicked.connect(self.cscan_butt)
+        tools_layout.addWidget(self.cscan_button)
+
+        # Préréglages nommés du projet
+        preset_layout = QHBoxLayout()
+        tools_layout.addLayout(preset_layout)
+
+        self.preset_choice = QComboBox()
+        preset_layout.addWidget(self.preset_choice)
+
+        save_preset_button = QPushButton("Enregistrer")
+        save_preset_button.clicked.connect(self.save_preset)
+        preset_layout.addWidget(save_preset_button)
+
+        apply_preset_button = QPushButton("Appliquer")
+        apply_preset_button.clicked.connect(self.apply_preset)
+        preset_layout.addWidget(apply_preset_button)
+
+        self.override_button = QPushButton("Réglages propres au fichier")
+        self.override_button.clicked.connect(self.override_butt)
+        tools_layout.addWidget(self.override_button)
+
         ######### Analyse #########
         analyze_wid_ntb = QWidget()
         notebook.addTab(analyze_wid_ntb, "Analyse")
@@ -974,10 +1623,38 @@ class MainWindow():
         class_layout.addWidget(self.class_choice)
 
         self.shape_list = QListWidget()
+        self.shape_list.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
         analyze_layout.addWidget(self.shape_list)
         self.shape_list.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
         self.shape_list.customContextMenuRequested.connect(self.QCanvas.del_ele_list)
 
+        self.class_counts_label = QLabel("")
+        self.class_counts_label.setWordWrap(True)
+        analyze_layout.addWidget(self.class_counts_label)
+        self.update_class_counts()
+
+        detect_button = QPushButton("Détecter les hyperboles")
+        detect_button.clicked.connect(self.detect_hyperbolas)
+        analyze_layout.addWidget(detect_button)
+
+        detect_layout = QHBoxLayout()
+        analyze_layout.addLayout(detect_layout)
+
+        self.detect_label = QLabel("\u03B5 estimé: -")
+        detect_layout.addWidget(self.detect_label)
+
+        apply_eps_button = QPushButton("Appliquer \u03B5")
+        apply_eps_button.clicked.connect(self.apply_detected_epsilon)
+        detect_layout.addWidget(apply_eps_button)
+
+        self.velocity_button = QPushButton("Modèle de vitesse")
+        self.velocity_button.clicked.connect(self.velocity_butt)
+        analyze_layout.addWidget(self.velocity_button)
+
+        self.velocity_label = QLabel("")
+        self.velocity_label.setWordWrap(True)
+        analyze_layout.addWidget(self.velocity_label)
+
         ######### Données #########
 
         data_wid_ntb = QWidget()
@@ -1090,6 +1767,13 @@ class MainWindow():
         self.ypointer_label = QLabel()
         data_pointer_layout.addWidget(self.xpointer_label)
         data_pointer_layout.addWidget(self.ypointer_label)
+
+        self.hover_button = QPushButton("Survol")
+        self.hover_button.clicked.connect(self.hover_butt)
+        data_pointer_layout.addWidget(self.hover_button)
+
+        self.hover_label = QLabel()
+        data_pointer_layout.addWidget(self.hover_label)
         
         # scope_affichage = QPushButton("Actualiser le scope")
         # scope_affichage.clicked.connect(lambda: self.plot_scope())
@@ -1109,6 +1793,31 @@ class MainWindow():
         """
         q = self.slider.value()/100
 
+        attribute = self.attribute_choice.currentText()
+        if(attribute == "Phase instantanée"):
+            return -np.pi, np.pi
+
+        if(self.contrast_auto_state == "on" and self.img_stats != None):
+            # Bornes issues des percentiles de l'image affichée (calculés une fois par image)
+            if(attribute == "Amplitude"):
+                a = self.Rcontroller.stats_percentile(self.img_stats, 99.5, absolute=True)
+                return -a*q, a*q
+            low = self.Rcontroller.stats_percentile(self.img_stats, 0.5)
+            high = self.Rcontroller.stats_percentile(self.img_stats, 99.5)
+            if(attribute == "Enveloppe"):
+                return 0., high*q
+            mid = (low + high) / 2
+            return mid - (high - low)/2*q, mid + (high - low)/2*q
+
+        if(attribute == "Enveloppe"):
+            return 0., self.vmax*q
+        if(attribute == "Fréquence instantanée"):
+            # Fréquence de Nyquist (MHz)
+            f_max = 0.5
+            if(self.feature != None):
+                f_max = 0.5 / (self.Rcontroller.sampling_steps(self.feature)[0] * 10.**6)
+            return 0., f_max*q
+
         min = self.vmin*q
         max = self.vmax*q
 
@@ -1120,11 +1829,12 @@ class MainWindow():
         """
         s = time.time()
         try:
+            previous = self.selected_file
             self.selected_file = self.listbox_files.selectedItems()[0].text()
             self.file_index = self.listbox_files.currentRow() # Index du fichier sélectionné
+            self.switch_settings(previous, self.selected_file)
             self.file_path = os.path.join(self.selected_folder, self.selected_file)
             self.Rdata = RadarData(self.file_path)
-            self.Rcontroller = RadarController()
             self.feature = self.Rdata.get_feature()
 
             yindex = self.Yunit.index(self.ord_unit.currentText())
@@ -1135,32 +1845,52 @@ class MainWindow():
             else:
                 n_samp = self.feature[1] 
 
-            t_max = self.feature[3]
-            p_max = (t_max * 10.**(-9)) * (cste_global["c_lum"] / sqrt(self.epsilon)) / 2
-            L_max = [p_max, t_max, n_samp]
-            L_mult = [p_max / n_samp, t_max / n_samp, 1]
+            step = self.transform().sample_step(yindex)
 
-            self.cb_entry.setPlaceholderText(str(float(self.cb_value)*L_mult[yindex]))
+            self.cb_entry.setPlaceholderText(str(float(self.cb_value)*step))
 
             if(self.cb_entry.text() == ''):
                 if(self.ce_entry.text() == ''):
-                    self.ce_value = int(L_max[yindex] / L_mult[yindex])
-                    self.ce_entry.setPlaceholderText(str(round(L_max[yindex],2)))
+                    self.ce_value = int(n_samp)
+                    self.ce_entry.setPlaceholderText(str(round(n_samp * step,2)))
 
             self.max_tr = self.max_list_files()
             self.figure.set_facecolor('white')
             self.update_img(self.t0_lin_value, self.t0_exp_value, self.gain_const_value, self.gain_lin_value, self.gain_exp_value, self.cb_value, self.ce_value, self.sub_mean_value, self.cutoff_value, self.sampling_value)
             e = time.time()
             print(f"Temps: {e-s}")
+            self.prefetch_neighbours()
         except:
             print("Erreur Sélection fichier:")
             traceback.print_exc()
 
+    def prefetch_neighbours(self):
+        """
+    Méthode permettant de précharger en arrière-plan les fichiers voisins du fichier sélectionné avec les paramètres actuels.
+        """
+        try:
+            if(self.prefetch_state != "on"):
+                return
+            files = [self.listbox_files.item(row).text() for row in range(self.listbox_files.count())]
+            requests = []
+            for d in range(1, self.prefetch_depth + 1):
+                for index in [self.file_index + d, self.file_index - d]:
+                    if(index >= 0 and index < len(files)):
+                        params = self.processing_params(self.t0_lin_value, self.t0_exp_value, self.gain_const_value, self.gain_lin_value, self.gain_exp_value, self.cb_value, self.ce_value, self.sub_mean_value, self.cutoff_value, self.sampling_value, index)
+                        requests.append((os.path.join(self.selected_folder, files[index]), params))
+            self.prefetcher.prefetch(requests)
+        except:
+            print("Erreur lors du préchargement des fichiers voisins:")
+            traceback.print_exc()
+
     def max_list_files(self):
         """
     Méthode permettant de récupérer le nombre de traces maximal parmis une liste de fichiers.
+    Le résultat est conservé tant que le dossier et la liste de fichiers ne changent pas.
         """
         files = [self.listbox_files.item(row).text() for row in range(self.listbox_files.count())]
+        if(self.max_tr_key == (self.selected_folder, files)):
+            return self.max_tr
         max = 0
         for file in files:
             file_path = os.path.join(self.selected_folder, file)
@@ -1168,6 +1898,7 @@ class MainWindow():
             n_tr = Rdata.get_feature()[0]
             if(max < n_tr):
                 max = n_tr
+        self.max_tr_key = (self.selected_folder, files)
         return max
 
     def filter_list_file(self):
@@ -1297,6 +2028,95 @@ class MainWindow():
             print(f"Erreur Égalisation:")
             traceback.print_exc()
 
+    def cache_butt(self):
+        """
+    Méthode permettant d'activer le cache disque des images traitées.
+        """
+        try:
+            cache_status = ["off", "on"]
+            index = cache_status.index(self.cache_state) + 1
+            if(index+1 <= len(cache_status)):
+                self.cache_state = "on"
+                self.cache_button.setStyleSheet("""     
+                QPushButton:active {
+                    background-color: #45a049;}""")
+            else:
+                self.cache_state = "off"
+                self.cache_button.setStyleSheet("")
+        except:
+            print("Erreur Cache:")
+            traceback.print_exc()
+
+    def prefetch_butt(self):
+        """
+    Méthode permettant d'activer ou désactiver le préchargement des fichiers voisins.
+        """
+        try:
+            prefetch_status = ["off", "on"]
+            index = prefetch_status.index(self.prefetch_state) + 1
+            if(index+1 <= len(prefetch_status)):
+                self.prefetch_state = "on"
+                self.prefetch_button.setStyleSheet("""     
+                QPushButton:active {
+                    background-color: #45a049;}""")
+                self.prefetch_neighbours()
+            else:
+                self.prefetch_state = "off"
+                self.prefetch_button.setStyleSheet("")
+                self.prefetcher.clear()
+        except:
+            print("Erreur Préchargement:")
+            traceback.print_exc()
+
+    def contrast_auto_butt(self):
+        """
+    Méthode permettant d'activer ou désactiver le contraste automatique (bornes calculées à partir des percentiles de l'image).
+        """
+        try:
+            contrast_status = ["off", "on"]
+            index = contrast_status.index(self.contrast_auto_state) + 1
+            if(index+1 <= len(contrast_status)):
+                self.contrast_auto_state = "on"
+                self.contrast_auto_button.setStyleSheet("""     
+                QPushButton:active {
+                    background-color: #45a049;}""")
+            else:
+                self.contrast_auto_state = "off"
+                self.contrast_auto_button.setStyleSheet("")
+            self.update_img(self.t0_lin_value, self.t0_exp_value, self.gain_const_value, self.gain_lin_value, self.gain_exp_value, self.cb_value, self.ce_value, self.sub_mean_value, self.cutoff_value, self.sampling_value)
+        except:
+            print("Erreur Contraste automatique:")
+            traceback.print_exc()
+
+    def cscan_butt(self):
+        """
+    Méthode permettant d'afficher ou masquer la vue C-scan (le volume des profils est construit avec les paramètres actuels).
+        """
+        try:
+            cscan_status = ["off", "on"]
+            index = cscan_status.index(self.cscan_state) + 1
+            if(index+1 <= len(cscan_status)):
+                if(self.listbox_files.count() == 0):
+                    return
+                s = time.time()
+                volume = self.build_volume()
+                feature = RadarData(os.path.join(self.selected_folder, self.listbox_files.item(0).text())).get_feature()
+                self.QCScan.set_volume(volume, feature[3] / feature[1], int(self.cb_value), self.cscan_thickness, self.volume_depths(feature))
+                self.QCScan.widget.setVisible(True)
+                self.cscan_state = "on"
+                self.cscan_button.setStyleSheet("""     
+                QPushButton:active {
+                    background-color: #45a049;}""")
+                e = time.time()
+                print(f"Volume {volume.shape()}: {e-s} secondes")
+            else:
+                self.cscan_state = "off"
+                self.cscan_button.setStyleSheet("")
+                self.QCScan.widget.setVisible(False)
+        except:
+            print("Erreur Vue C-scan:")
+            traceback.print_exc()
+
     def radargram(self):
         layout = QVBoxLayout(self.radargram_widget)
 
@@ -1318,38 +2138,111 @@ class MainWindow():
         Méthode qui met à jour notre image avec les différentes applications possibles.
         """
         try:
-            self.img = self.Rdata.rd_img()
-            self.img_modified = self.img[int(cb):int(ce), :]
-
-            if(self.dewow_state == "on"):
-                self.img_modified = self.Rcontroller.dewow_filter(self.img_modified)
-
-            if(self.cutoff_entry.text() != '' and self.sampling_entry.text() != ''):
-                self.img_modified = self.Rcontroller.low_pass(self.img_modified, cutoff, sampling)
-
-            if(sub != None):
-                self.img_modified = self.Rcontroller.sub_mean(self.img_modified, sub)
-
-            if(self.inv_list_state == "on"):
-                if(self.file_index % 2 != 0):
-                    self.img_modified = np.fliplr(self.img_modified)
-
-            if(self.inv_state == "on"):
-                self.img_modified = np.fliplr(self.img_modified)
-            
-            self.img_modified = self.Rcontroller.apply_total_gain(self.img_modified, t0_lin, t0_exp, g, a_lin, a)
-
-            if(self.equal_state == "on"):
-                if self.img_modified.shape[1] < self.max_tr:
-                    # Ajouter des colonnes supplémentaires
-                    additional_cols = self.max_tr - self.img_modified.shape[1]
-                    self.img_modified = np.pad(self.img_modified, ((0, 0), (0, additional_cols)), mode='constant')            
+            params = self.processing_params(t0_lin, t0_exp, g, a_lin, a, cb, ce, sub, cutoff, sampling, self.file_index)
+            self.params = params
+            self.img_modified = self.get_processed_img(self.file_path, params)
+            self.img_display = self.get_display_img(self.file_path, params, self.img_modified)
+            self.img_stats = self.get_img_stats(self.file_path, params, self.img_display)
 
             self.update_axes(self.def_value, self.epsilon)
         except:
             print(f"Erreur dans l'affichage de l'image:")
             traceback.print_exc()
 
+    def processing_params(self, t0_lin: int, t0_exp: int, g: float, a_lin: float, a: float, cb: float, ce: float, sub, cutoff: float, sampling: float, file_index: int):
+        """
+        Méthode qui rassemble les paramètres de la chaîne de traitement sous une forme canonique (clé du cache).
+
+        Returns:
+            dict: Les paramètres utilisés par RadarController.process.
+        """
+        # Les valeurs passées en argument remplacent celles des attributs (validation en cours)
+        settings = self.settings()
+        settings["values"].update({"t0_lin_value": t0_lin, "t0_exp_value": t0_exp, "gain_const_value": g, "gain_lin_value": a_lin, "gain_exp_value": a,
+                                   "cb_value": cb, "ce_value": ce, "sub_mean_value": sub, "cutoff_value": cutoff, "sampling_value": sampling})
+        return canonical_params(settings, file_index, self.max_tr)
+
+    def get_processed_img(self, file_path: str, params: dict):
+        """
+        Méthode qui renvoie l'image traitée d'un fichier, en passant par le cache mémoire des fichiers préchargés.
+        """
+        img_modified = self.prefetcher.get(file_path, params)
+        if img_modified is None:
+            img_modified = self.load_processed_img(file_path, params)
+            self.prefetcher.put(file_path, params, img_modified)
+        return img_modified
+
+    def load_processed_img(self, file_path: str, params: dict):
+        """
+        Méthode qui lit et traite un fichier, en passant par le cache disque s'il est activé (appelée aussi depuis les threads de préchargement).
+        """
+        key = None
+        if(self.cache_state == "on"):
+            key = self.Pcache.key(file_path, params)
+            img_modified = self.Pcache.load(key)
+            if img_modified is not None:
+                return img_modified
+
+        feature = None
+        if(params["migration"] != None or params["whitening"] != None):
+            feature = RadarData(file_path).get_feature()
+        img_modified = self.Rcontroller.process(raw_cache.get(file_path), params, feature)
+
+        if(key != None):
+            self.Pcache.save(key, img_modified)
+        return img_modified
+
+    def get_display_img(self, file_path: str, params: dict, img_modified: np.ndarray):
+        """
+        Méthode qui renvoie l'image à afficher: l'image traitée ou l'attribut instantané sélectionné.
+        Les trois attributs sont calculés ensemble puis conservés en mémoire (et sur disque si le cache est activé).
+        """
+        attribute = self.attribute_choice.currentText()
+        if(attribute == "Amplitude"):
+            return img_modified
+
+        key = self.prefetcher.key(file_path, params)
+        if key in self.attributes_cache:
+            self.attributes_cache.move_to_end(key)
+            return self.attributes_cache[key][attribute]
+
+        attributes = None
+        if(self.cache_state == "on"):
+            keys = {name: self.Pcache.key(file_path, dict(params, attribute=name)) for name in ATTRIBUTES[1:]}
+            attributes = {name: self.Pcache.load(k) for name, k in keys.items()}
+            if any(img is None for img in attributes.values()):
+                attributes = None
+
+        if(attributes == None):
+            dt = None
+            if(self.feature != None):
+                dt = self.Rcontroller.sampling_steps(self.feature)[0]
+            attributes = self.Rcontroller.attributes(img_modified, dt)
+            if(self.cache_state == "on"):
+                for name, img in attributes.items():
+                    self.Pcache.save(keys[name], img)
+
+        self.attributes_cache[key] = attributes
+        while len(self.attributes_cache) > self.attributes_max:
+            self.attributes_cache.popitem(last=False)
+        return attributes[attribute]
+
+    def get_img_stats(self, file_path: str, params: dict, img_display: np.ndarray):
+        """
+        Méthode qui renvoie les statistiques d'amplitude de l'image affichée (calculées une seule fois par image et attribut).
+        """
+        if(self.contrast_auto_state != "on"):
+            return None
+        key = self.prefetcher.key(file_path, params) + (self.attribute_choice.currentText(),)
+        if key in self.stats_cache:
+            self.stats_cache.move_to_end(key)
+            return self.stats_cache[key]
+        stats = self.Rcontroller.amplitude_stats(img_display)
+        self.stats_cache[key] = stats
+        while len(self.stats_cache) > self.stats_max:
+            self.stats_cache.popitem(last=False)
+        return stats
+
     def update_axes(self, dist: float, epsilon: float):
         """
         Méthode qui met à jour les axes de notre image.
@@ -1357,40 +2250,26 @@ class MainWindow():
         try:
             self.update_canvas_image()
 
-            n_tr = self.feature[0] ### ----------------------------------------___> A suppr 
-            n_samp = self.feature[1]
-            d_max = self.feature[2]
-            t_max = self.feature[3]
-            p_max = (t_max * 10.**(-9)) * (cste_global["c_lum"] / sqrt(epsilon)) / 2
-            step_time = self.feature[5]
-
+            transform = self.transform(dist, epsilon)
             xindex = self.Xunit.index(self.abs_unit.currentText())
             yindex = self.Yunit.index(self.ord_unit.currentText())
-            L_xmult = [d_max / n_tr, step_time, 1]
-            L_ymult = [p_max / n_samp, t_max / n_samp, 1]
-            L_xmax = [d_max, step_time*n_tr, n_tr]
-
-            X = []
-            Y = []
-
-            if(self.equal_state == "on"):
-                X = np.linspace(0.,self.max_tr * L_xmult[xindex],10)
-                self.axes.set_xlabel(self.Xlabel[xindex])
-                Y = np.linspace(0, (self.ce_value - self.cb_value) * L_ymult[yindex], 10)
-                self.axes.set_ylabel(self.Ylabel[yindex])
-            else:
-                if(dist != None and self.abs_unit.currentText() == "Distance"):
-                    X = np.linspace(0.,dist,10)
-                    self.axes.set_xlabel(self.Xlabel[xindex])
-                else:
-                    X = np.linspace(0.,L_xmax[xindex],10)
-                    self.axes.set_xlabel(self.Xlabel[xindex])
-                Y = np.linspace(0., (self.ce_value - self.cb_value) * L_ymult[yindex], 10)
-                self.axes.set_ylabel(self.Ylabel[yindex])
+
+            X, Y = self.getPosXY(10, 10, transform)
+            self.axes.set_xlabel(self.Xlabel[xindex])
+            self.axes.set_ylabel(self.Ylabel[yindex])
 
             # Ajouter un titre à la figure
             self.figure.suptitle(self.selected_file[:-4], y=0.05, va="bottom")
-            self.axes.imshow(self.img_modified, cmap="gray", interpolation=self.interpolation_text.currentData(), aspect="auto", extent = [X[0],X[-1],Y[-1], Y[0]],vmin=self.getRangePlot()[0], vmax= self.getRangePlot()[1])
+            vmin, vmax = self.getRangePlot()
+            self.refresh_scope(X, Y, transform, yindex)
+            # Avec un modèle de vitesse, les lignes sont rééchantillonnées à pas constant en profondeur (table précalculée)
+            self.axes.imshow(transform.display_image(self.img_display, yindex), cmap="gray", interpolation=self.interpolation_text.currentData(), aspect="auto", extent = [X[0],X[-1],Y[-1], Y[0]],vmin=vmin, vmax=vmax)
+
+            # Correspondance pixel -> (trace, sample) et pas physiques, calculés une fois par rendu pour le survol
+            self.hover_setup(X, Y, transform, yindex)
+            self.QCanvas.shapes.set_extent(X[0], X[-1], Y[0], Y[-1])
+            if(not self.exporting):
+                self.QCanvas.restore_shapes(self.file_path)
             
             if(self.grille_radar_Y.isChecked()):
                 self.axes.grid(visible=self.grille_radar_Y.isChecked(), axis='y',linewidth = 0.5, color = "black", linestyle ='-.')
@@ -1415,20 +2294,13 @@ class MainWindow():
         try:
             n_tr = self.feature[0]
             n_samp = self.feature[1]
-            if(self.def_value != None):
-                d_max = self.def_value
-            else:
-                d_max = self.feature[2]
-            t_max = self.feature[3]
-            p_max = (t_max * 10.**(-9)) * (cste_global["c_lum"] / sqrt(epsilon)) / 2
-            step_time = self.feature[5]
             antenna = self.feature[6]
 
-
             xindex = self.Xunit.index(self.abs_unit.currentText())
             yindex = self.Yunit.index(self.ord_unit.currentText())
-            L_xmax = [d_max, step_time*n_tr, n_tr]
-            L_ymax = [p_max, t_max, n_samp]
+            transform = self.transform(self.def_value, epsilon)
+            L_xmax = [transform.trace_max(i) for i in range(len(self.Xunit))]
+            L_ymax = [transform.sample_max(i) for i in range(len(self.Yunit))]
 
             # Visibilité
             if(self.abs_unit.currentText() != "Distance"):
@@ -1529,8 +2401,8 @@ class MainWindow():
             self.t0_lin_label.setText("t0 " + self.ord_unit.currentText() + ":")
             self.t0_exp_label.setText("t0 " + self.ord_unit.currentText() + ":")
 
-            d_max = self.feature[2]
-            L_xmax = [d_max, step_time*n_tr, n_tr]
+            # Longueur enregistrée dans le fichier (sans la distance saisie)
+            L_xmax = [self.transform(None, epsilon).trace_max(i) for i in range(len(self.Xunit))]
             self.data_xlabel.setText(self.abs_unit.currentText() + ": {:.2f} {}".format(L_xmax[xindex], self.xLabel[xindex]))
             self.data_ylabel.setText(self.ord_unit.currentText() + ": {:.2f} {}".format(L_ymax[yindex], self.yLabel[yindex]))
 
@@ -1576,14 +2448,15 @@ class MainWindow():
     def reset_style(self, ledit):
         ledit.setStyleSheet("")
     
-    def plot_scope(self):
+    def scope(self):
+        """
+        Méthode créant une seule fois la vue du scope: les artistes (trace, pointeur) sont conservés et seules leurs données changent.
+        """
         layout_scope = QVBoxLayout(self.scope_widget)
 
         self.canvas_scope = self.QCanvas_scope.canvas
         layout_scope.addWidget(self.canvas_scope)
 
-        self.scope_figure.clear()
-        self.axes_scope = self.scope_figure.add_subplot(111)
         self.scope_figure.set_facecolor('white')
 
         self.axes_scope.set_xlabel("")
@@ -1593,65 +2466,335 @@ class MainWindow():
         self.axes_scope.xaxis.set_label_position('top')
         self.axes_scope.yaxis.set_ticks_position('none') 
 
-        pos = self.getPosXY(lenY=len(self.img_modified),
-                            lenX = len(self.img_modified[1]))
-        index_proche = np.argmin(np.abs(pos[0] - self.QCanvas.getXPointeur()))
-        
-        self.img_modified2 = self.img_modified[:,index_proche]
+        self.axes_scope.axvline(0, color='black', linewidth=1) #Trait au milieu de déco
 
-        self.axes_scope.plot(self.img_modified2,pos[1])
+        # Artistes animés: redessinés par blit sur le fond mémorisé au dernier dessin complet
+        self.scope_line, = self.axes_scope.plot([], [], animated=True)
+        self.scope_hline = self.axes_scope.axhline(0., color='red', linewidth=1, animated=True)
+        self.scope_hline.set_visible(False)
+        self.scope_background = None
+        self.scope_index = None
+        self.scope_axes = None
+        self.canvas_scope.mpl_connect('draw_event', self.scope_on_draw)
+
+        # Le scope suit la souris sur le radargramme, la lecture du survol aussi (si activée)
+        self.hover_map = None
+        self.hover_background = None
+        self.canvas.mpl_connect('motion_notify_event', self.scope_follow)
+        self.canvas.mpl_connect('motion_notify_event', self.hover)
+        self.canvas.mpl_connect('draw_event', self.hover_on_draw)
+
+    def refresh_scope(self, X: np.ndarray, Y: np.ndarray, transform: CoordinateTransform = None, yindex: int = None):
+        """
+        Méthode mettant à jour les bornes du scope et la correspondance abscisse -> trace après un changement d'image ou d'axes.
 
-        self.axes_scope.set_xlim(xmin= self.getRangePlot()[0], xmax=self.getRangePlot()[1]) #Bornes axes 
-        self.axes_scope.set_ylim(ymin=min(pos[1]), ymax= max(pos[1]))
-        self.axes_scope.invert_yaxis()
+        Args:
+            X, Y (ndarray): Axes du radargramme (voir update_axes)
+            transform (CoordinateTransform): Conversions du fichier (profondeur des samples avec un modèle de vitesse)
+            yindex (int): Unité des ordonnées
+        """
+        n_samp = self.img_display.shape[0]
+        # La trace la plus proche d'une abscisse se calcule directement à partir des bornes
+        if(transform != None and transform.nonlinear(yindex)):
+            self.scope_axes = (X[0], X[-1], transform.y_coords(np.arange(n_samp), yindex))
+        else:
+            self.scope_axes = (X[0], X[-1], np.linspace(Y[0], Y[-1], n_samp))
+        self.scope_index = None
+        self.scope_background = None
+
+        vmin, vmax = self.getRangePlot()
+        self.axes_scope.set_xlim(xmin=vmin, xmax=vmax) #Bornes axes 
+        self.axes_scope.set_ylim(ymin=max(Y[0], Y[-1]), ymax=min(Y[0], Y[-1]))
+        if(self.QCanvas.getXPointeur() != None):
+            self.update_scope(self.QCanvas.getXPointeur(), self.QCanvas.getYPointeur(), draw=False)
+        self.canvas_scope.draw_idle()
+
+    def scope_trace_index(self, x: float):
+        """
+        Méthode renvoyant l'indice de la trace affichée la plus proche de l'abscisse x.
+        """
+        x0, x1, _ = self.scope_axes
+        n_tr = self.img_display.shape[1]
+        if(x1 == x0):
+            return 0
+        # Chaque trace occupe une colonne de largeur (x1 - x0) / n_tr de l'image (extent de imshow)
+        return int(min(max(int((x - x0) / (x1 - x0) * n_tr), 0), n_tr - 1))
+
+    def update_scope(self, x: float, y: float, draw: bool = True):
+        """
+        Méthode affichant dans le scope la trace sous l'abscisse x et la position y du pointeur.
+        """
+        if(self.scope_axes == None or x == None or y == None):
+            return
+        index = self.scope_trace_index(x)
+        if(index != self.scope_index):
+            self.scope_line.set_data(self.img_display[:, index], self.scope_axes[2])
+            self.scope_index = index
+        self.scope_hline.set_ydata([y, y])
+        self.scope_hline.set_visible(True)
+        if(draw):
+            self.blit_scope()
+
+    def blit_scope(self):
+        """
+        Méthode redessinant uniquement la trace et le pointeur du scope (dessin complet si aucun fond n'est mémorisé).
+        """
+        if(self.scope_background == None):
+            self.canvas_scope.draw_idle()
+            return
+        self.canvas_scope.restore_region(self.scope_background)
+        self.axes_scope.draw_artist(self.scope_line)
+        self.axes_scope.draw_artist(self.scope_hline)
+        self.canvas_scope.blit(self.scope_figure.bbox)
+
+    def scope_on_draw(self, event):
+        """
+        Méthode appelée après chaque dessin complet du scope: mémorise le fond et dessine les artistes animés.
+        """
+        self.scope_background = self.canvas_scope.copy_from_bbox(self.scope_figure.bbox)
+        self.axes_scope.draw_artist(self.scope_line)
+        self.axes_scope.draw_artist(self.scope_hline)
 
-        self.axes_scope.axvline(0, color='black', linewidth=1) #Trait au milieu de déco
-        
-        if(self.lineScope != None):  # POsition pointeur sur scope
-            self.axes_scope.lines[0].remove()
-            self.axes_scope.lines[0].remove()
-        self.axes_scope.axhline(self.QCanvas.getYPointeur(), color='red', linewidth=1)
+    def scope_follow(self, event):
+        """
+        Méthode appelée au déplacement de la souris sur le radargramme: le scope affiche la trace survolée
+        (ou celle du pointeur lorsque la souris quitte l'image).
+        """
+        if(self.QCanvas.mode != "Pointer" or self.scope_axes == None):
+            return
+        if(event.inaxes == self.axes and event.xdata != None):
+            self.update_scope(event.xdata, event.ydata)
+        elif(self.QCanvas.getXPointeur() != None):
+            self.update_scope(self.QCanvas.getXPointeur(), self.QCanvas.getYPointeur())
 
-        self.canvas_scope.draw()
+    def plot_scope(self):
+        """
+        Méthode affichant dans le scope la trace du pointeur (appelée au clic).
+        """
+        self.update_scope(self.QCanvas.getXPointeur(), self.QCanvas.getYPointeur())
 
-    def getPosXY(self, lenX:int = 10, lenY:int = 10):
+    def hover_butt(self):
         """
-            Calcul les axes X, Y du radargramm
-            Retourne X, Y
+    Méthode permettant d'activer ou désactiver le survol (lecture continue sous la souris: trace, distance, temps, profondeur et amplitude).
+        """
+        try:
+            hover_status = ["off", "on"]
+            index = hover_status.index(self.hover_state) + 1
+            if(index+1 <= len(hover_status)):
+                self.hover_state = "on"
+                self.hover_button.setStyleSheet("""     
+                QPushButton:active {
+                    background-color: #45a049;}""")
+            else:
+                self.hover_state = "off"
+                self.hover_button.setStyleSheet("")
+                self.hover_label.setText("")
+                self.hover_hide()
+        except:
+            print("Erreur survol:")
+            traceback.print_exc()
+
+    def hover_setup(self, X: np.ndarray, Y: np.ndarray, transform: CoordinateTransform, yindex: int):
+        """
+        Méthode mémorisant, pour le rendu courant, la correspondance pixel -> (trace, sample) et créant le réticule du survol.
+
+        Args:
+            X, Y (ndarray): Axes du radargramme (voir update_axes)
+            transform (CoordinateTransform): Conversions du fichier (pas physiques, profondeur des samples)
+            yindex (int): Unité des ordonnées
+        """
+        n_samp, n_tr = self.img_display.shape
+        # Une colonne (ligne) de l'image par trace (sample): l'indice se calcule en O(1) à partir des bornes
+        # (recherche dans la table des profondeurs avec un modèle de vitesse)
+        self.hover_map = (X[0], (X[-1] - X[0]) / n_tr, Y[0], (Y[-1] - Y[0]) / n_samp, n_tr, n_samp, transform, yindex)
+        self.hover_vline = self.axes.axvline(X[0], color='yellow', linewidth=0.8, animated=True)
+        self.hover_hline = self.axes.axhline(Y[0], color='yellow', linewidth=0.8, animated=True)
+        self.hover_vline.set_visible(False)
+        self.hover_hline.set_visible(False)
+        self.hover_background = None
+
+    def hover_on_draw(self, event):
+        """
+        Méthode appelée après chaque dessin complet du radargramme: mémorise le fond utilisé par le blit du réticule.
+        """
+        if(self.hover_map != None):
+            self.hover_background = self.canvas.copy_from_bbox(self.axes.bbox)
+
+    def hover_index(self, x: float, y: float):
         """
-        if(self.def_value != None):
-            dist = self.def_value
+        Méthode renvoyant la trace et le sample affichés sous le point (x, y) des axes.
+        """
+        x0, sx, y0, sy, n_tr, n_samp, transform, yindex = self.hover_map
+        trace = int(min(max((x - x0) / sx if sx != 0 else 0, 0), n_tr - 1))
+        if(transform.nonlinear(yindex)):
+            row = float(transform.y_rows(y - y0, yindex))
         else:
-            dist = self.feature[2]
-        epsilon = self.epsilon
+            row = (y - y0) / sy if sy != 0 else 0
+        sample = int(min(max(row, 0), n_samp - 1))
+        return trace, sample
 
-        n_tr = self.feature[0]
-        n_samp = self.feature[1]
-        d_max = self.feature[2]
-        t_max = self.feature[3]
-        p_max = (t_max * 10.**(-9)) * (cste_global["c_lum"] / sqrt(epsilon)) / 2
-        step_time = self.feature[5]
+    def hover(self, event):
+        """
+        Méthode appelée au déplacement de la souris sur le radargramme en mode survol: met à jour la lecture et le réticule (blit).
+        """
+        if(self.hover_state != "on" or self.hover_map == None):
+            return
+        if(event.inaxes != self.axes or event.xdata == None):
+            self.hover_hide()
+            return
+        trace, sample = self.hover_index(event.xdata, event.ydata)
+        transform = self.hover_map[6]
+        amplitude = self.img_display[sample, trace]
+        self.hover_label.setText("Trace {} | {:.2f} m\nSample {} | {:.2f} ns | {:.2f} m\nAmplitude {:.4g}".format(
+            trace, trace * transform.trace_step(0), sample, sample * transform.sample_step(1), float(transform.y_coords(sample, 0)), amplitude))
+
+        self.hover_vline.set_xdata([event.xdata, event.xdata])
+        self.hover_hline.set_ydata([event.ydata, event.ydata])
+        self.hover_vline.set_visible(True)
+        self.hover_hline.set_visible(True)
+        self.blit_hover()
+
+    def hover_hide(self):
+        """
+        Méthode masquant le réticule du survol.
+        """
+        if(self.hover_map == None or not self.hover_vline.get_visible()):
+            return
+        self.hover_vline.set_visible(False)
+        self.hover_hline.set_visible(False)
+        self.blit_hover()
 
-        xindex = self.Xunit.index(self.abs_unit.currentText())
-        yindex = self.Yunit.index(self.ord_unit.currentText())
-        L_xmult = [d_max / n_tr, step_time, 1]
-        L_ymult = [p_max / n_samp, t_max / n_samp, 1]
-        L_xmax = [d_max, step_time*n_tr, n_tr]
+    def blit_hover(self):
+        """
+        Méthode redessinant uniquement le réticule sur le fond mémorisé du radargramme.
+        """
+        if(self.hover_background == None):
+            return
+        self.canvas.restore_region(self.hover_background)
+        self.axes.draw_artist(self.hover_vline)
+        self.axes.draw_artist(self.hover_hline)
+        self.canvas.blit(self.axes.bbox)
+
+    def detect_hyperbolas(self):
+        """
+        Méthode détectant les hyperboles de diffraction de l'image affichée, ajoutant leurs apex comme points
+        et proposant la permittivité médiane des détections.
+        """
+        try:
+            if(self.selected_file == None):
+                return
+            start_time = time.time()
+            dt, dx = self.Rcontroller.sampling_steps(self.feature, self.def_value)
+            detections = self.detector.detect(self.img_modified, dt, dx)
+            end_time = time.time()
+            print(f"Détection des hyperboles: {len(detections)} en {end_time - start_time:.2f} secondes")
+            self.detections = detections
+            if(len(detections) == 0):
+                self.detected_epsilon = None
+                self.detect_label.setText("\u03B5 estimé: -")
+                return
+
+            # Centre des pixels dans le repère de l'image affichée (voir update_axes)
+            xindex = self.Xunit.index(self.abs_unit.currentText())
+            yindex = self.Yunit.index(self.ord_unit.currentText())
+            xs, ys = self.transform().to_axes(detections["trace"] + 0.5, detections["sample"] + 0.5, xindex, yindex)
+            self.QCanvas.add_points(self.class_choice.currentText(), xs, ys)
 
-        X = []
-        Y = []
+            self.detected_epsilon = round(float(np.median(detections["epsilon"])), 2)
+            self.detect_label.setText(f"\u03B5 estimé: {self.detected_epsilon} ({len(detections)} hyperboles)")
+        except:
+            print("Erreur lors de la détection des hyperboles:")
+            traceback.print_exc()
 
-        if(self.equal_state == "on"):
-            X = np.linspace(0.,self.max_tr * L_xmult[xindex],lenX)
-            Y = np.linspace(0, (self.ce_value - self.cb_value) * L_ymult[yindex], lenY)
-        else:
-            if(dist != None and self.abs_unit.currentText() == "Distance"):
-                X = np.linspace(0.,dist,lenX)
+    def apply_detected_epsilon(self):
+        """
+        Méthode appliquant la permittivité estimée par la détection des hyperboles.
+        """
+        if(self.detected_epsilon != None):
+            self.epsilon_entry.setText(str(self.detected_epsilon))
+            self.epsilon_entry.editingFinished.emit()
+
+    def velocity_butt(self):
+        """
+    Méthode permettant d'activer ou désactiver le modèle de vitesse en couches, ajusté sur les hyperboles détectées
+    (la profondeur des axes, des annotations et des C-scans devient la profondeur vraie).
+        """
+        try:
+            velocity_status = ["off", "on"]
+            index = velocity_status.index(self.velocity_state) + 1
+            if(index+1 <= len(velocity_status)):
+                if(self.detections is None or len(self.detections) == 0):
+                    self.velocity_label.setText("Aucune hyperbole détectée")
+                    return
+                # Temps double des apex depuis le début du fichier (découpage inclus), la surface étant au temps zéro
+                dt_ns = self.feature[3] / self.feature[1]
+                times = (self.cb_value + self.detections["sample"]) * dt_ns
+                self.velocity_model = VelocityModel.from_hyperbolas(times, self.detections["epsilon"], self.time_zero_sample() * dt_ns)
+                self.velocity_state = "on"
+                self.velocity_button.setStyleSheet("""     
+                QPushButton:active {
+                    background-color: #45a049;}""")
+                self.velocity_label.setText("\n".join(f"{top:.1f} ns: \u03B5 = {eps:.2f}" for top, eps in zip(self.velocity_model.tops, self.velocity_model.epsilons)))
             else:
-                X = np.linspace(0.,L_xmax[xindex],lenX)
-            Y = np.linspace(0., (self.ce_value - self.cb_value) * L_ymult[yindex], lenY)
+                self.velocity_model = None
+                self.velocity_state = "off"
+                self.velocity_button.setStyleSheet("")
+                self.velocity_label.setText("")
+            if(self.selected_file != None):
+                self.update_axes(self.def_value, self.epsilon)
+        except:
+            print("Erreur modèle de vitesse:")
+            traceback.print_exc()
+
+    def time_zero_sample(self):
+        """
+        Méthode renvoyant le temps zéro (surface) du fichier affiché, en samples depuis le début du fichier:
+        0 si la correction du temps zéro est appliquée (première arrivée ramenée au sample 0), sinon première arrivée pointée (médiane des traces).
+        """
+        if(self.time_zero_choice.currentText() != "Manuel"):
+            return 0.
+        return float(np.median(self.Rcontroller.pick_time_zero(raw_cache.get(self.file_path))))
+
+    def transform(self, distance: float = "def", epsilon: float = None):
+        """
+        Méthode renvoyant les conversions d'unités du fichier affiché (un objet par fichier et jeu de paramètres, conservé).
 
-        return X,Y
+        Args:
+            distance (float): Longueur du profil (par défaut: def_value)
+            epsilon (float): Permittivité (par défaut: epsilon)
+
+        Returns:
+            CoordinateTransform: Conversions indices <-> unités des axes.
+        """
+        if(distance == "def"):
+            distance = self.def_value
+        if(epsilon == None):
+            epsilon = self.epsilon
+        velocity_key = self.velocity_model.key if self.velocity_model != None else None
+        key = (tuple(self.feature), epsilon, distance, self.cb_value, self.ce_value, velocity_key)
+        if key in self.transforms:
+            self.transforms.move_to_end(key)
+            return self.transforms[key]
+        transform = CoordinateTransform(self.feature, epsilon, distance, self.cb_value, self.ce_value, self.velocity_model)
+        self.transforms[key] = transform
+        while len(self.transforms) > 16:
+            self.transforms.popitem(last=False)
+        return transform
+
+    def getPosXY(self, lenX:int = 10, lenY:int = 10, transform: CoordinateTransform = None):
+        """
+            Calcul les axes X, Y du radargramm
+            Retourne X, Y
+        """
+        if(transform == None):
+            transform = self.transform()
+        xindex = self.Xunit.index(self.abs_unit.currentText())
+        yindex = self.Yunit.index(self.ord_unit.currentText())
+
+        n_tr = None
+        if(self.equal_state == "on"):
+            n_tr = self.max_tr
+        return transform.axes(xindex, yindex, lenX, lenY, n_tr)
 
 if __name__ == '__main__':
     software_name = "NablaPy"
@@ -0,0 +1,227 @@
+import os
+import json
+import hashlib
+import threading
+import traceback
+import numpy as np
+from collections import OrderedDict
+from RadarData import RadarData
+
+class ProcessedCache:
+    """ProcessedCache: Classe permettant de conserver sur disque les images déjà traitées"""
+    def __init__(self, folder: str = None, max_bytes: int = 2 * 1024**3, max_hashes: int = 256):
+        """
+        Constructeur de la classe ProcessedCache.
+
+        Args:
+            folder (str): Dossier de stockage des fichiers .npy (par défaut: ./cache à côté du script)
+            max_bytes (int): Taille maximale occupée par le cache sur le disque
+            max_hashes (int): Nombre d'empreintes de fichiers conservées en mémoire
+        """
+        if(folder == None):
+            current_script_path = os.path.abspath(__file__)
+            folder = os.path.dirname(current_script_path) + "/cache/"
+        self.folder = folder
+        self.max_bytes = max_bytes
+        # Empreintes des fichiers déjà hachés: (chemin, taille, mtime) -> empreinte (les plus récentes en dernier)
+        self.max_hashes = max_hashes
+        self._hashes = OrderedDict()
+        # Les threads de préchargement calculent aussi des clés
+        self.lock = threading.Lock()
+
+    ############################ Méthode ############################
+
+    def file_hash(self, path: str):
+        """
+        Méthode permettant de calculer l'empreinte (sha1) du contenu d'un fichier radar.
+        L'empreinte est mémorisée tant que la taille et la date de modification du fichier sont inchangées.
+
+        Args:
+            path (str): Chemin du fichier radar
+
+        Returns:
+            str: L'empreinte du fichier.
+        """
+        stat = os.stat(path)
+        stamp = (path, stat.st_size, stat.st_mtime_ns)
+        with self.lock:
+            if stamp in self._hashes:
+                self._hashes.move_to_end(stamp)
+                return self._hashes[stamp]
+        # Lecture du fichier hors du verrou
+        sha = hashlib.sha1()
+        with open(path, mode='rb') as data:
+            for chunk in iter(lambda: data.read(1024**2), b""):
+                sha.update(chunk)
+        digest = sha.hexdigest()
+        with self.lock:
+            self._hashes[stamp] = digest
+            while len(self._hashes) > self.max_hashes:
+                self._hashes.popitem(last=False)
+        return digest
+
+    def key(self, path: str, params: dict):
+        """
+        Méthode permettant de construire la clé d'une image traitée.
+
+        Args:
+            path (str): Chemin du fichier radar
+            params (dict): Paramètres canoniques de la chaîne de traitement
+
+        Returns:
+            str: La clé (empreinte du fichier + paramètres).
+        """
+        canonical = json.dumps(params, sort_keys=True)
+        return hashlib.sha1((self.file_hash(path) + canonical).encode()).hexdigest()
+
+    def load(self, key: str):
+        """
+        Méthode permettant de relire une image traitée (lecture en memmap).
+
+        Args:
+            key (str): Clé de l'image
+
+        Returns:
+            ndarray | None: L'image traitée ou None si elle n'est pas dans le cache.
+        """
+        filename = self.folder + key + ".npy"
+        if not os.path.exists(filename):
+            return None
+        try:
+            # Mise à jour de la date d'accès pour l'éviction
+            os.utime(filename)
+            return np.load(filename, mmap_mode='r')
+        except:
+            print("Erreur lors de la lecture du cache:")
+            traceback.print_exc()
+            return None
+
+    def save(self, key: str, img: np.ndarray):
+        """
+        Méthode permettant d'enregistrer une image traitée dans le cache.
+
+        Args:
+            key (str): Clé de l'image
+            img (ndarray): Image traitée
+        """
+        try:
+            os.makedirs(self.folder, exist_ok=True)
+            filename = self.folder + key + ".npy"
+            # Écriture dans un fichier temporaire puis renommage (écriture atomique)
+            tmp_filename = filename + "." + str(os.getpid()) + "_" + str(threading.get_ident()) + ".tmp"
+            with open(tmp_filename, mode='wb') as tmp:
+                np.save(tmp, np.ascontiguousarray(img))
+            os.replace(tmp_filename, filename)
+            self.evict()
+        except:
+            print("Erreur lors de l'écriture du cache:")
+            traceback.print_exc()
+
+    def evict(self):
+        """
+        Méthode supprimant les images les plus anciennes lorsque le cache dépasse sa taille maximale.
+        """
+        entries = []
+        total = 0
+        for name in os.listdir(self.folder):
+            if name.endswith(".npy"):
+                stat = os.stat(self.folder + name)
+                entries.append((stat.st_mtime, stat.st_size, name))
+                total += stat.st_size
+        entries.sort()
+        for _, size, name in entries:
+            if(total <= self.max_bytes):
+                break
+            os.remove(self.folder + name)
+            total -= size
+
+    def clear(self):
+        """
+        Méthode vidant entièrement le cache.
+        """
+        if os.path.exists(self.folder):
+            for name in os.listdir(self.folder):
+                if name.endswith(".npy"):
+                    os.remove(self.folder + name)
+
+class RawCache:
+    """RawCache: Classe conservant en mémoire les tableaux bruts déjà lus (éviction LRU selon un budget en octets)"""
+    def __init__(self, max_bytes: int = 1024**3):
+        """
+        Constructeur de la classe RawCache.
+
+        Args:
+            max_bytes (int): Budget mémoire maximal occupé par les tableaux bruts
+        """
+        self.max_bytes = max_bytes
+        self.arrays = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    ############################ Méthode ############################
+
+    def get(self, path: str):
+        """
+        Méthode renvoyant le tableau brut d'un fichier radar, lu sur le disque uniquement s'il n'est pas en mémoire.
+        La clé (chemin, mtime) invalide l'entrée si le fichier est modifié.
+
+        Args:
+            path (str): Chemin du fichier radar
+
+        Returns:
+            ndarray: Le tableau brut (en lecture seule, il ne doit pas être modifié sur place).
+        """
+        key = (path, os.stat(path).st_mtime_ns)
+        with self.lock:
+            if key in self.arrays:
+                self.arrays.move_to_end(key)
+                self.hits += 1
+                return self.arrays[key]
+            self.misses += 1
+
+        img = RadarData(path).rd_img()
+        if img is None:
+            return img
+
+        with self.lock:
+            if key not in self.arrays:
+                self.arrays[key] = img
+                self.nbytes += img.nbytes
+            self.evict()
+        return img
+
+    def evict(self):
+        """
+        Méthode supprimant les tableaux les moins récemment utilisés tant que le budget est dépassé.
+        """
+        while self.nbytes > self.max_bytes and len(self.arrays) > 1:
+            _, img = self.arrays.popitem(last=False)
+            self.nbytes -= img.nbytes
+
+    def set_budget(self, max_bytes: int):
+        """
+        Méthode modifiant le budget mémoire du cache.
+        """
+        with self.lock:
+            self.max_bytes = max_bytes
+            self.evict()
+
+    def stats(self):
+        """
+        Méthode renvoyant les compteurs du cache.
+
+        Returns:
+            dict: Succès, échecs, nombre de tableaux et octets occupés.
+        """
+        with self.lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self.arrays), "bytes": self.nbytes}
+
+    def clear(self):
+        with self.lock:
+            self.arrays.clear()
+            self.nbytes = 0
+
+# Cache partagé par tout le processus (sélection, sauvegardes, exports, préchargement)
+raw_cache = RawCache()
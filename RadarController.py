@@ -1,6 +1,22 @@
 import numpy as np
 import traceback
-from scipy import signal
+from scipy import signal, fft
+import Kernels
+from Migration import fk_engine, kirchhoff_engine, velocity, interval_velocity
+from Spectral import spectral_engine
+
+# Politique numérique: tampons de travail en float32, accumulations (moyennes) en float64
+WORK_DTYPE = np.float32
+ACC_DTYPE = np.float64
+
+# Attributs affichables (l'amplitude est l'image traitée elle-même)
+ATTRIBUTES = ["Amplitude", "Enveloppe", "Phase instantanée", "Fréquence instantanée"]
+
+# Filtre SVD: au-delà de SVD_CHUNK traces, le fond est estimé par blocs recouvrants
+SVD_CHUNK = 4096
+
+# Étapes nécessitant un tampon float32 intermédiaire (sinon découpage, dewow et gain sont fusionnés)
+FLOAT_STAGES = ["cutoff", "sub_mean", "svd", "migration", "agc", "decon", "whitening"]
 
 class RadarController():
     """RadarController: Classe permettant de modifier l'image radar"""
@@ -12,7 +28,7 @@ class RadarController():
     
     ############################ Méthode ############################
 
-    def apply_total_gain(self, img: np.ndarray, t0_lin: int, t0_exp: int, g: float, a_lin: float, a: float):
+    def apply_total_gain(self, img: np.ndarray, t0_lin: int, t0_exp: int, g: float, a_lin: float, a: float, bits: int = None):
         """
         Méthode permettant d'appliquer le gain souhaité à l'image.
 
@@ -21,54 +37,51 @@ class RadarController():
                 g (float): Coefficient du gain normal
                 a_lin (float): Coefficient du gain linéaire (Fonction linéaire f:x --> a(x-t0)
                 a (float): Coefficient d'atténuation de l'exponentielle (Fonction exponentielle: f: x --> exp(a(x-t0)))
+                bits (int): Nombre de bits des données brutes, pour l'écrêtage (par défaut: déduit de img)
 
         Returns:
-                ndarray : Retourne le tableau traité.
+                ndarray : Retourne le tableau traité (float32).
         """
-        # Conversion de l'image en flottant pour effectuer les calculs
         image_float = None
         try:
-            bits = self.get_bit_img(img)
-            image_float = img.astype("float"+str(bits))
-            samples = image_float.shape[0]
-            fgain = None
-            if(bits == 16):
-                fgain = np.ones(samples, dtype=np.float16)
-            else:
-                if(bits == 32):
-                    fgain = np.ones(samples, dtype=np.float32)
-                else:
-                    if(bits == 64):
-                        fgain = np.ones(samples, dtype=np.float64)
-                        print("Attention 64 bits")
-                    else:
-                        print(f"Erreur: bits{bits}")
-            L = np.arange(samples)
-            
-            # Gain constant
-            fgain *= g
-
-            # Gain linéaire
-            b_lin= 1 - a_lin*t0_lin
-            #fgain[t0_lin:] += a_lin*(L[t0_lin:]-t0_lin)
-            fgain[t0_lin:] += a_lin*L[t0_lin:]+b_lin
-            
-            # Gain exponentiel
-
-            # test : 
-            a = 1 + a/10
-            
-            if(a != 0 and a != 1):
-                b = np.log(a) / 75
-                fgain[t0_exp:] += a * (np.exp(b * (L[t0_exp:]-t0_exp)))
-
-            image_float = image_float * fgain[:, np.newaxis]
-            image_float = np.clip(image_float,-(2**bits)+1, (2**bits)-1, dtype=image_float.dtype)
+            if(bits == None):
+                bits = self.get_bit_img(img)
+            fgain = self.gain_vector(img.shape[0], t0_lin, t0_exp, g, a_lin, a)
+            # Une seule allocation: la conversion en flottant se fait pendant la multiplication
+            image_float = Kernels.gain_clip(img, fgain, float((2**bits)-1))
             return image_float
         except:
             print("Erreur lors de l'application des gains:")
             traceback.print_exc()
             return image_float
+
+    def gain_vector(self, samples: int, t0_lin: int, t0_exp: int, g: float, a_lin: float, a: float):
+        """
+        Méthode calculant le gain total à appliquer à chaque sample (voir apply_total_gain).
+
+        Returns:
+                ndarray : Le gain par sample (float32).
+        """
+        fgain = np.ones(samples, dtype=WORK_DTYPE)
+        L = np.arange(samples, dtype=WORK_DTYPE)
+        
+        # Gain constant
+        fgain *= g
+
+        # Gain linéaire
+        b_lin= 1 - a_lin*t0_lin
+        #fgain[t0_lin:] += a_lin*(L[t0_lin:]-t0_lin)
+        fgain[t0_lin:] += a_lin*L[t0_lin:]+b_lin
+        
+        # Gain exponentiel
+
+        # test : 
+        a = 1 + a/10
+        
+        if(a != 0 and a != 1):
+            b = np.log(a) / 75
+            fgain[t0_exp:] += a * (np.exp(b * (L[t0_exp:]-t0_exp)))
+        return fgain
     
     
     def get_bit_img(self, img: np.ndarray):
@@ -104,43 +117,267 @@ class RadarController():
             - Tableau de données avec le filtre dewow appliqué.
         """
         try:
-            # Calculer la moyenne par colonne
-            col_mean = np.mean(img, axis=0, dtype=img.dtype)
+            # Calculer la moyenne par colonne (accumulation en float64)
+            col_mean = np.mean(img, axis=0, dtype=ACC_DTYPE).astype(WORK_DTYPE)
             # Soustraire la moyenne de chaque colonne au tableau d'entrée
-            dewowed_arr = img - col_mean
+            dewowed_arr = np.subtract(img, col_mean, dtype=WORK_DTYPE)
             return dewowed_arr
         except:
             print("Erreur lors de l'application du filtre dewow:")
             traceback.print_exc()
 
-    def sub_mean(self, img: np.ndarray, j: int):
+    def sub_mean(self, img: np.ndarray, j: int, inplace: bool = False):
+        """
+        Méthode soustrayant à chaque trace la trace moyenne de ses voisines.
+
+        Args:
+                img (ndarray): Image d'entrée.
+                j (int): Demi-largeur de la fenêtre en traces (0: trace moyenne de toute l'image).
+                inplace (bool): Modifier img directement s'il s'agit déjà d'un tampon float32 (évite une copie).
+
+        Returns:
+                ndarray : Retourne le tableau traité.
+        """
         try:
-            bits = self.get_bit_img(img)
-            array = img.astype("float"+str(bits))
-            n_tr = array.shape[1]
+            if(inplace and img.dtype == WORK_DTYPE and img.flags.writeable):
+                array = img
+            else:
+                array = img.astype(WORK_DTYPE)
             if j==0:
-                mean_tr = np.mean(array, axis=1, dtype=array.dtype)
-                for k in range(n_tr):
-                    array[:,k] = array[:,k] - mean_tr
+                mean_tr = np.mean(array, axis=1, dtype=ACC_DTYPE)
+                array -= mean_tr[:, np.newaxis]
             else:
-                start = j
-                end = n_tr - j
-                ls=np.arange(start, end, 1,)
-                for l in ls:
-                    mean_tr = np.mean(array[:, l-j:l+j], axis=1, dtype=array.dtype)
-                    array[:,int(l)] = array[:,l] - mean_tr
-                mean_l = np.mean(array[:, 0:start], axis=1, dtype=array.dtype)
-                mean_r = np.mean(array[:, end:n_tr], axis=1, dtype=array.dtype)
-                for l in np.arange(0, start, 1):
-                    array[:,int(l)] = array[:,l] - mean_l
-                for l in np.arange(end, n_tr, 1):
-                    array[:,int(l)] = array[:,l] - mean_r
+                # Moyenne glissante mise à jour de façon incrémentale (noyau Numba ou NumPy)
+                array = Kernels.sub_mean_running(array, j)
             return array
         except:
             print("Erreur lors de l'application de la trace moyenne:")
             traceback.print_exc()
             return img
 
+    def low_rank(self, img: np.ndarray, rank: int, oversampling: int = 10, n_iter: int = 2):
+        """
+        Méthode estimant le fond d'une image (ses rank premières composantes singulières) par SVD randomisée.
+        Le coût est linéaire en nombre de traces: seule une esquisse de rank + oversampling colonnes est décomposée.
+
+        Args:
+                img (ndarray): Image (samples x traces), float32
+                rank (int): Nombre de composantes singulières du fond
+                oversampling (int): Colonnes supplémentaires de l'esquisse (précision)
+                n_iter (int): Nombre d'itérations de puissance
+
+        Returns:
+                ndarray : Le fond de rang rank (float32).
+        """
+        n_samp, n_tr = img.shape
+        l = min(rank + oversampling, n_samp, n_tr)
+        # Graine fixe: le résultat est reproductible (clé du cache)
+        rng = np.random.default_rng(0)
+        Q = img @ rng.standard_normal((n_tr, l)).astype(WORK_DTYPE)
+        Q, _ = np.linalg.qr(Q)
+        for _ in range(n_iter):
+            Q, _ = np.linalg.qr(img.T @ Q)
+            Q, _ = np.linalg.qr(img @ Q)
+        B = (Q.T @ img).astype(ACC_DTYPE)
+        U_b, S, Vt = np.linalg.svd(B, full_matrices=False)
+        U = Q @ (U_b[:, :rank] * S[:rank]).astype(WORK_DTYPE)
+        return U @ Vt[:rank].astype(WORK_DTYPE)
+
+    def svd_filter(self, img: np.ndarray, rank: int, chunk: int = SVD_CHUNK, inplace: bool = False):
+        """
+        Méthode retirant le fond (sonnerie de l'antenne, réflecteurs horizontaux) par suppression des premières composantes singulières.
+        Pour les longs profils, le fond est estimé sur des blocs de chunk traces recouvrants à moitié puis raccordé par pondération triangulaire.
+
+        Args:
+                img (ndarray): Image d'entrée.
+                rank (int): Nombre de composantes singulières retirées.
+                chunk (int): Nombre de traces par bloc.
+                inplace (bool): Modifier img directement s'il s'agit déjà d'un tampon float32 (évite une copie).
+
+        Returns:
+                ndarray : Retourne le tableau traité.
+        """
+        try:
+            if(inplace and img.dtype == WORK_DTYPE and img.flags.writeable):
+                array = img
+            else:
+                array = img.astype(WORK_DTYPE)
+            n_tr = array.shape[1]
+            if(rank <= 0):
+                return array
+            if(n_tr <= chunk):
+                array -= self.low_rank(array, rank)
+                return array
+
+            step = chunk // 2
+            starts = list(range(0, n_tr - chunk, step)) + [n_tr - chunk]
+            background = np.zeros_like(array)
+            weight_sum = np.zeros(n_tr, dtype=WORK_DTYPE)
+            i = np.arange(chunk)
+            weight = np.minimum(i + 1, chunk - i).astype(WORK_DTYPE)
+            for x0 in starts:
+                background[:, x0:x0+chunk] += self.low_rank(array[:, x0:x0+chunk], rank) * weight
+                weight_sum[x0:x0+chunk] += weight
+            background /= weight_sum
+            array -= background
+            return array
+        except:
+            print("Erreur lors de l'application du filtre SVD:")
+            traceback.print_exc()
+            return img
+
+    def agc(self, img: np.ndarray, window: int, mode: str = "RMS"):
+        """
+        Méthode appliquant un contrôle automatique de gain (AGC): chaque sample est divisé par le niveau de sa trace
+        sur une fenêtre glissante centrée, calculé par sommes cumulées (toutes les traces à la fois).
+
+        Args:
+                img (ndarray): Image d'entrée (samples x traces).
+                window (int): Longueur de la fenêtre (en samples).
+                mode (str): "RMS" (moyenne quadratique) ou "Moyenne absolue".
+
+        Returns:
+                ndarray : Retourne le tableau traité (float32), ramené au niveau global de l'image d'entrée.
+        """
+        try:
+            array = np.asarray(img, dtype=WORK_DTYPE)
+            n_samp = array.shape[0]
+            half = max(int(window) // 2, 0)
+
+            if(mode == "RMS"):
+                power = np.square(array, dtype=ACC_DTYPE)
+            else:
+                power = np.abs(array).astype(ACC_DTYPE)
+            cumsum = np.zeros((n_samp + 1,) + array.shape[1:], dtype=ACC_DTYPE)
+            np.cumsum(power, axis=0, out=cumsum[1:])
+
+            # Fenêtre centrée, tronquée aux bords de la trace
+            i = np.arange(n_samp)
+            lo = np.maximum(i - half, 0)
+            hi = np.minimum(i + half + 1, n_samp)
+            level = (cumsum[hi] - cumsum[lo]) / (hi - lo)[:, np.newaxis]
+            global_level = cumsum[-1].sum() / power.size
+            del cumsum, power
+            if(mode == "RMS"):
+                level = np.sqrt(level)
+                global_level = np.sqrt(global_level)
+
+            # Niveau minimal: évite d'amplifier les zones mortes (bruit numérique)
+            floor = max(global_level * 1e-3, np.finfo(WORK_DTYPE).tiny)
+            return (array * (global_level / np.maximum(level, floor))).astype(WORK_DTYPE)
+        except:
+            print("Erreur lors de l'application de l'AGC:")
+            traceback.print_exc()
+            return img
+
+    def pick_time_zero(self, img: np.ndarray, threshold: float = 0.2):
+        """
+        Méthode pointant la première arrivée (onde directe) de chaque trace: premier sample dont l'amplitude
+        dépasse threshold fois le maximum de la trace, affiné par interpolation linéaire entre deux samples.
+
+        Args:
+                img (ndarray): Image brute (samples x traces).
+                threshold (float): Seuil relatif au maximum de chaque trace.
+
+        Returns:
+                ndarray : Temps zéro de chaque trace (en samples, fractionnaire).
+        """
+        amp = np.abs(img - np.mean(img, axis=0, dtype=ACC_DTYPE)).astype(WORK_DTYPE)
+        level = threshold * np.max(amp, axis=0)
+        first = np.argmax(amp >= level, axis=0)
+
+        # Position fractionnaire du passage du seuil entre first-1 et first
+        before = np.maximum(first - 1, 0)
+        cols = np.arange(amp.shape[1])
+        a0 = amp[before, cols]
+        a1 = amp[first, cols]
+        frac = np.divide(level - a0, a1 - a0, out=np.ones_like(a0), where=a1 > a0)
+        return np.where(first > 0, before + np.clip(frac, 0, 1), 0.)
+
+    def shift_traces(self, img: np.ndarray, shifts):
+        """
+        Méthode avançant chaque trace de shifts samples (fractionnaire, interpolation linéaire), complétée par des zéros.
+
+        Args:
+                img (ndarray): Image (samples x traces).
+                shifts (float | ndarray): Décalage commun ou décalage de chaque trace.
+
+        Returns:
+                ndarray : L'image décalée (float32).
+        """
+        n_samp, n_tr = img.shape
+        shifts = np.broadcast_to(np.asarray(shifts, dtype=ACC_DTYPE), (n_tr,))
+        i0 = np.floor(shifts).astype(np.int64)
+        frac = (shifts - i0).astype(WORK_DTYPE)
+        out = np.zeros((n_samp, n_tr), dtype=WORK_DTYPE)
+        # Les traces de même décalage entier sont traitées ensemble
+        for s in np.unique(i0):
+            cols = np.nonzero(i0 == s)[0]
+            n = n_samp - s - 1
+            if(n <= 0):
+                continue
+            f = frac[cols]
+            src = img[s:s+n+1][:, cols].astype(WORK_DTYPE)
+            out[:n, cols] = (1 - f) * src[:-1] + f * src[1:]
+        return out
+
+    def time_zero_correction(self, img: np.ndarray, mode: str):
+        """
+        Méthode ramenant la première arrivée au sample 0 (correction statique).
+
+        Args:
+                img (ndarray): Image brute (samples x traces).
+                mode (str): "Par fichier" (décalage médian commun à toutes les traces) ou "Par trace".
+
+        Returns:
+                ndarray : L'image corrigée (float32).
+        """
+        try:
+            picks = self.pick_time_zero(img)
+            if(mode == "Par fichier"):
+                picks = np.median(picks)
+            return self.shift_traces(img, picks)
+        except:
+            print("Erreur lors de la correction du temps zéro:")
+            traceback.print_exc()
+            return img
+
+    def whitening(self, img: np.ndarray, f_min: float, f_max: float, dt: float):
+        """
+        Méthode appliquant le blanchiment spectral de toutes les traces dans la bande [f_min, f_max].
+
+        Args:
+                f_min, f_max (float): Bande conservée (MHz)
+                dt (float): Pas en temps entre deux samples (s)
+
+        Returns:
+                ndarray : Retourne le tableau blanchi.
+        """
+        try:
+            return spectral_engine.whiten(img, dt, f_min, f_max)
+        except:
+            print("Erreur lors du blanchiment spectral:")
+            traceback.print_exc()
+            return img
+
+    def deconvolution(self, img: np.ndarray, length: int, gap: int):
+        """
+        Méthode appliquant la déconvolution de Wiener (gap = 1) ou prédictive (gap > 1) à toutes les traces.
+
+        Args:
+                length (int): Longueur de l'opérateur (samples)
+                gap (int): Distance de prédiction (samples)
+
+        Returns:
+                ndarray : Retourne le tableau déconvolué.
+        """
+        try:
+            return spectral_engine.deconvolve(img, length, gap)
+        except:
+            print("Erreur lors de la déconvolution:")
+            traceback.print_exc()
+            return img
+
     def low_pass(self, img: np.ndarray, cutoff_freq: float, sampling_freq: float):
         try:
             normalized_cutoff = cutoff_freq / (sampling_freq / 2)
@@ -156,4 +393,234 @@ class RadarController():
             traceback.print_exc()
             return img
 
+    def fk_migration(self, img: np.ndarray, epsilon: float, dt: float, dx: float):
+        """
+        Méthode appliquant la migration F-K (Stolt) à vitesse constante.
+
+        Args:
+                epsilon (float): Permittivité relative du milieu
+                dt (float): Pas en temps entre deux samples (s)
+                dx (float): Distance entre deux traces (m)
+
+        Returns:
+                ndarray : Retourne le tableau migré.
+        """
+        try:
+            return fk_engine.migrate(img, dt, dx, velocity(epsilon))
+        except:
+            print("Erreur lors de la migration F-K:")
+            traceback.print_exc()
+            return img
+
+    def kirchhoff_migration(self, img: np.ndarray, epsilon: float, layers: list, dt: float, dx: float, aperture: int):
+        """
+        Méthode appliquant la migration de Kirchhoff avec un modèle de vitesse en couches.
+
+        Args:
+                epsilon (float): Permittivité relative au-dessus de la première couche
+                layers (list): Couples [t (ns), epsilon] donnant le toit de chaque couche
+                dt (float): Pas en temps entre deux samples (s)
+                dx (float): Distance entre deux traces (m)
+                aperture (int): Demi-ouverture de la sommation (en traces)
+
+        Returns:
+                ndarray : Retourne le tableau migré.
+        """
+        try:
+            v_int = interval_velocity(layers, img.shape[0], dt, epsilon)
+            return kirchhoff_engine.migrate(img, dt, dx, v_int, aperture)
+        except:
+            print("Erreur lors de la migration de Kirchhoff:")
+            traceback.print_exc()
+            return img
+
+    def attributes(self, img: np.ndarray, dt: float = None):
+        """
+        Méthode calculant les attributs instantanés de toutes les traces à partir d'un unique signal analytique (FFT).
+
+        Args:
+                img (ndarray): Image traitée (samples x traces)
+                dt (float): Pas en temps entre deux samples (s). Sans pas connu, la fréquence est en cycles/sample.
+
+        Returns:
+                dict : Enveloppe, phase instantanée (rad) et fréquence instantanée (MHz), en float32.
+        """
+        try:
+            nt = img.shape[0]
+            n = fft.next_fast_len(nt)
+            spectrum = fft.rfft(img, n=n, axis=0, workers=-1)
+
+            # Signal analytique: fréquences positives doublées, fréquences négatives nulles
+            analytic = np.zeros((n,) + img.shape[1:], dtype=np.complex64)
+            n_pos = (n + 1) // 2
+            analytic[0] = spectrum[0]
+            analytic[1:n_pos] = 2 * spectrum[1:n_pos]
+            if(n % 2 == 0):
+                analytic[n // 2] = spectrum[n // 2]
+            del spectrum
+            analytic = fft.ifft(analytic, axis=0, workers=-1, overwrite_x=True)[:nt].astype(np.complex64)
+
+            envelope = np.abs(analytic)
+            phase = np.angle(analytic)
+
+            # Dérivée de la phase sans dépliement: angle(z[n+1] z*[n])
+            frequency = np.empty(img.shape, dtype=WORK_DTYPE)
+            frequency[:-1] = np.angle(analytic[1:] * np.conj(analytic[:-1])) / (2 * np.pi)
+            frequency[-1] = frequency[-2] if nt > 1 else 0.
+            if(dt != None):
+                frequency /= dt * 10.**6
+
+            return {"Enveloppe": envelope, "Phase instantanée": phase, "Fréquence instantanée": frequency}
+        except:
+            print("Erreur lors du calcul des attributs:")
+            traceback.print_exc()
+            return {}
+
+    def amplitude_stats(self, img: np.ndarray, max_samples: int = 2**20, bins: int = 4096):
+        """
+        Méthode calculant les statistiques d'amplitude d'une image (histogrammes des valeurs et des valeurs absolues).
+        Au-delà de max_samples valeurs, l'image est sous-échantillonnée régulièrement dans les deux directions.
+
+        Args:
+                img (ndarray): Image (samples x traces), éventuellement en memmap
+                max_samples (int): Nombre maximal de valeurs lues
+                bins (int): Nombre de classes des histogrammes
+
+        Returns:
+                dict : Minimum, maximum, moyenne, écart-type et histogrammes (voir stats_percentile).
+        """
+        if(img.size > max_samples):
+            step = int(np.ceil(np.sqrt(img.size / max_samples)))
+            img = img[::step, ::step]
+        sample = np.asarray(img, dtype=WORK_DTYPE).ravel()
+        sample = sample[np.isfinite(sample)]
+        if(sample.size == 0):
+            sample = np.zeros(1, dtype=WORK_DTYPE)
+
+        v_min = float(sample.min())
+        v_max = float(sample.max())
+        a_max = max(abs(v_min), abs(v_max))
+        hist, edges = np.histogram(sample, bins=bins, range=(v_min, v_max) if v_max > v_min else (v_min - 0.5, v_max + 0.5))
+        abs_hist, abs_edges = np.histogram(np.abs(sample), bins=bins, range=(0., a_max if a_max > 0 else 1.))
+        return {
+            "min": v_min,
+            "max": v_max,
+            "mean": float(np.mean(sample, dtype=ACC_DTYPE)),
+            "std": float(np.std(sample, dtype=ACC_DTYPE)),
+            "hist": hist,
+            "edges": edges,
+            "abs_hist": abs_hist,
+            "abs_edges": abs_edges
+        }
+
+    def stats_percentile(self, stats: dict, q: float, absolute: bool = False):
+        """
+        Méthode renvoyant le percentile q (en %) à partir de l'histogramme cumulé (interpolation dans la classe).
+
+        Args:
+                stats (dict): Statistiques (voir amplitude_stats)
+                q (float): Percentile (0 - 100)
+                absolute (bool): Percentile des valeurs absolues
+
+        Returns:
+                float : La valeur du percentile.
+        """
+        if(absolute):
+            hist, edges = stats["abs_hist"], stats["abs_edges"]
+        else:
+            hist, edges = stats["hist"], stats["edges"]
+        cdf = np.cumsum(hist) / max(hist.sum(), 1)
+        i = min(int(np.searchsorted(cdf, q / 100.)), len(hist) - 1)
+        below = cdf[i-1] if i > 0 else 0.
+        frac = (q / 100. - below) / (cdf[i] - below) if cdf[i] > below else 0.
+        return float(edges[i] + np.clip(frac, 0., 1.) * (edges[i+1] - edges[i]))
+
+    def sampling_steps(self, feature: tuple, distance: float = None):
+        """
+        Méthode renvoyant les pas d'échantillonnage d'un profil à partir de RadarData.get_feature.
+
+        Args:
+                feature (tuple): Données du fichier (voir RadarData.get_feature)
+                distance (float): Distance totale définie par l'utilisateur (sinon celle du fichier)
+
+        Returns:
+                tuple : Pas en temps (s) et distance entre deux traces (m).
+        """
+        n_tr = feature[0]
+        n_samp = feature[1]
+        if(distance == None):
+            distance = feature[2]
+        dt = (feature[3] * 10.**(-9)) / n_samp
+        dx = distance / n_tr
+        return dt, dx
+
+    def process(self, img: np.ndarray, params: dict, feature: tuple = None):
+        """
+        Méthode appliquant la chaîne de traitement complète à une image brute.
+
+        Args:
+                img (ndarray): Image brute (samples x traces).
+                params (dict): Paramètres canoniques du traitement (voir MainWindow.processing_params).
+                feature (tuple): Données du fichier (nécessaires pour la migration et le blanchiment)
+
+        Returns:
+                ndarray : Retourne le tableau traité.
+        """
+        bits = self.get_bit_img(img)
+        lim = float((2**bits)-1)
+        if(params["time_zero"] != None):
+            # Correction avant le découpage: cb et ce sont alors relatifs à la première arrivée
+            img = self.time_zero_correction(img, params["time_zero"])
+        cb = max(int(params["cb"]), 0)
+        ce = min(int(params["ce"]), img.shape[0])
+
+        if all(params[stage] == None for stage in FLOAT_STAGES):
+            # Découpage + dewow + gain fusionnés en une seule passe (le retournement commute avec ces opérations)
+            fgain = self.gain_vector(ce - cb, params["t0_lin"], params["t0_exp"], params["g"], params["a_lin"], params["a"])
+            img_modified = Kernels.crop_dewow_gain(img, cb, ce, params["dewow"], fgain, lim)
+            if(params["flip"]):
+                img_modified = np.fliplr(img_modified)
+        else:
+            # Conversion unique en float32 fusionnée avec le découpage et le dewow
+            img_modified = Kernels.crop_dewow_gain(img, cb, ce, params["dewow"], np.ones(ce - cb, dtype=WORK_DTYPE), np.inf)
+
+            if(params["decon"] != None):
+                img_modified = self.deconvolution(img_modified, params["decon"][0], params["decon"][1])
+
+            if(params["whitening"] != None):
+                dt = self.sampling_steps(feature)[0]
+                img_modified = self.whitening(img_modified, params["whitening"][0], params["whitening"][1], dt)
+
+            if(params["cutoff"] != None and params["sampling"] != None):
+                img_modified = self.low_pass(img_modified, params["cutoff"], params["sampling"])
+
+            if(params["sub_mean"] != None):
+                img_modified = self.sub_mean(img_modified, params["sub_mean"], inplace=True)
+
+            if(params["svd"] != None):
+                img_modified = self.svd_filter(img_modified, params["svd"], inplace=True)
+
+            if(params["migration"] == "F-K"):
+                dt, dx = self.sampling_steps(feature, params["distance"])
+                img_modified = self.fk_migration(img_modified, params["epsilon"], dt, dx)
+            elif(params["migration"] == "Kirchhoff"):
+                dt, dx = self.sampling_steps(feature, params["distance"])
+                img_modified = self.kirchhoff_migration(img_modified, params["epsilon"], params["layers"], dt, dx, params["aperture"])
+
+            if(params["flip"]):
+                img_modified = np.fliplr(img_modified)
+
+            if(params["agc"] != None):
+                img_modified = self.agc(img_modified, params["agc"], params["agc_mode"])
+
+            img_modified = self.apply_total_gain(img_modified, params["t0_lin"], params["t0_exp"], params["g"], params["a_lin"], params["a"], bits)
+
+        if(params["max_tr"] != None):
+            if img_modified.shape[1] < params["max_tr"]:
+                # Ajouter des colonnes supplémentaires
+                additional_cols = params["max_tr"] - img_modified.shape[1]
+                img_modified = np.pad(img_modified, ((0, 0), (0, additional_cols)), mode='constant')
+
+        return img_modified
+
     ############################ Mise à jour ############################
@@ -35,7 +35,8 @@ class RadarData:
                 # rd3 est codé sur 2 octets
                 rd3 = np.frombuffer(byte_data, dtype=np.int16) 
                 # Reshape de rd3
-                rd3 = rd3.reshape(self.get_feature()[0], self.get_feature()[1]) 
+                feature = self.get_feature()
+                rd3 = rd3.reshape(feature[0], feature[1]) 
                 rd3 = rd3.transpose()
                 return rd3
             
@@ -46,7 +47,8 @@ class RadarData:
                     # rd7 est codé 4 octets
                 rd7 = np.frombuffer(byte_data, dtype=np.int32)
                 # Reshape de rd7
-                rd7 = rd7.reshape(self.get_feature()[0], self.get_feature()[1])
+                feature = self.get_feature()
+                rd7 = rd7.reshape(feature[0], feature[1])
                 rd7 = rd7.transpose()
                 return rd7
             
@@ -57,7 +59,8 @@ class RadarData:
                     # DZT est codé 4 octets
                 DZT = np.frombuffer(byte_data, dtype=np.int32)[(2**15):,]
                 # Reshape de rd7
-                DZT = DZT.reshape(self.get_feature()[0], self.get_feature()[1])
+                feature = self.get_feature()
+                DZT = DZT.reshape(feature[0], feature[1])
                 DZT = DZT.transpose()
                 return DZT
             
@@ -68,7 +71,8 @@ class RadarData:
                     # DZT est codé 4 octets
                 DZT = np.frombuffer(byte_data, dtype=np.int32)[(2**15):,]
                 # Reshape de rd7
-                DZT = DZT.reshape(self.get_feature()[0], self.get_feature()[1])
+                feature = self.get_feature()
+                DZT = DZT.reshape(feature[0], feature[1])
                 DZT = DZT.transpose()
                 return DZT            
             # À supprimer
@@ -0,0 +1,148 @@
+import threading
+import numpy as np
+from collections import OrderedDict
+from scipy import fft, linalg, ndimage
+
+class SpectralFilter:
+    """SpectralFilter: Blanchiment spectral et déconvolution (Wiener / prédictive) de toutes les traces d'une image"""
+    def __init__(self, max_tapers: int = 8):
+        """
+        Constructeur de la classe SpectralFilter.
+
+        Args:
+            max_tapers (int): Nombre de fenêtres passe-bande conservées (une par taille de FFT et bande)
+        """
+        self.max_tapers = max_tapers
+        self.tapers = OrderedDict()
+        self.lock = threading.Lock()
+
+    ############################ Méthode ############################
+
+    def fft_size(self, nt: int, pad: int = 0):
+        """
+        Méthode renvoyant la taille de FFT rapide utilisée pour nt samples (+ pad samples contre le repliement circulaire).
+        """
+        return fft.next_fast_len(nt + pad, real=True)
+
+    def band_taper(self, n: int, dt: float, f_min: float, f_max: float):
+        """
+        Méthode construisant la fenêtre passe-bande (flancs en cosinus) appliquée après le blanchiment.
+
+        Args:
+            n (int): Taille de la FFT
+            dt (float): Pas en temps (s)
+            f_min, f_max (float): Bande conservée (MHz)
+
+        Returns:
+            ndarray: Poids de chaque fréquence (float32), fenêtre conservée d'un fichier à l'autre.
+        """
+        key = (n, dt, f_min, f_max)
+        with self.lock:
+            if key in self.tapers:
+                self.tapers.move_to_end(key)
+                return self.tapers[key]
+        f = fft.rfftfreq(n, dt) / 10.**6
+        ramp = max(0.1 * (f_max - f_min), f[1])
+        taper = np.zeros(len(f))
+        taper[(f >= f_min) & (f <= f_max)] = 1.
+        low = (f >= f_min) & (f < f_min + ramp)
+        taper[low] = 0.5 - 0.5 * np.cos(np.pi * (f[low] - f_min) / ramp)
+        high = (f > f_max - ramp) & (f <= f_max)
+        taper[high] = 0.5 - 0.5 * np.cos(np.pi * (f_max - f[high]) / ramp)
+        taper = taper.astype(np.float32)
+        with self.lock:
+            self.tapers[key] = taper
+            while len(self.tapers) > self.max_tapers:
+                self.tapers.popitem(last=False)
+        return taper
+
+    def whiten(self, img: np.ndarray, dt: float, f_min: float, f_max: float, smoothing: float = 20.):
+        """
+        Méthode appliquant le blanchiment spectral: chaque trace est divisée par son spectre d'amplitude lissé,
+        puis limitée à la bande [f_min, f_max].
+
+        Args:
+            img (ndarray): Image (samples x traces)
+            dt (float): Pas en temps (s)
+            f_min, f_max (float): Bande conservée (MHz)
+            smoothing (float): Largeur du lissage du spectre d'amplitude (MHz)
+
+        Returns:
+            ndarray: L'image blanchie (float32), au niveau RMS de l'entrée.
+        """
+        nt = img.shape[0]
+        # Complément de zéros (2 nt): la fin de chaque trace ne se replie pas sur son début
+        n = self.fft_size(nt, nt)
+        spectrum = fft.rfft(img, n=n, axis=0, workers=-1)
+        amplitude = np.abs(spectrum).astype(np.float32)
+        width = max(3, int(round(smoothing * 10.**6 * n * dt)))
+        amplitude = ndimage.uniform_filter1d(amplitude, width, axis=0, mode="nearest")
+        amplitude += np.finfo(np.float32).eps * np.max(amplitude)
+        spectrum *= self.band_taper(n, dt, f_min, f_max)[:, np.newaxis] / amplitude
+        out = fft.irfft(spectrum, n=n, axis=0, workers=-1, overwrite_x=True)[:nt].astype(np.float32)
+        return self.match_rms(out, img)
+
+    def prediction_error_filter(self, autocorr: np.ndarray, length: int, gap: int, prewhitening: float):
+        """
+        Méthode calculant le filtre d'erreur de prédiction (équations normales de Wiener, système de Toeplitz).
+        Avec gap = 1, il s'agit de la déconvolution impulsionnelle (spiking).
+
+        Args:
+            autocorr (ndarray): Autocorrélation moyenne des traces (décalages positifs)
+            length (int): Longueur de l'opérateur de prédiction (samples)
+            gap (int): Distance de prédiction (samples)
+            prewhitening (float): Bruit blanc ajouté à l'autocorrélation (fraction de r[0])
+
+        Returns:
+            ndarray: Le filtre [1, 0, ..., 0, -p] de longueur gap + length.
+        """
+        r = autocorr[:length].astype(np.float64).copy()
+        r[0] *= 1. + prewhitening
+        p = linalg.solve_toeplitz(r, autocorr[gap:gap + length])
+        pef = np.zeros(gap + length)
+        pef[0] = 1.
+        pef[gap:] = -p
+        return pef
+
+    def deconvolve(self, img: np.ndarray, length: int, gap: int = 1, prewhitening: float = 0.001):
+        """
+        Méthode appliquant la déconvolution (Wiener si gap = 1, prédictive sinon) à toutes les traces,
+        avec un opérateur unique calculé sur l'autocorrélation moyenne (une FFT directe et une inverse).
+
+        Args:
+            img (ndarray): Image (samples x traces)
+            length (int): Longueur de l'opérateur (samples)
+            gap (int): Distance de prédiction (samples)
+            prewhitening (float): Bruit blanc ajouté (stabilité)
+
+        Returns:
+            ndarray: L'image déconvoluée (float32), au niveau RMS de l'entrée.
+        """
+        nt = img.shape[0]
+        length = max(1, min(int(length), nt - gap - 1))
+        n = self.fft_size(nt, gap + length)
+        spectrum = fft.rfft(img, n=n, axis=0, workers=-1)
+
+        # Autocorrélation moyenne des traces: transformée inverse du spectre de puissance moyen
+        power = np.mean(np.abs(spectrum)**2, axis=1)
+        autocorr = fft.irfft(power, n=n)[:gap + length + 1]
+        if(autocorr[0] <= 0):
+            return np.asarray(img, dtype=np.float32)
+
+        pef = self.prediction_error_filter(autocorr, length, gap, prewhitening)
+        spectrum *= fft.rfft(pef, n=n).astype(np.complex64)[:, np.newaxis]
+        out = fft.irfft(spectrum, n=n, axis=0, workers=-1, overwrite_x=True)[:nt].astype(np.float32)
+        return self.match_rms(out, img)
+
+    def match_rms(self, out: np.ndarray, img: np.ndarray):
+        """
+        Méthode ramenant out au niveau RMS global de img (la plage d'affichage et l'écrêtage restent valables).
+        """
+        rms_in = np.sqrt(np.mean(np.square(img, dtype=np.float64)))
+        rms_out = np.sqrt(np.mean(np.square(out, dtype=np.float64)))
+        if(rms_out > 0):
+            out *= np.float32(rms_in / rms_out)
+        return out
+
+# Fenêtres passe-bande partagées d'un fichier à l'autre (même nombre de samples)
+spectral_engine = SpectralFilter()
@@ -0,0 +1,264 @@
+import numpy as np
+from math import sqrt
+from collections import OrderedDict
+from RadarData import cste_global
+
+XUNITS = ["Distance", "Temps", "Traces"]
+YUNITS = ["Profondeur", "Temps", "Samples"]
+
+class VelocityModel:
+    """VelocityModel: Modèle de vitesse en couches (permittivité d'intervalle par tranche de temps double), conversion temps -> profondeur"""
+    def __init__(self, tops: np.ndarray, epsilons: np.ndarray):
+        """
+        Constructeur de la classe VelocityModel.
+
+        Args:
+            tops (ndarray): Temps (double, ns) du toit de chaque couche, croissants, le premier à 0
+            epsilons (ndarray): Permittivité d'intervalle de chaque couche
+        """
+        self.tops = np.asarray(tops, dtype=np.float64)
+        self.epsilons = np.asarray(epsilons, dtype=np.float64)
+        self.key = (tuple(self.tops.tolist()), tuple(self.epsilons.tolist()))
+        self.tables = OrderedDict()
+
+    @classmethod
+    def from_hyperbolas(cls, times: np.ndarray, epsilons: np.ndarray, t_zero: float = 0., n_layers: int = 4, min_count: int = 3):
+        """
+        Méthode construisant un modèle à partir des hyperboles détectées: les permittivités ajustées sont des vitesses
+        moyennes (RMS) depuis la surface jusqu'à l'apex, converties en vitesses d'intervalle par la formule de Dix.
+
+        Args:
+            times (ndarray): Temps double des apex (ns, depuis le début du fichier)
+            epsilons (ndarray): Permittivité ajustée de chaque hyperbole
+            t_zero (float): Temps zéro (surface, ns depuis le début du fichier): la formule de Dix utilise les temps depuis la surface
+            n_layers (int): Nombre maximal de couches
+            min_count (int): Nombre minimal d'hyperboles par couche
+
+        Returns:
+            VelocityModel | None: Le modèle (None sans hyperbole), toits exprimés depuis le début du fichier.
+        """
+        times = np.asarray(times, dtype=np.float64) - t_zero
+        epsilons = np.asarray(epsilons, dtype=np.float64)
+        if(len(times) == 0):
+            return None
+        order = np.argsort(times)
+        n_layers = max(1, min(n_layers, len(times) // min_count))
+
+        # Une vitesse RMS (médiane) par groupe d'hyperboles de temps voisins
+        t_rms = []
+        v_rms = []
+        for group in np.array_split(order, n_layers):
+            t_rms.append(np.median(times[group]))
+            v_rms.append(np.median(cste_global["c_lum"] / np.sqrt(epsilons[group])))
+        t_rms = np.maximum(np.array(t_rms), np.finfo(np.float64).tiny)
+        v_rms = np.array(v_rms)
+
+        # Dix: v_int(n)^2 = (v_rms(n)^2 t(n) - v_rms(n-1)^2 t(n-1)) / (t(n) - t(n-1))
+        energy = v_rms**2 * t_rms
+        v_int = np.empty(len(t_rms))
+        v_int[0] = v_rms[0]
+        dt = np.diff(t_rms)
+        v2 = np.divide(np.diff(energy), dt, out=np.zeros_like(dt), where=dt > 0)
+        v_int[1:] = np.sqrt(np.maximum(v2, 0.))
+        # Vitesses physiques (entre l'eau et le vide), une couche instable garde la vitesse RMS
+        unstable = (v_int <= 0) | ~np.isfinite(v_int)
+        v_int[unstable] = v_rms[unstable]
+        eps_int = np.clip((cste_global["c_lum"] / v_int)**2, 1., 81.)
+
+        # Toits ramenés au début du fichier (depth_table): la première couche couvre aussi la lame d'air
+        tops = np.concatenate([[0.], t_rms[:-1] + t_zero])
+        return cls(tops, eps_int)
+
+    ############################ Méthode ############################
+
+    def depth_table(self, n_samp: int, dt_ns: float):
+        """
+        Méthode renvoyant la profondeur (m) de chaque sample, par cumul des temps de parcours (table conservée).
+
+        Args:
+            n_samp (int): Nombre de samples
+            dt_ns (float): Pas en temps (ns)
+
+        Returns:
+            ndarray: Profondeurs des samples 0..n_samp (n_samp + 1 valeurs).
+        """
+        key = (n_samp, dt_ns)
+        if key in self.tables:
+            self.tables.move_to_end(key)
+            return self.tables[key]
+        # Vitesse au milieu de chaque pas, parcours aller-retour
+        t_mid = (np.arange(n_samp) + 0.5) * dt_ns
+        layer = np.searchsorted(self.tops, t_mid, side="right") - 1
+        v = cste_global["c_lum"] / np.sqrt(self.epsilons[np.clip(layer, 0, len(self.epsilons) - 1)])
+        depths = np.concatenate([[0.], np.cumsum(v * dt_ns * 10.**(-9) / 2)])
+        self.tables[key] = depths
+        while len(self.tables) > 8:
+            self.tables.popitem(last=False)
+        return depths
+
+    def time_to_depth(self, t_ns, n_samp: int, dt_ns: float):
+        """
+        Méthode convertissant (en bloc) des temps doubles (ns) en profondeurs (m).
+        """
+        return np.interp(np.asarray(t_ns) / dt_ns, np.arange(n_samp + 1), self.depth_table(n_samp, dt_ns))
+
+class CoordinateTransform:
+    """CoordinateTransform: Conversions vectorisées entre indices (traces, samples) et unités des axes d'un fichier"""
+    def __init__(self, feature: list, epsilon: float, distance: float = None, cb: float = 0, ce: float = None, velocity: VelocityModel = None):
+        """
+        Constructeur de la classe CoordinateTransform.
+
+        Args:
+            feature (list): Caractéristiques du fichier (RadarData.get_feature)
+            epsilon (float): Permittivité relative (profondeur)
+            distance (float): Longueur du profil saisie (remplace la distance du fichier)
+            cb, ce (float): Découpage en samples (début, fin; None: dernier sample)
+            velocity (VelocityModel): Modèle de vitesse (profondeur vraie), sinon vitesse constante (epsilon)
+        """
+        n_tr, n_samp, d_max, t_max = feature[0], feature[1], feature[2], feature[3]
+        step_time = feature[5]
+        if(distance != None):
+            d_max = distance
+        p_max = (t_max * 10.**(-9)) * (cste_global["c_lum"] / sqrt(epsilon)) / 2
+
+        self.n_tr = n_tr
+        self.n_samp = n_samp
+        self.cb = cb
+        self.ce = ce if ce != None else n_samp
+        # Pas d'une trace (Distance, Temps, Traces) et d'un sample (Profondeur, Temps, Samples)
+        self.x_steps = np.array([d_max / n_tr, step_time, 1.])
+        self.y_steps = np.array([p_max / n_samp, t_max / n_samp, 1.])
+
+        # Profondeur de chaque sample (table de temps de parcours cumulés) avec un modèle de vitesse
+        self.depths = None
+        if(velocity != None):
+            self.depths = velocity.depth_table(n_samp, t_max / n_samp)
+        self.rows = {}
+
+    ############################ Méthode ############################
+
+    def trace_step(self, xindex: int):
+        return float(self.x_steps[xindex])
+
+    def sample_step(self, yindex: int):
+        return float(self.y_steps[yindex])
+
+    def trace_max(self, xindex: int):
+        """
+        Méthode renvoyant la longueur du fichier (toutes les traces) dans l'unité xindex.
+        """
+        return self.n_tr * self.trace_step(xindex)
+
+    def sample_max(self, yindex: int):
+        """
+        Méthode renvoyant la durée (ou profondeur) du fichier (tous les samples) dans l'unité yindex.
+        """
+        if(self.nonlinear(yindex)):
+            return float(self.depths[-1])
+        return self.n_samp * self.sample_step(yindex)
+
+    def nonlinear(self, yindex: int):
+        """
+        Méthode indiquant si l'ordonnée n'est pas proportionnelle aux samples (profondeur avec un modèle de vitesse).
+        """
+        return yindex == 0 and self.depths is not None
+
+    def y_coords(self, rows, yindex: int):
+        """
+        Méthode convertissant (en bloc) des lignes de l'image découpée (fractionnaires) en ordonnées des axes.
+        """
+        if(self.nonlinear(yindex)):
+            samples = np.arange(len(self.depths))
+            return np.interp(np.asarray(rows) + self.cb, samples, self.depths) - np.interp(self.cb, samples, self.depths)
+        return np.asarray(rows) * self.y_steps[yindex]
+
+    def y_rows(self, y, yindex: int):
+        """
+        Méthode inverse de y_coords.
+        """
+        if(self.nonlinear(yindex)):
+            samples = np.arange(len(self.depths))
+            return np.interp(np.asarray(y) + np.interp(self.cb, samples, self.depths), self.depths, samples) - self.cb
+        return np.asarray(y) / self.y_steps[yindex]
+
+    def display_rows(self, n_rows: int, yindex: int):
+        """
+        Méthode renvoyant, pour un affichage à pas constant en profondeur, la ligne de l'image à afficher sur chaque ligne (table conservée).
+
+        Returns:
+            ndarray | None: Lignes sources (None si l'ordonnée est proportionnelle aux samples).
+        """
+        if not self.nonlinear(yindex):
+            return None
+        if n_rows not in self.rows:
+            y_max = float(self.y_coords(self.ce - self.cb, yindex))
+            centres = (np.arange(n_rows) + 0.5) * y_max / n_rows
+            self.rows[n_rows] = np.clip(self.y_rows(centres, yindex).astype(np.int64), 0, n_rows - 1)
+        return self.rows[n_rows]
+
+    def display_image(self, img: np.ndarray, yindex: int):
+        """
+        Méthode renvoyant l'image à afficher: lignes rééchantillonnées à pas constant en profondeur avec un modèle de vitesse, l'image sinon.
+        """
+        rows = self.display_rows(img.shape[0], yindex)
+        if rows is None:
+            return img
+        return img[rows]
+
+    def extent(self, xindex: int, yindex: int, n_tr: int = None):
+        """
+        Méthode renvoyant l'étendue affichée (image découpée): abscisse de la dernière trace, ordonnée du dernier sample.
+
+        Args:
+            n_tr (int): Nombre de traces affichées (max_tr si les fichiers sont égalisés)
+        """
+        if(n_tr == None):
+            n_tr = self.n_tr
+        return n_tr * self.trace_step(xindex), float(self.y_coords(self.ce - self.cb, yindex))
+
+    def axes(self, xindex: int, yindex: int, lenX: int = 10, lenY: int = 10, n_tr: int = None):
+        """
+        Méthode renvoyant les axes X, Y du radargramme.
+        """
+        x_max, y_max = self.extent(xindex, yindex, n_tr)
+        return np.linspace(0., x_max, lenX), np.linspace(0., y_max, lenY)
+
+    def to_axes(self, traces, samples, xindex: int, yindex: int):
+        """
+        Méthode convertissant (en bloc) des indices de l'image affichée en coordonnées des axes.
+        """
+        return np.asarray(traces) * self.x_steps[xindex], self.y_coords(samples, yindex)
+
+    def to_indices(self, x, y, xindex: int, yindex: int):
+        """
+        Méthode convertissant (en bloc) des coordonnées des axes en indices (fractionnaires) de l'image affichée.
+        """
+        return np.asarray(x) / self.x_steps[xindex], self.y_rows(y, yindex)
+
+    def convert(self, x, y, from_units: tuple, to_units: tuple):
+        """
+        Méthode convertissant (en bloc) des coordonnées d'un jeu d'unités (xindex, yindex) à un autre.
+        """
+        fx = self.x_steps[to_units[0]] / self.x_steps[from_units[0]]
+        return np.asarray(x) * fx, self.y_coords(self.y_rows(y, from_units[1]), to_units[1])
+
+    def normalize(self, coords: np.ndarray, xindex: int, yindex: int):
+        """
+        Méthode convertissant des coordonnées des axes (n x 4: x1, y1, x2, y2) en coordonnées normalisées
+        (fraction de la longueur du fichier et des samples découpés), indépendantes des unités et du modèle de vitesse.
+        """
+        coords = np.array(coords, dtype=np.float64).reshape(-1, 4)
+        x_max = self.extent(xindex, yindex)[0]
+        coords[:, 0::2] /= x_max
+        coords[:, 1::2] = self.y_rows(coords[:, 1::2], yindex) / (self.ce - self.cb)
+        return coords
+
+    def denormalize(self, coords: np.ndarray, xindex: int, yindex: int):
+        """
+        Méthode inverse de normalize.
+        """
+        coords = np.array(coords, dtype=np.float64).reshape(-1, 4)
+        x_max = self.extent(xindex, yindex)[0]
+        coords[:, 0::2] *= x_max
+        coords[:, 1::2] = self.y_coords(coords[:, 1::2] * (self.ce - self.cb), yindex)
+        return coords
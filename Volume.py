@@ -0,0 +1,131 @@
+import os
+import threading
+import numpy as np
+
+class Volume:
+    """Volume: Empilement des profils parallèles traités (memmap samples x profils x traces) et coupes horizontales (C-scans)"""
+    def __init__(self, filename: str, slab: int = 8):
+        """
+        Constructeur de la classe Volume.
+
+        Args:
+            filename (str): Fichier .npy du volume (les sommes par tranches sont dans filename + ".slabs.npy")
+            slab (int): Épaisseur (en samples) des tranches précalculées
+        """
+        self.filename = filename
+        self.slabs_filename = filename[:-4] + ".slabs.npy"
+        self.slab = slab
+        self.data = None
+        self.slabs = None
+
+    ############################ Méthode ############################
+
+    def exists(self):
+        """
+        Méthode indiquant si le volume a déjà été construit.
+        """
+        return os.path.exists(self.filename) and os.path.exists(self.slabs_filename)
+
+    def build(self, images, n_profiles: int, n_samp: int, max_tr: int):
+        """
+        Méthode construisant le volume à partir des profils traités, puis les sommes cumulées par tranches.
+
+        Args:
+            images (iterable): Images traitées (samples x traces), dans l'ordre des profils
+            n_profiles (int): Nombre de profils
+            n_samp (int): Nombre de samples du volume (les profils plus longs sont coupés)
+            max_tr (int): Nombre de traces du volume (les profils plus courts sont complétés par des zéros)
+        """
+        os.makedirs(os.path.dirname(self.filename) or ".", exist_ok=True)
+        suffix = "." + str(os.getpid()) + "_" + str(threading.get_ident()) + ".tmp"
+
+        # Axe du temps en premier: une coupe horizontale est un bloc contigu du fichier
+        data = np.lib.format.open_memmap(self.filename + suffix, mode="w+", dtype=np.float32, shape=(n_samp, n_profiles, max_tr))
+        for p, img in enumerate(images):
+            m = min(img.shape[0], n_samp)
+            n = min(img.shape[1], max_tr)
+            data[:m, p, :n] = img[:m, :n]
+            data[m:, p, :] = 0.
+            data[:m, p, n:] = 0.
+        data.flush()
+
+        # Sommes cumulées des amplitudes absolues par tranches: une coupe moyenne coûte deux lectures, quelle que soit son épaisseur
+        n_slabs = (n_samp + self.slab - 1) // self.slab
+        slabs = np.lib.format.open_memmap(self.slabs_filename + suffix, mode="w+", dtype=np.float64, shape=(n_slabs + 1, n_profiles, max_tr))
+        running = np.zeros((n_profiles, max_tr), dtype=np.float64)
+        slabs[0] = running
+        for j in range(n_slabs):
+            running += np.sum(np.abs(data[j*self.slab:(j+1)*self.slab]), axis=0, dtype=np.float64)
+            slabs[j + 1] = running
+        slabs.flush()
+        del data, slabs
+
+        os.replace(self.filename + suffix, self.filename)
+        os.replace(self.slabs_filename + suffix, self.slabs_filename)
+        self.open()
+
+    def open(self):
+        """
+        Méthode ouvrant (en memmap) un volume déjà construit.
+        """
+        self.data = np.load(self.filename, mmap_mode="r")
+        self.slabs = np.load(self.slabs_filename, mmap_mode="r")
+        # L'épaisseur des tranches est déduite des fichiers (volume construit avec un autre réglage)
+        n_slabs = self.slabs.shape[0] - 1
+        self.slab = max(1, -(-self.data.shape[0] // n_slabs))
+
+    def shape(self):
+        """
+        Méthode renvoyant la taille du volume (samples, profils, traces).
+        """
+        return self.data.shape
+
+    def time_slice(self, t: int):
+        """
+        Méthode renvoyant la coupe horizontale au sample t (amplitudes).
+
+        Returns:
+            ndarray: Coupe (profils x traces).
+        """
+        t = int(np.clip(t, 0, self.data.shape[0] - 1))
+        return np.asarray(self.data[t])
+
+    def cscan(self, t0: int, t1: int):
+        """
+        Méthode renvoyant la moyenne des amplitudes absolues entre les samples t0 et t1 (arrondis aux tranches).
+
+        Returns:
+            ndarray: C-scan (profils x traces), float32.
+        """
+        n_samp = self.data.shape[0]
+        n_slabs = self.slabs.shape[0] - 1
+        j0 = int(np.clip(int(t0) // self.slab, 0, n_slabs - 1))
+        j1 = int(np.clip(-(-int(t1) // self.slab), j0 + 1, n_slabs))
+        count = min(j1 * self.slab, n_samp) - j0 * self.slab
+        return ((self.slabs[j1] - self.slabs[j0]) / count).astype(np.float32)
+
+def prune(folder: str, keep: int = 4, exclude: list = ()):
+    """
+    Fonction supprimant les volumes les plus anciens d'un dossier (les plus récemment utilisés sont conservés).
+    Les volumes ont leur propre dossier: ils ne comptent pas dans le budget du cache des images traitées.
+
+    Args:
+        folder (str): Dossier des volumes
+        keep (int): Nombre de volumes conservés
+        exclude (list): Fichiers des volumes ouverts (jamais supprimés)
+    """
+    if not os.path.exists(folder):
+        return
+    exclude = set(os.path.abspath(filename) for filename in exclude)
+    volumes = []
+    for name in os.listdir(folder):
+        filename = os.path.join(folder, name)
+        if name.endswith(".npy") and not name.endswith(".slabs.npy") and os.path.abspath(filename) not in exclude:
+            volumes.append((os.stat(filename).st_mtime, filename))
+    volumes.sort(reverse=True)
+    for _, filename in volumes[max(0, keep - len(exclude)):]:
+        for path in [filename, filename[:-4] + ".slabs.npy"]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass # Fichier encore ouvert (memmap) ou déjà supprimé
@@ -0,0 +1,71 @@
+import os
+import sys
+import json
+import sqlite3
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Annotations import AnnotationDB, POINT, RECTANGLE
+
+@pytest.fixture
+def db(tmp_path):
+    database = AnnotationDB(str(tmp_path / "annotations.sqlite"))
+    yield database
+    database.close()
+
+def test_save_and_reload(db, tmp_path):
+    path = str(tmp_path / "a" / "prof.rd3")
+    params = {"g": 2., "dewow": True}
+    coords = np.array([[0.1, 0.2, 0.1, 0.2], [0.3, 0.4, 0.5, 0.6]])
+    db.save(path, "prof", params, ["Acier", "Bois"], np.array([POINT, RECTANGLE]), coords)
+
+    shapes = db.shapes(path)
+    assert shapes["label"].tolist() == ["Acier", "Bois"]
+    assert shapes["kind"].tolist() == [POINT, RECTANGLE]
+    np.testing.assert_array_equal(np.column_stack([shapes["x1"], shapes["y1"], shapes["x2"], shapes["y2"]]), coords)
+    assert db.params(path) == params
+    assert db.counts() == {"Acier": 1, "Bois": 1}
+
+    # Nouvelle sauvegarde: les formes sont remplacées
+    db.save(path, "prof", params, ["Bois"], np.array([POINT]), coords[:1])
+    assert db.shapes(path)["label"].tolist() == ["Bois"]
+    assert db.counts() == {"Bois": 1}
+
+    # Relecture par une autre connexion
+    other = AnnotationDB(db.filename)
+    assert other.shapes(path)["label"].tolist() == ["Bois"]
+    other.close()
+
+def test_unlabelled_and_empty_files(db, tmp_path):
+    path = str(tmp_path / "prof.rd3")
+    assert db.shapes(path) is None
+    db.save(path, "prof", None, [], np.zeros(0), np.zeros((0, 4)))
+    assert len(db.shapes(path)) == 0
+    assert db.entries(path) == {os.path.abspath(path): [{"image": "prof", "label": None}]}
+
+def test_same_name_in_two_folders(db, tmp_path):
+    first = str(tmp_path / "a" / "prof.rd3")
+    second = str(tmp_path / "b" / "prof.rd3")
+    db.save(first, "prof", None, ["Acier"], np.array([POINT]), np.zeros((1, 4)))
+    db.save(second, "prof", None, ["Bois"], np.array([POINT]), np.ones((1, 4)))
+    assert db.shapes(first)["label"].tolist() == ["Acier"]
+    assert db.shapes(second)["label"].tolist() == ["Bois"]
+    assert db.image_name(first) == "prof"
+    assert db.image_name(second) != "prof"
+
+    assert db.export_dataset(str(tmp_path / "dataset")) == 2
+    with open(str(tmp_path / "dataset" / (db.image_name(second) + ".json"))) as json_file:
+        assert json.load(json_file)[0]["label"] == "Bois"
+
+def test_rollback_resyncs_label_cache(db, tmp_path):
+    path = str(tmp_path / "prof.rd3")
+    # Coordonnée invalide (NOT NULL): la transaction est annulée après la création de la classe
+    with pytest.raises(sqlite3.IntegrityError):
+        db.save(path, "prof", None, ["Acier"], np.array([POINT]), np.full((1, 4), np.nan))
+    assert "Acier" not in db.labels
+    assert db.shapes(path) is None
+    db.save(path, "prof", None, ["Acier"], np.array([POINT]), np.zeros((1, 4)))
+    assert db.shapes(path)["label"].tolist() == ["Acier"]
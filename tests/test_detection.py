@@ -0,0 +1,50 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytest.importorskip("readgssi")
+
+from Migration import velocity
+from Detection import HyperbolaDetector
+
+DT = 0.2e-9
+DX = 0.02
+# Apex (sample, trace) et permittivité de chaque hyperbole synthétique
+HYPERBOLAS = [(80, 100, 6.), (160, 220, 12.)]
+
+def profile():
+    """
+    Profil synthétique: hyperboles (ondelette de Ricker) sur un bruit faible.
+    """
+    img = np.random.default_rng(0).standard_normal((256, 300)).astype(np.float32) * 0.05
+    samples = np.arange(img.shape[0])[:, np.newaxis]
+    for t0, x0, epsilon in HYPERBOLAS:
+        x = (np.arange(img.shape[1]) - x0) * DX
+        t = np.sqrt((t0 * DT)**2 + (2 * x / velocity(epsilon))**2) / DT
+        u = (samples - t[np.newaxis, :]) / 2.
+        img += ((1 - 2 * u**2) * np.exp(-u**2)).astype(np.float32)
+    return img
+
+def test_detect_finds_apex_and_epsilon():
+    detections = HyperbolaDetector().detect(profile(), DT, DX)
+    best = detections[:len(HYPERBOLAS)]
+    for t0, x0, epsilon in HYPERBOLAS:
+        match = best[(np.abs(best["sample"] - t0) <= 2) & (np.abs(best["trace"] - x0) <= 2)]
+        assert len(match) == 1
+        assert abs(match["epsilon"][0] - epsilon) / epsilon < 0.1
+
+def test_fit_epsilon_chunks_do_not_change_result():
+    img = profile()
+    data = img - img.mean(axis=1, keepdims=True)
+    samples = np.array([t0 for t0, _, _ in HYPERBOLAS] * 5)
+    traces = np.array([x0 for _, x0, _ in HYPERBOLAS] * 5)
+    detector = HyperbolaDetector()
+    expected = detector.fit_epsilon(data, samples, traces, DT, DX, 15)
+    # Une hyperbole par paquet
+    result = detector.fit_epsilon(data, samples, traces, DT, DX, 15, max_elements=1)
+    np.testing.assert_array_equal(result, expected)
+    np.testing.assert_allclose(expected[:2], [epsilon for _, _, epsilon in HYPERBOLAS], rtol=0.1)
@@ -0,0 +1,38 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import Kernels
+
+def random_image(n_samp: int = 64, n_tr: int = 300):
+    return np.random.default_rng(0).standard_normal((n_samp, n_tr)).astype(np.float32) * 100
+
+@pytest.mark.skipif(Kernels.numba is None, reason="numba non installé")
+@pytest.mark.parametrize("j", [1, 10, 200])
+def test_sub_mean_running_numba_matches_numpy(j):
+    img = random_image()
+    expected = Kernels._np_sub_mean_running(img.copy(), j)
+    result = Kernels._nb_sub_mean_running(img.copy(), j)
+    np.testing.assert_allclose(result, expected, rtol=1e-5, atol=1e-3)
+
+def test_set_backend_numpy():
+    try:
+        assert Kernels.set_backend("numpy") == "numpy"
+        assert Kernels.sub_mean_running is Kernels._np_sub_mean_running
+    finally:
+        Kernels.set_backend("numba")
+
+def test_crop_dewow_gain():
+    img = (random_image() * 10).astype(np.int16) + 500
+    fgain = np.linspace(1., 2., 40).astype(np.float32)
+    out = Kernels.crop_dewow_gain(img, 10, 50, True, fgain, 1e9)
+    assert out.shape == (40, img.shape[1]) and out.dtype == np.float32
+    crop = img[10:50].astype(np.float64)
+    expected = (crop - crop.mean(axis=0)) * fgain[:, np.newaxis]
+    np.testing.assert_allclose(out, expected, rtol=1e-5, atol=1e-2)
+    # Écrêtage
+    assert np.abs(Kernels.crop_dewow_gain(img, 10, 50, True, fgain, 100.)).max() <= 100.
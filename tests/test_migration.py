@@ -0,0 +1,83 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytest.importorskip("readgssi")
+
+from Migration import FKMigration, KirchhoffMigration, velocity
+
+DT = 0.2e-9
+DX = 0.02
+EPSILON = 9.
+T0, X0 = 100, 64
+
+def diffraction(nt: int = 256, nx: int = 128):
+    """
+    Profil synthétique d'un diffracteur ponctuel (apex en T0, X0) dans un milieu de permittivité EPSILON.
+    """
+    x = (np.arange(nx) - X0) * DX
+    t = np.sqrt((T0 * DT)**2 + (2 * x / velocity(EPSILON))**2) / DT
+    samples = np.arange(nt)[:, np.newaxis]
+    return np.exp(-0.5 * ((samples - t[np.newaxis, :]) / 1.5)**2).astype(np.float32)
+
+def focus(img: np.ndarray, radius: int = 4):
+    """
+    Part de l'énergie contenue autour de l'apex.
+    """
+    energy = img.astype(np.float64)**2
+    return energy[T0-radius:T0+radius+1, X0-radius:X0+radius+1].sum() / energy.sum()
+
+def test_fk_migration_focuses_point_diffractor():
+    img = diffraction()
+    migrated = FKMigration().migrate(img, DT, DX, velocity(EPSILON))
+    assert migrated.shape == img.shape and migrated.dtype == np.float32
+    t, x = np.unravel_index(np.argmax(np.abs(migrated)), migrated.shape)
+    assert abs(t - T0) <= 2 and abs(x - X0) <= 1
+    assert focus(migrated) > 5 * focus(img)
+
+def test_fk_grid_cache_is_bounded():
+    engine = FKMigration(max_grids=2)
+    img = diffraction()
+    for epsilon in [4., 9., 16.]:
+        engine.migrate(img, DT, DX, velocity(epsilon))
+    assert len(engine.grids) == 2
+
+def test_kirchhoff_migration_focuses_point_diffractor():
+    img = diffraction()
+    engine = KirchhoffMigration()
+    try:
+        migrated = engine.migrate(img, DT, DX, np.full(img.shape[0], velocity(EPSILON)), 60, n_jobs=1)
+    finally:
+        engine.close()
+    t, x = np.unravel_index(np.argmax(np.abs(migrated)), migrated.shape)
+    assert abs(t - T0) <= 2 and abs(x - X0) <= 1
+    assert focus(migrated) > 4 * focus(img)
+
+def test_kirchhoff_pool_matches_single_process():
+    img = diffraction()
+    v_int = np.full(img.shape[0], velocity(EPSILON))
+    engine = KirchhoffMigration()
+    try:
+        expected = engine.migrate(img, DT, DX, v_int, 30, tile_width=32, n_jobs=1)
+        result = engine.migrate(img, DT, DX, v_int, 30, tile_width=32, n_jobs=2)
+        assert engine.workers == 2
+    finally:
+        engine.close()
+    np.testing.assert_allclose(result, expected, rtol=1e-5, atol=1e-5)
+
+def test_kirchhoff_evicted_table_released_after_use():
+    engine = KirchhoffMigration(max_tables=1)
+    v_int = np.full(64, velocity(EPSILON))
+    try:
+        first = engine.table(64, DT, DX, v_int, 8)
+        # Table sortie du cache pendant son utilisation: conservée jusqu'à release_table
+        engine.table(64, DT, 2 * DX, v_int, 8)
+        assert first.retired and first.table is not None
+        engine.release_table(first)
+        assert first.table is None
+    finally:
+        engine.close()
@@ -0,0 +1,37 @@
+import os
+import sys
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytest.importorskip("PyQt6")
+pytest.importorskip("readgssi")
+
+from Project import Project
+
+def test_save_preset_written_to_project(tmp_path, monkeypatch):
+    import QMainWindow
+    from Annotations import AnnotationDB
+    from QMainWindow import MainWindow, QInputDialog
+
+    # Base des annotations hors du dépôt
+    monkeypatch.setattr(QMainWindow, "AnnotationDB", lambda: AnnotationDB(str(tmp_path / "annotations.sqlite")))
+    window = MainWindow("test")
+    monkeypatch.setattr(QInputDialog, "getText", lambda *args, **kwargs: ("fort", True))
+
+    window.gain_const_value = 3.
+    window.gain_const_entry.setText("3")
+    window.dewow_state = "on"
+    window.save_preset()
+    assert window.preset_choice.currentText() == "fort"
+
+    window.project.filename = str(tmp_path / "projet.json")
+    window.save_project()
+
+    project = Project().load(str(tmp_path / "projet.json"))
+    preset = project.preset("fort")
+    assert preset["values"]["gain_const_value"] == 3.
+    assert preset["entries"]["gain_const_entry"] == "3"
+    assert preset["states"]["dewow_state"] == "on"
@@ -0,0 +1,72 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytest.importorskip("readgssi")
+
+from RadarController import RadarController
+
+@pytest.mark.parametrize("chunk", [4096, 128])
+def test_svd_filter_removes_background(chunk):
+    rng = np.random.default_rng(0)
+    # Sonnerie de l'antenne identique sur toutes les traces et réflexion ponctuelle
+    background = 100 * np.sin(np.arange(128) / 5.)[:, np.newaxis] * np.ones((1, 500))
+    img = (background + rng.standard_normal((128, 500))).astype(np.float32)
+    img[60, 250] += 50.
+    out = RadarController().svd_filter(img, 1, chunk=chunk)
+    assert out.dtype == np.float32
+    assert np.unravel_index(np.argmax(np.abs(out)), out.shape) == (60, 250)
+    assert abs(out[60, 250] - 50.) < 5.
+    # Seul le bruit reste autour de la réflexion
+    out[60, 250] = 0.
+    assert np.sqrt(np.mean(out**2)) < 1.5
+
+@pytest.mark.parametrize("mode", ["RMS", "Moyenne absolue"])
+def test_agc_balances_levels(mode):
+    rng = np.random.default_rng(0)
+    img = rng.standard_normal((400, 20)).astype(np.float32)
+    img[200:] *= 100.
+    out = RadarController().agc(img, 51, mode)
+    assert out.shape == img.shape and out.dtype == np.float32
+    top = np.sqrt(np.mean(out[:150]**2))
+    bottom = np.sqrt(np.mean(out[250:]**2))
+    assert 0.8 < top / bottom < 1.25
+    # Niveau global de l'entrée conservé (ordre de grandeur)
+    assert 0.1 < np.sqrt(np.mean(out**2)) / np.sqrt(np.mean(img**2)) < 10.
+
+def test_agc_keeps_dead_zones_silent():
+    img = np.zeros((200, 5), dtype=np.float32)
+    img[100:] = np.random.default_rng(0).standard_normal((100, 5))
+    out = RadarController().agc(img, 21)
+    assert np.all(out[:80] == 0.)
+
+def first_arrivals(shifts: np.ndarray, n_samp: int = 256):
+    """
+    Traces synthétiques: onde directe (gaussienne) arrivant au sample shifts de chaque trace, sur un fond constant.
+    """
+    u = (np.arange(n_samp)[:, np.newaxis] - shifts[np.newaxis, :]) / 2.
+    return (1000 * np.exp(-u**2) + 100).astype(np.float32)
+
+def test_pick_time_zero_follows_fractional_shifts():
+    shifts = np.array([20., 20.5, 21.3, 25., 30.7])
+    picks = RadarController().pick_time_zero(first_arrivals(shifts))
+    # Le seuil est franchi avant le maximum: même avance pour toutes les traces
+    np.testing.assert_allclose(picks - picks[0], shifts - shifts[0], atol=0.1)
+
+def test_time_zero_correction_aligns_traces():
+    controller = RadarController()
+    shifts = np.array([20., 20.5, 21.3, 25., 30.7])
+    img = first_arrivals(shifts)
+    picks = controller.pick_time_zero(img)
+
+    per_trace = controller.time_zero_correction(img, "Par trace")
+    assert per_trace.shape == img.shape and per_trace.dtype == np.float32
+    np.testing.assert_allclose(controller.pick_time_zero(per_trace), 0., atol=0.1)
+
+    # Par fichier: décalage médian commun
+    per_file = controller.time_zero_correction(img, "Par fichier")
+    np.testing.assert_allclose(np.argmax(per_file, axis=0), np.round(shifts - np.median(picks)).clip(0), atol=1)
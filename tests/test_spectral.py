@@ -0,0 +1,57 @@
+import os
+import sys
+
+import numpy as np
+from scipy import fft
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Spectral import SpectralFilter
+
+DT = 0.1e-9
+# Ondelette causale (amortie) de la source
+WAVELET = np.exp(-np.arange(30) / 5.) * np.cos(0.6 * np.arange(30))
+
+def convolved(series: np.ndarray):
+    return np.stack([np.convolve(trace, WAVELET)[:len(trace)] for trace in series.T], axis=1).astype(np.float32)
+
+def flatness(img: np.ndarray, f_min: float, f_max: float):
+    """
+    Écart-type relatif du spectre d'amplitude moyen dans la bande [f_min, f_max] (MHz).
+    """
+    amplitude = np.abs(fft.rfft(img, axis=0)).mean(axis=1)
+    f = fft.rfftfreq(img.shape[0], DT) / 10.**6
+    band = (f > f_min) & (f < f_max)
+    return amplitude[band].std() / amplitude[band].mean()
+
+def test_whiten_flattens_spectrum():
+    img = convolved(np.random.default_rng(0).standard_normal((512, 20)))
+    out = SpectralFilter().whiten(img, DT, 200., 3000.)
+    assert out.shape == img.shape and out.dtype == np.float32
+    assert flatness(out, 500., 2500.) < 0.5 * flatness(img, 500., 2500.)
+    # Niveau RMS de l'entrée
+    np.testing.assert_allclose(np.sqrt(np.mean(out**2)), np.sqrt(np.mean(img**2)), rtol=1e-3)
+
+def test_whiten_does_not_wrap_around():
+    img = np.zeros((512, 4), dtype=np.float32)
+    img[500:505] = 1000.
+    out = SpectralFilter().whiten(img, DT, 100., 1500.)
+    assert np.abs(out[:10]).max() < 1e-3 * np.abs(out[495:510]).max()
+
+def test_deconvolve_recovers_reflectivity():
+    rng = np.random.default_rng(0)
+    reflectivity = np.zeros((512, 50))
+    for j in range(50):
+        reflectivity[rng.integers(20, 480, 6), j] = rng.choice([-1., 1.], 6)
+    img = convolved(reflectivity)
+    out = SpectralFilter().deconvolve(img, 40, 1)
+    def correlation(a):
+        return np.mean([np.corrcoef(a[:, j], reflectivity[:, j])[0, 1] for j in range(50)])
+    assert correlation(img) < 0.8
+    assert correlation(out) > 0.95
+
+def test_band_tapers_cache_is_bounded():
+    engine = SpectralFilter(max_tapers=2)
+    for f_max in [1000., 1500., 2000.]:
+        engine.band_taper(1024, DT, 100., f_max)
+    assert len(engine.tapers) == 2
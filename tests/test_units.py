@@ -0,0 +1,88 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytest.importorskip("readgssi")
+
+from Units import CoordinateTransform, VelocityModel
+
+# 500 traces, 400 samples, 25 m, 80 ns, 0.05 m et 0.02 s par trace
+FEATURE = [500, 400, 25., 80., 0.05, 0.02]
+EPSILON = 4.
+
+def test_steps_and_extent():
+    transform = CoordinateTransform(FEATURE, EPSILON, cb=40, ce=240)
+    assert transform.trace_step(0) == pytest.approx(0.05)
+    assert transform.trace_step(1) == pytest.approx(0.02)
+    # 80 ns à c / 2: 6 m aller-retour sur 400 samples
+    assert transform.sample_step(0) == pytest.approx(299792458 / 2 * 80e-9 / 2 / 400)
+    assert transform.sample_step(1) == pytest.approx(0.2)
+    x_max, y_max = transform.extent(2, 2)
+    assert (x_max, y_max) == (500, 200)
+
+@pytest.mark.parametrize("xindex, yindex", [(0, 0), (1, 1), (2, 2), (0, 1)])
+def test_axes_indices_round_trip(xindex, yindex):
+    transform = CoordinateTransform(FEATURE, EPSILON, distance=30., cb=40, ce=240)
+    traces = np.array([0., 12.5, 499.])
+    samples = np.array([0., 33.3, 199.])
+    x, y = transform.to_axes(traces, samples, xindex, yindex)
+    back_traces, back_samples = transform.to_indices(x, y, xindex, yindex)
+    np.testing.assert_allclose(back_traces, traces)
+    np.testing.assert_allclose(back_samples, samples)
+
+def test_normalize_is_unit_independent():
+    transform = CoordinateTransform(FEATURE, EPSILON, cb=40, ce=240)
+    x, y = transform.to_axes(np.array([100., 300.]), np.array([50., 150.]), 0, 0)
+    coords = np.array([[x[0], y[0], x[1], y[1]]])
+    normalized = transform.normalize(coords, 0, 0)
+    np.testing.assert_allclose(normalized, [[0.2, 0.25, 0.6, 0.75]])
+    # Mêmes coordonnées normalisées en temps / traces
+    x, y = transform.to_axes(np.array([100., 300.]), np.array([50., 150.]), 2, 1)
+    np.testing.assert_allclose(transform.normalize(np.array([[x[0], y[0], x[1], y[1]]]), 2, 1), normalized)
+    np.testing.assert_allclose(transform.denormalize(normalized, 0, 0), coords)
+
+def test_convert_between_units():
+    transform = CoordinateTransform(FEATURE, EPSILON)
+    x, y = transform.convert(np.array([1.]), np.array([2.]), (0, 1), (2, 2))
+    np.testing.assert_allclose(x, [20.])
+    np.testing.assert_allclose(y, [10.])
+
+def rms_epsilon(t: float, tops: list, epsilons: list):
+    """
+    Permittivité RMS (vitesse moyenne quadratique depuis la surface) au temps t (ns) d'un modèle en couches.
+    """
+    bottoms = tops[1:] + [np.inf]
+    energy = sum(299792458**2 / eps * max(0., min(t, bottom) - top) for top, bottom, eps in zip(tops, bottoms, epsilons))
+    return 299792458**2 / (energy / t)
+
+@pytest.mark.parametrize("t_zero", [0., 7.5])
+def test_dix_recovers_layers(t_zero):
+    tops = [0., 20., 40.]
+    epsilons = [4., 9., 16.]
+    # Trois hyperboles à la base de chaque couche (temps depuis la surface)
+    times = np.repeat([20., 40., 60.], 3)
+    fitted = np.array([rms_epsilon(t, tops, epsilons) for t in times])
+    model = VelocityModel.from_hyperbolas(times + t_zero, fitted, t_zero, n_layers=3)
+    np.testing.assert_allclose(model.epsilons, epsilons, rtol=1e-6)
+    # Toits exprimés depuis le début du fichier
+    np.testing.assert_allclose(model.tops, [0., 20. + t_zero, 40. + t_zero])
+
+def test_depth_table_integrates_layers():
+    model = VelocityModel(np.array([0., 20.]), np.array([4., 16.]))
+    depths = model.depth_table(400, 0.1)
+    assert len(depths) == 401 and np.all(np.diff(depths) > 0)
+    # 20 ns à c / 2 puis 20 ns à c / 4 (aller-retour)
+    assert depths[200] == pytest.approx(299792458 / 2 * 20e-9 / 2)
+    assert depths[400] == pytest.approx(299792458 / 2 * 20e-9 / 2 + 299792458 / 4 * 20e-9 / 2)
+    np.testing.assert_allclose(model.time_to_depth([20., 40.], 400, 0.1), depths[[200, 400]])
+
+def test_velocity_model_depth_axis():
+    model = VelocityModel(np.array([0., 20.]), np.array([4., 16.]))
+    transform = CoordinateTransform(FEATURE, EPSILON, cb=0, ce=400, velocity=model)
+    assert transform.nonlinear(0) and not transform.nonlinear(1)
+    y = transform.y_coords(np.array([100., 300.]), 0)
+    np.testing.assert_allclose(transform.y_rows(y, 0), [100., 300.])
@@ -0,0 +1,52 @@
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Volume import Volume, prune
+
+def profiles():
+    rng = np.random.default_rng(0)
+    # Profils de longueurs différentes (complétés jusqu'au nombre maximal de traces)
+    return [rng.standard_normal((50, n_tr)).astype(np.float32) for n_tr in [30, 40, 35]]
+
+def test_build_and_reopen(tmp_path):
+    images = profiles()
+    volume = Volume(str(tmp_path / "volume.npy"), slab=8)
+    volume.build(iter(images), len(images), 50, 40)
+    assert volume.exists()
+    assert volume.shape() == (50, 3, 40)
+
+    reopened = Volume(str(tmp_path / "volume.npy"), slab=2)
+    reopened.open()
+    assert reopened.slab == 8
+    for p, img in enumerate(images):
+        np.testing.assert_array_equal(reopened.time_slice(10)[p, :img.shape[1]], img[10])
+        assert np.all(reopened.time_slice(10)[p, img.shape[1]:] == 0.)
+
+def test_cscan_is_mean_absolute_amplitude(tmp_path):
+    images = profiles()
+    volume = Volume(str(tmp_path / "volume.npy"), slab=8)
+    volume.build(iter(images), len(images), 50, 40)
+    data = np.zeros((50, 3, 40))
+    for p, img in enumerate(images):
+        data[:, p, :img.shape[1]] = img
+    # Tranches entières, puis dernière tranche incomplète (samples 48-49)
+    np.testing.assert_allclose(volume.cscan(8, 24), np.abs(data[8:24]).mean(axis=0), rtol=1e-5)
+    np.testing.assert_allclose(volume.cscan(45, 50), np.abs(data[40:50]).mean(axis=0), rtol=1e-5)
+
+def test_prune_keeps_recent_and_open_volumes(tmp_path):
+    filenames = []
+    for i in range(5):
+        volume = Volume(str(tmp_path / ("volume_" + str(i) + ".npy")))
+        volume.build(iter(profiles()), 3, 50, 40)
+        # Dates de modification distinctes: volume_4 est le plus récent
+        os.utime(volume.filename, (time.time() - 100 + i, time.time() - 100 + i))
+        filenames.append(volume.filename)
+    prune(str(tmp_path), keep=2, exclude=[filenames[0]])
+    remaining = sorted(name for name in os.listdir(tmp_path) if not name.endswith(".slabs.npy"))
+    assert remaining == ["volume_0.npy", "volume_4.npy"]
+    assert not os.path.exists(str(tmp_path / "volume_1.slabs.npy"))